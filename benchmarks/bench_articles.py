@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Artikeldaten (API-Antworten → Struktur → Join beim Rendern).
+
+Vergleicht die früheren losen Dicts (set + article_info orderNo → {'isbn',
+'price'}, Join pro Kachel über wp_links/wp_desc nach ISBN und float(price))
+mit der ArticleTable (__slots__-Datensätze, Preise einmal geparst, WP-Daten
+einmal per attach_wp verknüpft). Beide müssen dieselben Kacheldaten liefern.
+
+    python3 benchmarks/bench_articles.py --sizes 10000,100000
+"""
+
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+from common import load_generator, fmt_mb
+from synthetic import make_inventory
+
+FALLBACK_URL = "https://www.booklooker.de/"
+
+
+def api_texts(article_info):
+    """Die drei article_list-Antworten, wie die API sie liefert."""
+    orders = list(article_info)
+    return ('\n'.join(orders),
+            '\n'.join(f"{o}\t{article_info[o]['price']}" for o in orders),
+            '\n'.join(article_info[o]['isbn'] for o in orders))
+
+
+def legacy_build(order_text, price_text, isbn_text):
+    """Referenz: Zusammenführen wie in get_article_data vor der ArticleTable."""
+    order_nos = [a.strip().upper() for a in order_text.strip().split('\n') if a.strip()]
+    price_map = {}
+    for line in price_text.strip().split('\n'):
+        parts = line.strip().split('\t')
+        if parts:
+            price_map[parts[0].strip().upper()] = parts[1].strip() if len(parts) > 1 else ''
+    isbn_map = {}
+    isbn_lines = [l.strip() for l in isbn_text.strip().split('\n')]
+    for i, order_no in enumerate(order_nos):
+        if i < len(isbn_lines):
+            isbn_map[order_no] = isbn_lines[i].strip()
+    article_info = {o: {'isbn': isbn_map.get(o, ''), 'price': price_map.get(o, '')} for o in order_nos}
+    return set(order_nos), article_info
+
+
+def legacy_join(stems, article_info, wp_links, wp_desc):
+    """Referenz: Nachschlagen pro Kachel wie im früheren Render-Loop."""
+    out = []
+    for stem in stems:
+        info  = article_info.get(stem, {})
+        isbn  = info.get('isbn', '')
+        price = info.get('price', '')
+        price_fmt = ""
+        if price:
+            try:
+                price_fmt = f"{float(price):.2f} €".replace('.', ',')
+            except ValueError:
+                pass
+        out.append((wp_links.get(isbn, FALLBACK_URL), wp_desc.get(isbn, ''), price_fmt))
+    return out
+
+
+def table_join(stems, articles):
+    out = []
+    for stem in stems:
+        a = articles.get(stem)
+        out.append((a.href or FALLBACK_URL, a.desc, a.price_text) if a else (FALLBACK_URL, '', ''))
+    return out
+
+
+def retained(fn):
+    """(ergebnis, sekunden, bytes die das Ergebnis belegt)."""
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    tracemalloc.start()
+    result = fn()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, seconds, size
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: Artikeltabelle")
+    parser.add_argument('--sizes', default='10000,100000', help="Artikelanzahlen, kommagetrennt")
+    args = parser.parse_args()
+
+    gg = load_generator()
+    print(f"  {'Artikel':>8} {'Variante':<9} {'Aufbau':>9} {'Speicher':>11} {'B/Artikel':>10} {'Join':>9}")
+    for n in [int(x) for x in args.sizes.split(',') if x.strip()]:
+        _, article_info, wp_links, wp_desc = make_inventory(n)
+        texts = api_texts(article_info)
+        stems = sorted(article_info, reverse=True)
+
+        (_, info), t_build, mem = retained(lambda: legacy_build(*texts))
+        legacy, t_join = timed(lambda: legacy_join(stems, info, wp_links, wp_desc))
+        print(f"  {n:8d} {'dicts':<9} {t_build:8.3f}s {fmt_mb(mem)} {mem / len(info):10.0f} {t_join:8.3f}s")
+
+        def build_table():
+            with contextlib.redirect_stdout(io.StringIO()):
+                table = gg.parse_article_lists(*texts)
+            table.attach_wp(wp_links, wp_desc)
+            return table
+
+        table, t_build, mem = retained(build_table)
+        joined, t_join = timed(lambda: table_join(stems, table))
+        print(f"  {n:8d} {'table':<9} {t_build:8.3f}s {fmt_mb(mem)} {mem / len(table):10.0f} {t_join:8.3f}s")
+        assert joined == legacy, "Kacheldaten weichen ab"
+
+
+if __name__ == "__main__":
+    main()
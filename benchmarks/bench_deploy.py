@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Deploy per FTP gegen einen lokalen pyftpdlib-Server.
+
+Startet den Server in einem Thread (Login-Ordner /login unter einem
+Temp-Ordner), legt einen synthetischen Output an (Cover, JSON-Seiten,
+index.html) und misst drei Läufe: erster Deploy (alles), Deploy ohne
+Änderung (nur Manifest-Abgleich) und Deploy nach Änderungen (geänderte und
+verkaufte Cover). Nach jedem Lauf muss der Zielordner dem Output gleichen –
+einmal mit remote relativ zum Login-Ordner, einmal absolut.
+
+    pip install pyftpdlib
+    python3 benchmarks/bench_deploy.py --files 2000 --connections 4
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import load_generator
+from synthetic import tiny_jpeg, order_no
+
+try:
+    from pyftpdlib.authorizers import DummyAuthorizer
+    from pyftpdlib.handlers import FTPHandler
+    from pyftpdlib.servers import FTPServer
+except ImportError:
+    sys.exit("bench_deploy braucht pyftpdlib: pip install pyftpdlib")
+
+USER, PASSWORD = "bench", "bench"
+LOGIN_DIR = "/login"
+
+
+class LoginDirHandler(FTPHandler):
+    """Wie ein Hoster: nach dem Login steht man nicht im Wurzelordner."""
+
+    def on_login(self, username):
+        self.fs.cwd = LOGIN_DIR
+
+
+def start_server(home):
+    (home / LOGIN_DIR.lstrip('/')).mkdir(parents=True, exist_ok=True)
+    authorizer = DummyAuthorizer()
+    authorizer.add_user(USER, PASSWORD, str(home), perm='elradfmw')
+    LoginDirHandler.authorizer = authorizer
+    server = FTPServer(('127.0.0.1', 0), LoginDirHandler)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'handle_exit': False}, daemon=True)
+    thread.start()
+    return server, server.address[1]
+
+
+def make_output(output, n, file_size):
+    """n Cover plus ein paar JSON-Seiten und index.html."""
+    (output / "images").mkdir(parents=True, exist_ok=True)
+    (output / "data").mkdir(parents=True, exist_ok=True)
+    for i in range(n):
+        (output / "images" / f"{order_no(i).lower()}.jpg").write_bytes(tiny_jpeg(file_size, width=600 + i % 7))
+    for s in range(max(1, n // 500)):
+        (output / "data" / f"shard-{s}.json").write_text(f'{{"shard":{s}}}')
+    (output / "data" / "index.json").write_text('{"shards":[]}')
+    (output / "index.html").write_text("<!DOCTYPE html><title>bench</title>")
+
+
+def change_output(output, n, file_size):
+    """Jedes 10. Cover neu, jedes 25. verkauft (gelöscht)."""
+    for i in range(0, n, 10):
+        (output / "images" / f"{order_no(i).lower()}.jpg").write_bytes(tiny_jpeg(file_size, width=900))
+    for i in range(5, n, 25):
+        (output / "images" / f"{order_no(i).lower()}.jpg").unlink()
+
+
+def same_tree(output, target):
+    def tree(root):
+        return {p.relative_to(root).as_posix(): p.read_bytes()
+                for p in root.rglob('*') if p.is_file()}
+    remote = tree(target)
+    remote.pop(load_generator().DEPLOY_MANIFEST, None)
+    return remote == tree(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: Deploy per FTP (pyftpdlib)")
+    parser.add_argument('--files', type=int, default=2000, help="Anzahl Cover im Output")
+    parser.add_argument('--file-size', type=int, default=4096, help="Bytes pro Cover")
+    parser.add_argument('--connections', type=int, default=4, help="parallele FTP-Verbindungen")
+    args = parser.parse_args()
+
+    gg = load_generator()
+    # pyftpdlib loggt jedes Kommando; eigener Handler hält serve_forever davon ab
+    ftp_log = logging.getLogger('pyftpdlib')
+    ftp_log.addHandler(logging.NullHandler())
+    ftp_log.setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory(prefix="galerie-deploy-") as tmp:
+        home = Path(tmp) / "ftp"
+        server, port = start_server(home)
+        try:
+            print(f"  {'remote':<16} {'Lauf':<12} {'Zeit':>9} {'hoch':>6} {'gelöscht':>9}")
+            for remote, target in (('galerie', home / LOGIN_DIR.lstrip('/') / 'galerie'),
+                                   ('/abs/galerie', home / 'abs' / 'galerie')):
+                output = Path(tmp) / remote.strip('/').replace('/', '-') / "galerie-output"
+                make_output(output, args.files, args.file_size)
+                cfg = {'protocol': 'ftp', 'host': '127.0.0.1', 'port': port, 'user': USER,
+                       'password': PASSWORD, 'remote': remote, 'connections': args.connections}
+                for run, prepare in (('erster', None), ('unverändert', None),
+                                     ('geändert', lambda: change_output(output, args.files, args.file_size))):
+                    if prepare:
+                        prepare()
+                    t0 = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        uploaded, deleted = gg.deploy(output, cfg)
+                    seconds = time.perf_counter() - t0
+                    assert same_tree(output, target), f"{target} weicht vom Output ab ({remote}, {run})"
+                    print(f"  {remote:<16} {run:<12} {seconds:8.3f}s {uploaded:6d} {deleted:9d}")
+        finally:
+            server.close_all()
+
+
+if __name__ == "__main__":
+    main()
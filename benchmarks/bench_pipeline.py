@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark-Suite: misst is_valid, scan_gallery, probe_jpeg, cleanup, WP-Parser
+und generate_html auf synthetischen Galerien verschiedener Größe.
+
+    python3 benchmarks/bench_pipeline.py                      # 1k + 10k
+    python3 benchmarks/bench_pipeline.py --sizes 1000,10000,100000 --json bench.json
+
+Pro Phase: Laufzeit, Durchsatz (Artikel/s) und Speicher-Peak (tracemalloc).
+Zustandsverändernde Phasen (cleanup, generate_html) bekommen vor jedem Lauf
+eine frisch angelegte Galerie bzw. einen leeren Output-Ordner.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import re
+import shutil
+import tempfile
+from pathlib import Path
+
+from common import load_generator, measure, peak_memory, fmt_mb
+from synthetic import make_gallery, make_inventory, make_wp_page, chunked
+
+# Mehrfachbilder, wie make_gallery sie anlegt (order_no(i)_2.jpg, _3.jpg)
+DUPLICATE = re.compile(r'^(BN|BLX)\d{6}_\d+\.jpg$')
+
+
+def bench_size(gg, n, workdir, file_size):
+    gallery = workdir / "gallery"
+    output  = workdir / "out" / "galerie-output"
+
+    def fresh_gallery():
+        shutil.rmtree(gallery, ignore_errors=True)
+        make_gallery(gallery, n, file_size=file_size)
+
+    def fresh_output():
+        shutil.rmtree(workdir / "out", ignore_errors=True)
+
+    fresh_gallery()
+    active, article_info, wp_links, wp_desc = make_inventory(n)
+    paths = list(gallery.rglob("*.jpg"))
+    names = [p.name for p in paths]
+    page  = make_wp_page(n)
+
+    phases = {}
+
+    def run(name, fn, setup=None):
+        # 1. Lauf: Zeit, 2. Lauf (nach erneutem setup): Speicher-Peak unter tracemalloc
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, seconds, _ = measure(fn, memory=False)
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            peak = peak_memory(fn)
+        phases[name] = {'seconds': seconds, 'per_second': n / seconds if seconds else 0, 'peak_bytes': peak}
+
+    run('is_valid',    lambda: [gg.is_valid(name) for name in names])
+    run('scan_gallery', lambda: gg.scan_gallery(gallery))
+    # alle synthetischen Cover sind gültig, auch die mit Bytes hinter dem EOI –
+    # ein ValueError hier hieße, die Galerie verliert sie beim Sync
+    run('probe_jpeg',  lambda: [gg.probe_jpeg(p) for p in paths])
+    # eigenes Journal im Arbeitsordner – nie das echte ~/.booklooker-cleanup-journal.jsonl
+    journal = workdir / "cleanup-journal.jsonl"
+    run('cleanup',     lambda: gg.cleanup(gallery, active, journal_file=journal), setup=fresh_gallery)
+    # die _2/_3-Mehrfachbilder aus make_gallery müssen alle im Plan landen
+    fresh_gallery()
+    with contextlib.redirect_stdout(io.StringIO()):
+        plan, _, _ = gg.plan_cleanup(gallery, active)
+    deletes = {src.name for op, src, _ in plan if op == 'delete'}
+    assert deletes == {name for name in names if DUPLICATE.match(name)}, "Mehrfachbilder fehlen im Plan"
+    run('wp_parser',   lambda: gg.parse_wp_stream(chunked(page, gg.WP_CHUNK)))
+    run('generate_html',
+        lambda: gg.generate_html(gallery, output, article_info, wp_links, None, wp_desc, '123', ''),
+        setup=lambda: (fresh_gallery(), fresh_output()))
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Galerie-Generator Benchmark-Suite")
+    parser.add_argument('--sizes', default='1000,10000',
+                        help="Artikelanzahlen, kommagetrennt (z.B. 1000,10000,100000)")
+    parser.add_argument('--file-size', type=int, default=4096, help="Bytes pro Cover-Datei")
+    parser.add_argument('--json', help="Ergebnisse zusätzlich als JSON schreiben")
+    args = parser.parse_args()
+
+    gg = load_generator()
+    results = {}
+    for n in [int(x) for x in args.sizes.split(',') if x.strip()]:
+        with tempfile.TemporaryDirectory(prefix=f"galerie-bench-{n}-") as tmp:
+            phases = bench_size(gg, n, Path(tmp), args.file_size)
+        results[n] = phases
+        print(f"\n{n} Artikel")
+        print(f"  {'Phase':<14} {'Zeit':>9} {'Artikel/s':>12} {'Peak':>11}")
+        for name, r in phases.items():
+            print(f"  {name:<14} {r['seconds']:8.3f}s {r['per_second']:12,.0f} {fmt_mb(r['peak_bytes'])}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+        print(f"\nJSON → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
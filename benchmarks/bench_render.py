@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: index.html schreiben (inline-Modus).
+
+Vergleicht den früheren Aufbau (items_html += Kachel, eine große f-String-Seite,
+write_text) mit dem streamenden Schreiben über _write_text_atomic: Kopf,
+Kacheln aus render_item() und Rest gehen Stück für Stück in eine Temp-Datei.
+Beide Dateien müssen byte-gleich sein.
+
+    python3 benchmarks/bench_render.py --sizes 1000,10000,100000
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+
+from common import load_generator, measure, fmt_mb
+from synthetic import make_inventory
+
+FALLBACK_URL = "https://www.booklooker.de/"
+HEAD = "<!DOCTYPE html>\n<html><head><style>" + "x" * 20000 + "</style></head><body><main><div class=\"grid\">"
+TAIL = "\n  </div>\n</main><script>" + "y" * 8000 + "</script></body></html>"
+
+
+def legacy_render(gg, html_file, images, articles):
+    """Referenz: Aufbau wie in generate_html vor dem Streaming-Umbau."""
+    items_html = ""
+    for item in gg.iter_gallery_items(images, articles, FALLBACK_URL):
+        items_html += gg.render_item(item)
+    html = f"{HEAD}{items_html}{TAIL}"
+    html_file.write_text(html, encoding='utf-8')
+
+
+def streamed_render(gg, html_file, images, articles):
+    def page():
+        yield HEAD
+        for item in gg.iter_gallery_items(images, articles, FALLBACK_URL):
+            yield gg.render_item(item)
+        yield TAIL
+    gg._write_text_atomic(html_file, page())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: index.html rendern")
+    parser.add_argument('--sizes', default='1000,10000,100000',
+                        help="Artikelanzahlen, kommagetrennt")
+    args = parser.parse_args()
+
+    gg = load_generator()
+    print(f"  {'Artikel':>8} {'Variante':<9} {'Zeit':>9} {'µs/Artikel':>11} {'Peak':>11} {'Datei':>11}")
+    with tempfile.TemporaryDirectory(prefix="galerie-render-") as tmp:
+        tmp = Path(tmp)
+        for n in [int(x) for x in args.sizes.split(',') if x.strip()]:
+            _, article_info, wp_links, wp_desc = make_inventory(n)
+            articles = gg.ArticleTable.from_info(article_info)
+            articles.attach_wp(wp_links, wp_desc)
+            images = [tmp / f"{order_no.lower()}.jpg" for order_no in sorted(articles, reverse=True)]
+            files = {}
+            for name, fn in (('legacy', legacy_render), ('streamed', streamed_render)):
+                html_file = tmp / f"{name}-{n}.html"
+                _, seconds, peak = measure(lambda: fn(gg, html_file, images, articles))
+                files[name] = html_file
+                print(f"  {n:8d} {name:<9} {seconds:8.3f}s {seconds / len(images) * 1e6:11.2f} "
+                      f"{fmt_mb(peak)} {fmt_mb(html_file.stat().st_size)}")
+            assert files['legacy'].read_bytes() == files['streamed'].read_bytes(), "Ausgabe weicht ab"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Suchindex (search = yes).
+
+Baut den Index aus build_search_index und misst Aufbauzeit und Größe
+(roh/gzip). Danach laufen dieselben Anfragen zweimal: per Durchsuchen aller
+Kacheln (Wörter jeder Beschreibung prüfen – so müsste ein Client ohne Index
+über die DOM-Knoten gehen) und mit dem Algorithmus aus SEARCH_JS
+(Binärsuche in terms/orders/prices, Postings dekodieren). Beide müssen
+dieselben Treffer liefern.
+
+    python3 benchmarks/bench_search.py --sizes 10000,50000
+"""
+
+import argparse
+import bisect
+import gzip
+import time
+
+from common import load_generator, fmt_mb
+from synthetic import make_inventory
+
+QUERIES = [
+    (('gut',), None, None),
+    (('exemplar', 'nichtraucherhaushalt'), None, None),
+    (('bn0001',), None, None),
+    (('978000000012',), None, None),
+    ((), 1000, 1500),
+    (('seiten',), 500, 2000),
+    (('xyzzy',), None, None),
+]
+
+
+def scan(gg, stems, articles, words, lo, hi):
+    """Referenz: jede Kachel einzeln prüfen."""
+    hits = []
+    for pos, stem in enumerate(stems):
+        a = articles.get(stem)
+        tokens = gg.search_tokens(a.desc) + [a.isbn.lower()] if a else []
+        if not all(stem.startswith(w.upper()) or any(t.startswith(w) for t in tokens) for w in words):
+            continue
+        if lo is not None or hi is not None:
+            cents = None if a is None or a.price is None else round(a.price * 100)
+            if cents is None or (lo is not None and cents < lo) or (hi is not None and cents > hi):
+                continue
+        hits.append(pos)
+    return hits
+
+
+def prefix_range(arr, prefix):
+    i = bisect.bisect_left(arr, prefix)
+    while i < len(arr) and arr[i].startswith(prefix):
+        yield i
+        i += 1
+
+
+def lookup(index, words, lo, hi):
+    """Wie SEARCH_JS: je Wort eine Trefferliste (Wort- oder Bestellnummer-Präfix),
+    dazu die Preisspanne, alles per UND verknüpft."""
+    mask = None
+    for w in words:
+        m = bytearray(index['count'])
+        for i in prefix_range(index['terms'], w):
+            pos = 0
+            for d in index['postings'][i]:
+                pos += d
+                m[pos] = 1
+        for i in prefix_range(index['orders'], w.upper()):
+            m[index['orderPos'][i]] = 1
+        mask = m if mask is None else bytearray(a & b for a, b in zip(mask, m))
+    if lo is not None or hi is not None:
+        m = bytearray(index['count'])
+        a = 0 if lo is None else bisect.bisect_left(index['prices'], lo)
+        b = len(index['prices']) if hi is None else bisect.bisect_right(index['prices'], hi)
+        for i in range(a, b):
+            m[index['pricePos'][i]] = 1
+        mask = m if mask is None else bytearray(x & y for x, y in zip(mask, m))
+    return [pos for pos, hit in enumerate(mask) if hit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark: Suchindex")
+    parser.add_argument('--sizes', default='10000,50000', help="Artikelanzahlen, kommagetrennt")
+    args = parser.parse_args()
+
+    gg = load_generator()
+    print(f"  {'Artikel':>8} {'Aufbau':>9} {'Index':>11} {'gzip':>11} {'Wörter':>8} "
+          f"{'Scan/Anfrage':>13} {'Index/Anfrage':>14}")
+    for n in [int(x) for x in args.sizes.split(',') if x.strip()]:
+        _, article_info, wp_links, wp_desc = make_inventory(n)
+        articles = gg.ArticleTable.from_info(article_info)
+        articles.attach_wp(wp_links, wp_desc)
+        stems = sorted(articles, reverse=True)
+
+        t0 = time.perf_counter()
+        index = gg.build_search_index(stems, articles)
+        t_build = time.perf_counter() - t0
+        body = gg._json_body(index)
+
+        t0 = time.perf_counter()
+        expected = [scan(gg, stems, articles, *q) for q in QUERIES]
+        t_scan = (time.perf_counter() - t0) / len(QUERIES)
+        t0 = time.perf_counter()
+        got = [lookup(index, *q) for q in QUERIES]
+        t_index = (time.perf_counter() - t0) / len(QUERIES)
+        assert got == expected, "Treffer weichen ab"
+
+        print(f"  {n:8d} {t_build:8.3f}s {fmt_mb(len(body))} {fmt_mb(len(gzip.compress(body)))} "
+              f"{len(index['terms']):8d} {t_scan * 1e3:11.1f}ms {t_index * 1e3:12.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark: WP-Seiten-Parser (get_wp_data).
+
+Vergleicht den früheren Ganzseiten-Parser (re.split + Regex pro Block) mit dem
+streamenden Parser parse_wp_stream auf einer synthetischen Plugin-Seite und
+prüft, dass beide identische Dicts liefern.
+
+    python3 benchmarks/bench_wp_parser.py --rows 50000
+"""
+
+import argparse
+import re
+
+from common import load_generator, measure, fmt_mb
+from synthetic import make_wp_page, chunked
+
+
+def legacy_parse(html):
+    """Referenz: Parser-Logik aus get_wp_data vor dem Streaming-Umbau."""
+    blocks = re.split(r'<tr[\s>]', html, flags=re.IGNORECASE)
+    wp_links = {}
+    wp_desc  = {}
+    for block in blocks:
+        isbn_m = re.search(r'ISBN:\s*(\d{10,13})', block)
+        if not isbn_m:
+            continue
+        isbn = isbn_m.group(1).strip()
+        url_m = re.search(
+            r"onClick=\"window\.open\('(https://www\.booklooker\.de/app/detail\.php\?id=[^']+)'\)\"",
+            block
+        )
+        if url_m:
+            wp_links[isbn] = url_m.group(1)
+        tds = re.findall(r'<td[^>]*>(.*?)</td>', block, re.DOTALL | re.IGNORECASE)
+        if tds:
+            longest = max(tds, key=len)
+            desc = re.sub(r'<[^>]+>', '', longest)
+            desc = re.sub(r'Preis\(.*', '', desc, flags=re.DOTALL)
+            desc = ' '.join(desc.split()).strip()
+            if len(desc) > 30:
+                wp_desc[isbn] = desc
+    return wp_links, wp_desc
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--chunk', type=int, default=64 * 1024)
+    args = parser.parse_args()
+
+    gg = load_generator()
+    html = make_wp_page(args.rows)
+    print(f"Synthetische WP-Seite: {args.rows} Zeilen, {len(html) / 1e6:.1f} MB Text")
+    print("  (der Seitentext liegt vorab im RAM und zählt beim Peak nicht mit)")
+
+    old, t_old, m_old = measure(lambda: legacy_parse(html))
+    new, t_new, m_new = measure(lambda: gg.parse_wp_stream(chunked(html, args.chunk)))
+
+    assert new == old, "Streaming-Parser liefert andere Ergebnisse als der alte Parser"
+    print(f"  alt (re.split):  {t_old:6.2f} s  Peak {fmt_mb(m_old)}")
+    print(f"  neu (Stream):    {t_new:6.2f} s  Peak {fmt_mb(m_new)}")
+    print(f"  identisch: {len(new[0])} Links, {len(new[1])} Beschreibungen "
+          f"– Faktor {t_old / t_new:.1f}× schneller")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Gemeinsame Helfer für die Benchmarks:
+- lädt galerie-generator.py als Modul (Dateiname mit Bindestrich)
+- misst Laufzeit und Speicher-Peak eines Aufrufs
+"""
+
+import importlib.util
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parent.parent
+
+
+def load_generator():
+    """galerie-generator.py importieren (einmalig, als Modul 'galerie_generator')."""
+    if 'galerie_generator' in sys.modules:
+        return sys.modules['galerie_generator']
+    spec = importlib.util.spec_from_file_location("galerie_generator", REPO / "galerie-generator.py")
+    gg = importlib.util.module_from_spec(spec)
+    sys.modules['galerie_generator'] = gg
+    spec.loader.exec_module(gg)
+    return gg
+
+
+def measure(fn, memory=True):
+    """Ruft fn() auf → (ergebnis, sekunden, peak_bytes).
+    Die Zeit wird ohne tracemalloc gemessen (das bremst stark); für den
+    Speicher-Peak läuft fn() ein zweites Mal unter tracemalloc."""
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    return result, elapsed, peak_memory(fn) if memory else 0
+
+
+def peak_memory(fn):
+    """Speicher-Peak (Bytes) eines Aufrufs fn() laut tracemalloc."""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def fmt_mb(n):
+    return f"{n / 1e6:7.1f} MB"
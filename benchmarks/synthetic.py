@@ -0,0 +1,133 @@
+"""
+Synthetische Testdaten für die Benchmarks:
+- Galerie-Ordner mit BL-Bildern, Mehrfachbildern, verkauften Artikeln und
+  fremden JPGs in verschachtelten *-images-*-Ordnern
+- passende article_info / wp_links / wp_desc und WP-Plugin-Seite
+"""
+
+import random
+import struct
+from pathlib import Path
+
+LOREM = ("Gut erhaltenes Exemplar mit leichten Gebrauchsspuren am Umschlag, "
+         "Seiten sauber und ohne Anstreichungen, Bindung fest, aus Nichtraucherhaushalt. ").split()
+
+
+def isbn_for(i):
+    return f"978{i:010d}"
+
+
+def order_no(i):
+    return f"BN{i:06d}" if i % 3 else f"BLX{i:06d}"
+
+
+# Was Kameras und Handys hinter das EOI hängen: Nullen, Samsung-Trailer
+# (Motion-Photo-Video + SEFH/SEFT) und beliebige Bytes – Cover bleiben gültig
+TRAILERS = [
+    b'\0' * 64,
+    b'\0\0\0\x18ftypmp42' + b'\xff\xd8\xff\xe1' + b'm' * 200 + b'SEFH' + b'\0' * 16 + b'SEFT',
+    bytes(range(100)),
+]
+
+
+def tiny_jpeg(size=4096, width=600, height=900, trailer=b''):
+    """Minimales JPEG (SOI, SOF0, Kommentar-Padding auf ~size Bytes, SOS mit
+    ein paar Scan-Bytes, EOI, danach trailer). Nicht dekodierbar, aber mit
+    gültiger Segmentstruktur für Größen-/Integritätsprüfungen."""
+    sof = b'\xff\xc0' + struct.pack('>HBHHB', 11, 8, height, width, 1) + b'\x01\x11\x00'
+    sos = b'\xff\xda' + struct.pack('>HB', 8, 1) + b'\x01\x00\x00\x3f\x00' + b'\x12\xff\x00\x34'
+    pad = b''
+    remaining = max(0, size - len(sof) - len(sos) - 4)
+    while remaining > 4:
+        n = min(remaining - 4, 65533)
+        pad += b'\xff\xfe' + struct.pack('>H', n + 2) + b'x' * n
+        remaining -= n + 4
+    return b'\xff\xd8' + sof + pad + sos + b'\xff\xd9' + trailer
+
+
+def make_gallery(root, n, dup_ratio=0.1, sold_ratio=0.1, other_ratio=0.05,
+                 folders=4, depth=2, file_size=4096, seed=1):
+    """Legt n gültige BL-Bilder (order_no(i).jpg) unter root an, verteilt auf
+    `folders` *-images-*-Ordner mit `depth` Unterebenen (jedes 7. mit einem der
+    TRAILERS). Dazu _2/_3-Mehrfachbilder, Nicht-BL-JPGs und ein Verkauft/-Ordner. Gibt die Anzahl der Dateien zurück.
+    Welche Artikel verkauft sind, legt make_inventory mit gleichem sold_ratio fest."""
+    rnd  = random.Random(seed)
+    root = Path(root)
+    data = tiny_jpeg(file_size)
+    # jedes 7. Cover mit Bytes hinter dem EOI
+    tailed = [tiny_jpeg(file_size, trailer=t) for t in TRAILERS]
+    dirs = []
+    for f in range(folders):
+        d = root / f"bl-images-2026-{f + 1:02d}"
+        for level in range(depth):
+            d = d / f"teil-{level}"
+        d.mkdir(parents=True, exist_ok=True)
+        dirs.append(d)
+    (root / "Verkauft").mkdir(parents=True, exist_ok=True)
+
+    count = 0
+    for i in range(n):
+        d = dirs[i % folders]
+        (d / f"{order_no(i)}.jpg").write_bytes(tailed[i // 7 % len(tailed)] if i % 7 == 3 else data)
+        count += 1
+        if rnd.random() < dup_ratio:
+            (d / f"{order_no(i)}_{rnd.randint(2, 3)}.jpg").write_bytes(data)
+            count += 1
+        if rnd.random() < other_ratio:
+            (d / f"IMG_{i:05d}.jpg").write_bytes(data)
+            (d / f"urlaub-{i}.jpg").write_bytes(data)
+            count += 2
+    for i in range(min(n, 50)):
+        (root / "Verkauft" / f"{order_no(n + i)}.jpg").write_bytes(data)
+    return count
+
+
+def make_inventory(n, sold_ratio=0.1, wp_ratio=0.9, seed=1):
+    """Passend zu make_gallery: (active, article_info, wp_links, wp_desc).
+    sold_ratio der Artikel fehlen in active (→ cleanup verschiebt sie)."""
+    rnd = random.Random(seed + 1)
+    article_info, wp_links, wp_desc = {}, {}, {}
+    for i in range(n):
+        if rnd.random() < sold_ratio:
+            continue
+        isbn = isbn_for(i)
+        article_info[order_no(i)] = {'isbn': isbn, 'price': f"{rnd.randint(3, 80)}.{rnd.randint(0, 99):02d}"}
+        if rnd.random() < wp_ratio:
+            wp_links[isbn] = f"https://www.booklooker.de/app/detail.php?id=A0{i:08d}"
+            wp_desc[isbn]  = ' '.join(rnd.choice(LOREM) for _ in range(rnd.randint(12, 40)))
+    return set(article_info), article_info, wp_links, wp_desc
+
+
+def make_wp_page(n_rows, seed=1):
+    """WP-Plugin-Seite mit n_rows Artikel-Zeilen (Tabelle wie wordpress-booklooker-bot).
+    Etwa jede 10. Zeile ohne ISBN, jede 7. mit zu kurzer Beschreibung, jede
+    11. mit 'İ' im Titel (wird beim Kleinschreiben länger) und <TD> ohne Preis."""
+    rnd = random.Random(seed)
+    parts = ['<!DOCTYPE html><html><head><title>Bücher</title></head><body>'
+             '<p>Einleitung mit ISBN: 9999999999 im Fließtext.</p><table class="booklooker">']
+    for i in range(n_rows):
+        isbn = f"ISBN: {isbn_for(i)}" if i % 10 else "ohne ISBN"
+        words = rnd.randint(3, 8) if i % 7 == 0 else rnd.randint(12, 60)
+        desc = ' '.join(rnd.choice(LOREM) for _ in range(words))
+        title = f"Titel Nr. {i}"
+        if i % 11 == 0:
+            title   = f"İstanbul Nr. {i}"
+            desc_td = f'  <TD class="desc"><p>{desc} – ohne Preisangabe</p></TD>\n'
+        else:
+            desc_td = f'  <td class="desc"><p>{desc} – Größe, Übersicht</p>Preis(€): {i % 50 + 3},00<br>Versand(€): 3,00</td>\n'
+        parts.append(
+            f'<TR class="row-{i % 2}">\n'
+            f'  <td class="cover"><img src="https://images.booklooker.de/x/{i}.jpg" alt=""></td>\n'
+            f'  <td class="title"><b>{title}</b><br>{isbn}</td>\n'
+            f'  <td class="link"><a href="#" onClick="window.open(\'https://www.booklooker.de/app/detail.php?id=A0{i:08d}\')">Details</a></td>\n'
+            f'{desc_td}'
+            f'</tr>\n'
+        )
+    parts.append('</table></body></html>')
+    return ''.join(parts)
+
+
+def chunked(text, size):
+    """Text in Stücke zerlegen, wie iter_content(decode_unicode=True) sie liefert."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
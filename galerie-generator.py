@@ -11,16 +11,58 @@ Generiert direkt eine index.html im Stil von wdeu.de/galerie
 import os
 import sys
 import re
+import errno
+import time
 import shutil
+import json
+import argparse
+import io
+import gzip
+import unicodedata
+import base64
+import ftplib
+import posixpath
+import threading
+import hashlib
+import struct
+import select
+import ctypes
+import ctypes.util
+import cProfile
+import pstats
 import configparser
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import requests
+from requests.adapters import HTTPAdapter
+
+# Pillow ist optional – ohne Pillow keine Thumbnails (Galerie nutzt dann die Original-JPGs)
+try:
+    from PIL import Image, ImageOps, features as pil_features
+except ImportError:
+    Image = None
+
+# fontTools ist optional – kürzt die selbst gehostete Schrift (assets = external)
+# auf die benötigten Zeichen; woff2 braucht zusätzlich brotli
+try:
+    from fontTools import subset as ft_subset
+except ImportError:
+    ft_subset = None
+
+# brotli ist optional – ohne nur .gz bei precompress = yes
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # ============================================================
 # KONFIGURATION
 # ============================================================
-CONFIG_FILE = os.path.expanduser("~/.booklooker-sync.ini")
+CONFIG_FILE   = os.path.expanduser("~/.booklooker-sync.ini")
+SNAPSHOT_FILE = os.path.expanduser("~/.booklooker-snapshot.json")   # letzte API-Antwort
+CLEANUP_JOURNAL = os.path.expanduser("~/.booklooker-cleanup-journal.jsonl")   # unterbrochene Bereinigung
 
 # ============================================================
 # FARBEN
@@ -37,6 +79,160 @@ def ok(msg):      print(f"{C.GREEN}✓{C.NC} {msg}")
 def warn(msg):    print(f"{C.YELLOW}⚠{C.NC}  {msg}")
 def err(msg):     print(f"{C.RED}✗{C.NC}  {msg}"); sys.exit(1)
 
+# ============================================================
+# METRIKEN (--metrics / --profile)
+# ============================================================
+try:
+    import resource
+except ImportError:          # Windows
+    resource = None
+try:
+    import fcntl
+except ImportError:          # Windows
+    fcntl = None
+
+
+def peak_rss_mb():
+    """Bisheriger Speicher-Peak des Prozesses in MB (None unter Windows)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)   # macOS: Bytes, Linux: KB
+
+
+class Metrics:
+    """Zählt pro Phase Laufzeit, HTTP-Anfragen/-Bytes, kopierte Dateien und
+    geschriebene Bytes. Zähler landen in der Phase des aufrufenden Threads
+    (Phasen können parallel laufen, siehe run_stages), aus Worker-Threads
+    ohne eigene Phase in der zuletzt begonnenen, noch offenen."""
+
+    COUNTERS = ('http_requests', 'http_bytes', 'files_copied', 'files_linked', 'bytes_written')
+
+    def __init__(self):
+        self.phases  = {}
+        self.started = time.time()
+        self._open   = []
+        self._lock   = threading.Lock()
+        self._local  = threading.local()
+
+    def current(self):
+        """Phase des aufrufenden Threads, sonst die zuletzt begonnene offene."""
+        name = getattr(self._local, 'phase', None)
+        if name is None:
+            with self._lock:
+                name = self._open[-1] if self._open else None
+        return name
+
+    def add(self, key, amount=1, phase=None):
+        phase = phase or self.current()
+        with self._lock:
+            if phase in self._open:
+                counters = self.phases[phase]
+                counters[key] = counters.get(key, 0) + amount
+
+    @contextmanager
+    def phase(self, name, profile_dir=None):
+        """Phase messen; mit profile_dir läuft sie zusätzlich unter cProfile."""
+        with self._lock:
+            self.phases[name] = dict.fromkeys(self.COUNTERS, 0)
+            self._open.append(name)
+        outer = getattr(self._local, 'phase', None)
+        self._local.phase = name
+        profiler = cProfile.Profile() if profile_dir else None
+        t0 = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            self._local.phase = outer
+            with self._lock:
+                self._open.remove(name)
+                self.phases[name]['seconds']     = round(time.perf_counter() - t0, 3)
+                self.phases[name]['peak_rss_mb'] = peak_rss_mb()
+            if profiler:
+                prof_file = Path(profile_dir) / f"profile-{name}.prof"
+                profiler.dump_stats(str(prof_file))
+                log(f"cProfile für Phase '{name}' → {prof_file}")
+                pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+    def report(self):
+        return {
+            'started':       datetime.fromtimestamp(self.started).isoformat(timespec='seconds'),
+            'total_seconds': round(time.time() - self.started, 3),
+            'peak_rss_mb':   peak_rss_mb(),
+            'phases':        self.phases,
+        }
+
+    def write(self, path):
+        path.write_text(json.dumps(self.report(), indent=2), encoding='utf-8')
+
+    def print_summary(self):
+        print(f"  {'Phase':<18} {'Zeit':>8} {'HTTP':>6} {'HTTP-MB':>8} {'Kopiert':>8} {'Geschr.-MB':>10} {'RSS-MB':>7}")
+        for name, p in self.phases.items():
+            print(f"  {name:<18} {p.get('seconds', 0):7.2f}s {p['http_requests']:6d} "
+                  f"{p['http_bytes'] / 1e6:8.2f} {p['files_copied']:8d} "
+                  f"{p['bytes_written'] / 1e6:10.2f} {p.get('peak_rss_mb') or 0:7.1f}")
+
+
+METRICS = Metrics()
+
+# ============================================================
+# PIPELINE-STUFEN (parallel bis zur cleanup-Schranke)
+# ============================================================
+def run_stages(stages, phase, workers=None):
+    """Mini-Scheduler: stages = {name: (fn, [abhängigkeiten])}, fn bekommt die
+    Ergebnisse seiner Abhängigkeiten als Argumente. Jede Stufe startet, sobald
+    ihre Abhängigkeiten fertig sind, und läuft als eigene Metrik-Phase.
+    Gibt (ergebnisse, zeiten) zurück, zeiten = {name: (start, ende)} in
+    Sekunden ab Start. Fehler (auch err()) werden an den Aufrufer weitergereicht."""
+    pending = dict(stages)
+    running = {}
+    results = {}
+    times   = {}
+    t0      = time.perf_counter()
+
+    def task(name, fn, args):
+        start = time.perf_counter() - t0
+        with phase(name):
+            result = fn(*args)
+        times[name] = (start, time.perf_counter() - t0)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers or len(stages)) as pool:
+        while pending or running:
+            for name in [n for n, (_, deps) in pending.items() if all(d in results for d in deps)]:
+                fn, deps = pending.pop(name)
+                running[pool.submit(task, name, fn, [results[d] for d in deps])] = name
+            if not running:
+                raise ValueError(f"Unerfüllbare Abhängigkeiten: {', '.join(pending)}")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                results[running.pop(fut)] = fut.result()
+    return results, times
+
+
+def critical_path(stages, times):
+    """Längste Kette bis zur Schranke: von der zuletzt fertigen Stufe rückwärts
+    jeweils über die zuletzt fertige Abhängigkeit → [namen] in Laufreihenfolge."""
+    name = max(times, key=lambda n: times[n][1])
+    path = [name]
+    while stages[name][1]:
+        name = max(stages[name][1], key=lambda d: times[d][1])
+        path.insert(0, name)
+    return path
+
+
+def report_stages(stages, times):
+    total  = max(end for _, end in times.values())
+    serial = sum(end - start for start, end in times.values())
+    path   = critical_path(stages, times)
+    ok("Stufen: " + ", ".join(f"{n} {times[n][1] - times[n][0]:.2f}s" for n in stages))
+    ok(f"Kritischer Pfad: {' → '.join(path)} = {total:.2f}s "
+       f"(nacheinander wären es {serial:.2f}s)")
+
 # ============================================================
 # CONFIG LADEN
 # ============================================================
@@ -66,6 +262,11 @@ api_key = DEIN_API_KEY_HIER
 # Beispiel: cover_base_url = https://cover.meinedomain.de/
 # cover_base_url =
 
+# Optional: Wie lange (Sekunden) die letzte API-Antwort wiederverwendet wird,
+# bevor Booklooker erneut gefragt wird. 0 = immer frisch abrufen.
+# Mit --offline rendert das Script immer aus dem letzten Snapshot.
+# snapshot_ttl = 300
+
 # Deine Booklooker-Benutzer-ID (7-stellige Nummer, nicht der Username).
 # Wo findest du sie: Mein Depot → Meine Angebote → "Eigene Angebote aus Kundensicht"
 # → in der Adresszeile steht dann: showAlluID=1234567
@@ -89,6 +290,71 @@ api_key = DEIN_API_KEY_HIER
 # [wordpress]
 # url = https://deine-domain.de/deine-buchseite
 # wordpress_mode = yes
+
+# Optional: Upload der fertigen Galerie per --deploy (nur geänderte Dateien).
+# protocol = ftp, ftps, sftp (braucht paramiko) oder local (Ordner, zum Testen)
+# remote   = Zielordner auf dem Server, ohne / am Anfang relativ zum Login-Ordner
+#            (bei local: lokaler Pfad)
+#
+# [ftp]
+# protocol    = sftp
+# host        = home123456.1and1-data.host
+# user        = u12345678
+# password    = GEHEIM
+# remote      = /buecher
+# connections = 4
+
+# Optional: Feintuning für den Galerie-Build.
+# cover_workers      = parallele Abrufe von cover_base_url (Standard: 16)
+# cover_connections  = max. Keep-Alive-Verbindungen pro Host (Standard: = cover_workers)
+# incremental        = yes → images/ nur abgleichen (neu/geändert/verkauft)
+#                      no  → images/ bei jedem Lauf komplett neu kopieren
+# thumbnails         = yes → verkleinerte WebP/AVIF-Varianten + srcset (braucht Pillow, Standard: no)
+# thumb_widths       = Breiten der Varianten in px
+# thumb_formats      = avif, webp und/oder jpeg (nicht unterstützte werden übersprungen)
+# thumb_workers      = parallele Prozesse (Standard: Anzahl CPU-Kerne)
+# render_mode        = inline  → alle Cover direkt in index.html (Standard)
+#                      sharded → Artikelliste als JSON-Seiten in data/, index.html
+#                                rendert nur die sichtbaren Zeilen (für 10.000+ Bücher)
+# shard_size         = Artikel pro JSON-Seite (Standard: 500)
+# cover_cache_mb     = Obergrenze für .cover-cache in MB, älteste zuerst raus (0 = keine)
+# cover_cache_entries= Obergrenze Anzahl Cover im Cache (0 = keine); Cover
+#                      verkaufter Artikel werden immer entfernt
+# link_mode          = auto     → Reflink bzw. Hardlink auf demselben Dateisystem,
+#                                 sonst Kernel-Kopie (Standard)
+#                      reflink / hardlink → nur diese Link-Art, sonst Kopie
+#                      copy     → immer echte Kopien (wenn du Dateien in
+#                                 galerie-output/ von Hand bearbeitest)
+# assets             = inline   → CSS/JS in index.html, Schrift von Google Fonts (Standard)
+#                      external → minifizierte assets/gallery.css + gallery.js, nur
+#                                 das Nötigste fürs erste Bild inline, Raleway
+#                                 selbst gehostet (mit fontTools gekürzt) – keine
+#                                 Anfrage an Dritte beim Seitenaufruf
+# precompress        = yes → index.html, JSON, CSS und JS zusätzlich als .gz (und .br,
+#                            falls brotli installiert ist) mit maximaler
+#                            Kompression ablegen; .htaccess liefert sie aus
+# fingerprint        = yes → Cover, Thumbnails und JSON-Seiten mit Inhalts-Hash im
+#                            Namen (bn00561.3f2a9c01be.jpg) plus _headers/.htaccess
+#                            mit Cache-Control "immutable" – Wiederholungsbesuche
+#                            laden keine Bilder neu (Standard: no)
+# search             = yes → Suchfeld (Bestellnummer, ISBN, Stichwort) und Preisfilter;
+#                            Index in data/search.json, lädt erst bei der ersten
+#                            Suche (Standard: yes)
+# placeholders       = off   → leere Kacheln bis das Cover da ist (Standard)
+#                      color → Kachel in der Hauptfarbe des Covers vorfärben
+#                      blur  → zusätzlich eine winzige, unscharfe Vorschau
+#                              (ca. 200 Byte pro Kachel in index.html; braucht Pillow)
+# watch_refresh      = --watch: API/WP alle N Sekunden neu abfragen (Standard: 900)
+# watch_debounce     = --watch: so viele Sekunden Ruhe abwarten, bevor neu
+#                      gerendert wird (ein BL-Download bringt hunderte Dateien)
+#
+# [galerie]
+# cover_workers     = 16
+# cover_connections = 16
+# incremental       = yes
+# thumbnails        = no
+# thumb_widths      = 160,320,560
+# thumb_formats     = avif,webp
 """)
         err(f"Config erstellt → bitte API-Key eintragen: {CONFIG_FILE}")
 
@@ -99,14 +365,17 @@ api_key = DEIN_API_KEY_HIER
     gallery_path = Path(cfg.get('paths', 'gallery_path', fallback=str(DEFAULT_IN)))
     output_path  = Path(cfg.get('paths', 'output_path',  fallback=str(DEFAULT_OUT)))
 
-    # FTP optional
+    # FTP optional (für --deploy)
     ftp = None
     if cfg.has_section('ftp'):
         ftp = {
-            'host':     cfg.get('ftp', 'host'),
-            'user':     cfg.get('ftp', 'user'),
-            'password': cfg.get('ftp', 'password'),
-            'remote':   cfg.get('ftp', 'remote'),
+            'host':        cfg.get('ftp', 'host', fallback=''),
+            'user':        cfg.get('ftp', 'user', fallback=''),
+            'password':    cfg.get('ftp', 'password', fallback=''),
+            'remote':      cfg.get('ftp', 'remote'),
+            'protocol':    cfg.get('ftp', 'protocol', fallback='ftp').strip().lower(),
+            'port':        cfg.getint('ftp', 'port', fallback=0),
+            'connections': max(1, cfg.getint('ftp', 'connections', fallback=4)),
         }
 
     # WordPress optional
@@ -122,6 +391,56 @@ api_key = DEIN_API_KEY_HIER
 
     seller_id      = cfg.get('booklooker', 'seller_id',      fallback='')
     cover_base_url = cfg.get('booklooker', 'cover_base_url', fallback='')
+    snapshot_ttl   = cfg.getint('booklooker', 'snapshot_ttl', fallback=0)
+
+    # Galerie-Build: Parallelität beim Cover-Abruf
+    cover_workers     = max(1, cfg.getint('galerie', 'cover_workers', fallback=16))
+    cover_connections = max(1, cfg.getint('galerie', 'cover_connections', fallback=cover_workers))
+    incremental       = cfg.getboolean('galerie', 'incremental', fallback=True)
+
+    # Thumbnails (optional, braucht Pillow)
+    thumbnails = None
+    if cfg.getboolean('galerie', 'thumbnails', fallback=False):
+        thumbnails = {
+            'widths':  sorted({int(w) for w in cfg.get('galerie', 'thumb_widths', fallback='160,320,560').split(',') if w.strip()}),
+            'formats': [f.strip().lower() for f in cfg.get('galerie', 'thumb_formats', fallback='avif,webp').split(',') if f.strip()],
+            'workers': cfg.getint('galerie', 'thumb_workers', fallback=os.cpu_count() or 1),
+        }
+
+    # Ausgabe: alles in index.html oder JSON-Shards + virtualisiertes Grid
+    render_mode = cfg.get('galerie', 'render_mode', fallback='inline').strip().lower()
+    if render_mode not in ('inline', 'sharded'):
+        warn(f"Unbekannter render_mode '{render_mode}' → inline")
+        render_mode = 'inline'
+    shard_size = max(1, cfg.getint('galerie', 'shard_size', fallback=500))
+
+    cover_cache_limit = {
+        'mb':      max(0, cfg.getint('galerie', 'cover_cache_mb', fallback=0)),
+        'entries': max(0, cfg.getint('galerie', 'cover_cache_entries', fallback=0)),
+    }
+
+    link_mode = cfg.get('galerie', 'link_mode', fallback='auto').strip().lower()
+    if link_mode not in LINK_MODES:
+        warn(f"Unbekannter link_mode '{link_mode}' → auto")
+        link_mode = 'auto'
+
+    fingerprint = cfg.getboolean('galerie', 'fingerprint', fallback=False)
+    precompress = cfg.getboolean('galerie', 'precompress', fallback=False)
+    search      = cfg.getboolean('galerie', 'search', fallback=True)
+    assets      = cfg.get('galerie', 'assets', fallback='inline').strip().lower()
+    if assets not in ('inline', 'external'):
+        warn(f"Unbekannter assets-Wert '{assets}' → inline")
+        assets = 'inline'
+
+    # Platzhalter für noch nicht geladene Cover
+    placeholders = cfg.get('galerie', 'placeholders', fallback='off').strip().lower()
+    if placeholders not in PLACEHOLDER_MODES:
+        warn(f"Unbekannter placeholders-Wert '{placeholders}' → off")
+        placeholders = 'off'
+
+    # --watch: Intervall für API-Refresh und Ruhezeit nach Dateiereignissen
+    watch_refresh  = max(60, cfg.getint('galerie', 'watch_refresh', fallback=900))
+    watch_debounce = max(0.5, cfg.getfloat('galerie', 'watch_debounce', fallback=3))
 
     return {
         'api_key':        cfg.get('booklooker', 'api_key'),
@@ -133,85 +452,462 @@ api_key = DEIN_API_KEY_HIER
         'order_prefix':   order_prefix,
         'seller_id':      seller_id,
         'cover_base_url': cover_base_url,
+        'snapshot_ttl':   snapshot_ttl,
+        'cover_workers':     cover_workers,
+        'cover_connections': cover_connections,
+        'incremental':       incremental,
+        'thumbnails':        thumbnails,
+        'render_mode':       render_mode,
+        'shard_size':        shard_size,
+        'cover_cache_limit': cover_cache_limit,
+        'link_mode':         link_mode,
+        'placeholders':      placeholders,
+        'fingerprint':       fingerprint,
+        'assets':            assets,
+        'precompress':       precompress,
+        'search':            search,
+        'watch_refresh':     watch_refresh,
+        'watch_debounce':    watch_debounce,
     }
 
+# ============================================================
+# DATEI-HILFSFUNKTIONEN
+# ============================================================
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-1 des Dateiinhalts (hex), blockweise gelesen."""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+FINGERPRINT_LEN = 10   # Hex-Zeichen des SHA-1 in Dateinamen (fingerprint = yes)
+
+
+def hashed_name(name, digest):
+    """bn00561.jpg + SHA-1 → bn00561.3f2a9c01be.jpg (Cache-Busting: neuer
+    Inhalt, neue URL – alte Namen dürfen ewig gecacht werden)."""
+    stem, dot, ext = name.rpartition('.')
+    return f"{stem}.{digest[:FINGERPRINT_LEN]}.{ext}" if dot else f"{name}.{digest[:FINGERPRINT_LEN]}"
+
+
+def _json_body(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_json_atomic(path, data, body=None):
+    """JSON über Temp-Datei + os.replace schreiben (kein halbes File bei Abbruch).
+    body: schon serialisiertes data (z.B. weil der Hash in den Namen eingeht)."""
+    tmp  = path.with_name(path.name + '.tmp')
+    body = _json_body(data) if body is None else body
+    tmp.write_bytes(body)
+    os.replace(str(tmp), str(path))
+    METRICS.add('bytes_written', len(body))
+
+
+def _write_text_atomic(path, parts, buffering=1 << 16):
+    """Textstücke aus parts (z.B. einem Generator) nacheinander in eine
+    Temp-Datei schreiben und per os.replace an ihren Platz bringen – das
+    Dokument liegt nie als Ganzes im Speicher."""
+    tmp = path.with_name('.' + path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8', buffering=buffering) as f:
+        for part in parts:
+            f.write(part)
+    os.replace(str(tmp), str(path))
+    METRICS.add('bytes_written', path.stat().st_size)
+
+
+def _read_json(path, default):
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return default
+
+
+# Wie Bilder in den Output kommen (link_mode in [galerie])
+LINK_MODES  = ('auto', 'reflink', 'hardlink', 'copy')
+FICLONE     = 0x40049409   # Linux-ioctl für Reflinks (btrfs, XFS, bcachefs)
+_NO_REFLINK = set()        # st_dev ohne Reflink-Unterstützung – nicht bei jeder Datei neu probieren
+
+
+def _reflink(src, dest):
+    """Copy-on-Write-Klon: teilt die Datenblöcke, bis eine Seite geändert wird."""
+    if sys.platform == 'darwin':   # APFS
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        if libc.clonefile(os.fsencode(str(src)), os.fsencode(str(dest)), 0) != 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        return
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "Reflink nicht unterstützt")
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+
+
+def _kernel_copy(src, dest):
+    """Kopie ohne Umweg über Python-Puffer: copy_file_range, sonst sendfile
+    (Linux), sonst shutil. Gibt die verwendete Strategie zurück."""
+    with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+        i, o = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(i).st_size
+        calls = []
+        if hasattr(os, 'copy_file_range'):
+            calls.append(('copy_file_range', lambda done: os.copy_file_range(i, o, size - done, done, done)))
+        if sys.platform.startswith('linux'):
+            calls.append(('sendfile', lambda done: os.sendfile(o, i, done, size - done)))
+        for via, call in calls:
+            try:
+                done = 0
+                while done < size:
+                    n = call(done)
+                    if n == 0:
+                        break
+                    done += n
+                if done == size:
+                    return via
+            except OSError:
+                pass
+            fdst.seek(0)
+            fdst.truncate()
+        fsrc.seek(0)
+        shutil.copyfileobj(fsrc, fdst, 1 << 20)
+    return 'copy'
+
+
+def materialize(src, dest, mode='auto'):
+    """Legt dest als Abbild von src an (atomar über Temp-Datei + os.replace).
+    auto: Reflink, sonst Hardlink – beides nur auf demselben Dateisystem und
+    fast nur Metadaten –, sonst Kernel-Kopie. 'reflink'/'hardlink' erzwingen
+    die eine Link-Art (mit Kopie als Fallback), 'copy' kopiert immer.
+    Gibt die Strategie zurück: reflink, hardlink, copy_file_range, sendfile, copy."""
+    tmp = dest.with_name('.' + dest.name + '.tmp')
+    if os.path.lexists(str(tmp)):
+        tmp.unlink()
+    dev = os.stat(str(src)).st_dev
+    same_fs = mode != 'copy' and dev == os.stat(str(dest.parent)).st_dev
+    via = None
+    if same_fs and mode in ('auto', 'reflink') and dev not in _NO_REFLINK:
+        try:
+            _reflink(src, tmp)
+            shutil.copystat(str(src), str(tmp))
+            via = 'reflink'
+        except OSError:
+            _NO_REFLINK.add(dev)
+            if os.path.lexists(str(tmp)):
+                tmp.unlink()
+    if via is None and same_fs and mode in ('auto', 'hardlink'):
+        try:
+            os.link(str(src), str(tmp))
+            via = 'hardlink'
+        except OSError:
+            pass
+    if via is None:
+        via = _kernel_copy(src, tmp)
+        shutil.copystat(str(src), str(tmp))
+    os.replace(str(tmp), str(dest))
+    if via in ('reflink', 'hardlink'):
+        METRICS.add('files_linked')
+    else:
+        METRICS.add('files_copied')
+        METRICS.add('bytes_written', dest.stat().st_size)
+    return via
+
+
+def _copy_atomic(src, dest):
+    """Echte Kopie (eigene Datenblöcke), z.B. für Deploy-Ziele."""
+    return materialize(src, dest, 'copy')
+
+# ============================================================
+# HTTP-SESSION
+# ============================================================
+class CountingSession(requests.Session):
+    """Session, die Anfragen und Antwort-Bytes in METRICS mitzählt
+    (bei stream=True zählt der Aufrufer die Bytes selbst). Gezählt wird für
+    die Phase, in der die Session angelegt wurde – auch wenn Worker-Threads
+    sie benutzen, während parallel andere Phasen laufen."""
+
+    def __init__(self):
+        super().__init__()
+        self.metrics_phase = METRICS.current()
+
+    def request(self, *args, **kwargs):
+        r = super().request(*args, **kwargs)
+        METRICS.add('http_requests', phase=self.metrics_phase)
+        if not kwargs.get('stream'):
+            METRICS.add('http_bytes', len(r.content), phase=self.metrics_phase)
+        return r
+
+
+def make_session(max_per_host=10):
+    """requests.Session mit Keep-Alive-Pool.
+    max_per_host begrenzt die gleichzeitigen Verbindungen je Host
+    (pool_block: weitere Threads warten, statt Extra-Verbindungen zu öffnen)."""
+    session = CountingSession()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_per_host, pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://',  adapter)
+    return session
+
+# ============================================================
+# ARTIKELTABELLE
+# ============================================================
+def parse_price(text):
+    """API-Preis ('12.5') → float, None wenn leer oder unlesbar."""
+    try:
+        return float(text) if text else None
+    except ValueError:
+        return None
+
+
+class Article:
+    """Ein aktiver Artikel. price ist schon geparst (None = unbekannt),
+    href/desc hängt ArticleTable.attach_wp von der WP-Seite an."""
+
+    __slots__ = ('order_no', 'isbn', 'price', 'href', 'desc')
+
+    def __init__(self, order_no, isbn='', price=None):
+        self.order_no = order_no
+        self.isbn     = isbn
+        self.price    = price
+        self.href     = None
+        self.desc     = ''
+
+    @property
+    def price_text(self):
+        """'12,50 €' für das Preis-Overlay, leer ohne Preis."""
+        return f"{self.price:.2f} €".replace('.', ',') if self.price is not None else ''
+
+
+class ArticleTable:
+    """Alle aktiven Artikel in einer Struktur für alle Stufen: get_article_data
+    füllt sie, attach_wp verknüpft die WP-Daten einmalig per ISBN, cleanup
+    fragt nur `in` ab, generate_html liest die fertigen Datensätze.
+    Verhält sich wie ein Mapping orderNo → Article."""
+
+    def __init__(self, articles=()):
+        self.by_order = {a.order_no: a for a in articles}
+
+    def __len__(self):
+        return len(self.by_order)
+
+    def __iter__(self):
+        return iter(self.by_order)
+
+    def __contains__(self, order_no):
+        return order_no in self.by_order
+
+    def get(self, order_no, default=None):
+        return self.by_order.get(order_no, default)
+
+    def keys(self):
+        return self.by_order.keys()
+
+    def attach_wp(self, wp_links, wp_desc):
+        """Detail-Links und Beschreibungen (beide nach ISBN) an die Artikel
+        hängen; ersetzt frühere WP-Daten. Gibt die Anzahl verlinkter Artikel zurück."""
+        linked = 0
+        for a in self.by_order.values():
+            a.href = wp_links.get(a.isbn) if a.isbn else None
+            a.desc = wp_desc.get(a.isbn, '') if a.isbn else ''
+            linked += a.href is not None
+        return linked
+
+    @classmethod
+    def from_info(cls, article_info):
+        """Aus dem Snapshot-Format orderNo → {'isbn', 'price'}."""
+        return cls(Article(order_no, info.get('isbn', ''), parse_price(info.get('price', '')))
+                   for order_no, info in article_info.items())
+
+    def to_info(self):
+        """Ins Snapshot-Format (kompatibel zu älteren Snapshots)."""
+        return {a.order_no: {'isbn': a.isbn, 'price': '' if a.price is None else f"{a.price:.2f}"}
+                for a in self.by_order.values()}
+
+
+def parse_article_lists(order_text, price_text='', isbn_text=''):
+    """Die drei article_list-Antworten → ArticleTable: orderNo-Liste,
+    'orderNo<TAB>Preis' je Zeile und ISBNs in derselben Reihenfolge wie die
+    orderNo-Liste. Normalisiert und parst jeden Wert genau einmal."""
+    articles = [Article(line.strip().upper()) for line in order_text.strip().split('\n') if line.strip()]
+    table    = ArticleTable(articles)
+    ok(f"Aktive Artikel: {len(table)}")
+
+    priced = 0
+    for line in price_text.strip().split('\n'):
+        parts   = line.strip().split('\t')
+        article = table.get(parts[0].strip().upper())
+        if article is not None and len(parts) > 1:
+            article.price = parse_price(parts[1].strip())
+            priced += 1
+    ok(f"Preise geladen: {priced} Einträge")
+
+    if isbn_text.strip():
+        for article, isbn in zip(articles, isbn_text.strip().split('\n')):
+            article.isbn = isbn.strip()
+    ok(f"ISBNs geladen: {sum(1 for a in articles if a.isbn)} mit ISBN")
+    return table
+
 # ============================================================
 # BOOKLOOKER API
 # ============================================================
-def get_article_data(api_key):
-    """Holt orderNo, ISBN und Preis pro Artikel. Gibt zurück:
-       articles_set  – set aller orderNos (für cleanup)
-       article_info  – dict: orderNo → {'isbn': ..., 'price': ...}
+API_URL = "https://api.booklooker.de/2.0"
+
+
+def _article_list(session, token, params):
+    r = session.get(f"{API_URL}/article_list", params={'token': token, **params}, timeout=30)
+    return r.json()
+
+
+def _load_snapshot():
+    """Letzten API-Snapshot lesen → (alter_in_sekunden, article_info) oder (None, None)."""
+    snap = _read_json(Path(SNAPSHOT_FILE), None)
+    if not snap or 'article_info' not in snap:
+        return None, None
+    return time.time() - snap.get('time', 0), snap['article_info']
+
+
+def get_article_data(api_key, snapshot_ttl=0, offline=False):
+    """Holt orderNo, ISBN und Preis pro Artikel → ArticleTable.
+    Ist der letzte Snapshot jünger als snapshot_ttl Sekunden (oder offline=True),
+    wird er ohne API-Zugriff verwendet.
     """
-    log("Authentifiziere bei Booklooker...")
-    r = requests.post(
-        "https://api.booklooker.de/2.0/authenticate",
-        params={'apiKey': api_key}, timeout=10
-    )
-    data = r.json()
-    if data['status'] != 'OK':
-        err(f"Auth fehlgeschlagen: {data['returnValue']}")
-    token = data['returnValue']
-    ok(f"Token: {token[:20]}...")
-
-    # Aufruf 1: orderNo-Liste
-    log("Hole Artikelliste (orderNo)...")
-    r = requests.get(
-        "https://api.booklooker.de/2.0/article_list",
-        params={'token': token, 'field': 'orderNo'}, timeout=30
-    )
-    data = r.json()
+    if offline or snapshot_ttl > 0:
+        age, article_info = _load_snapshot()
+        if offline and article_info is None:
+            err(f"--offline: kein API-Snapshot vorhanden ({SNAPSHOT_FILE})")
+        if article_info is not None and (offline or age < snapshot_ttl):
+            ok(f"API-Snapshot von vor {int(age // 60)} min: {len(article_info)} Artikel "
+               f"({'offline' if offline else f'TTL {snapshot_ttl}s'})")
+            return ArticleTable.from_info(article_info)
+
+    with make_session(3) as session:
+        log("Authentifiziere bei Booklooker...")
+        r = session.post(f"{API_URL}/authenticate", params={'apiKey': api_key}, timeout=10)
+        data = r.json()
+        if data['status'] != 'OK':
+            err(f"Auth fehlgeschlagen: {data['returnValue']}")
+        token = data['returnValue']
+        ok(f"Token: {token[:20]}...")
+
+        # Drei unabhängige article_list-Aufrufe gleichzeitig über dieselbe Session:
+        # orderNo-Liste, orderNo + Preis, ISBN (gleiche Reihenfolge wie orderNo)
+        log("Hole Artikelliste, Preise und ISBNs (parallel) ...")
+        calls = {
+            'orderNo': {'field': 'orderNo'},
+            'price':   {'field': 'orderNo', 'showPrice': 1, 'mediaType': 0},
+            'isbn':    {'field': 'isbn', 'mediaType': 0},
+        }
+        with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+            futures = {key: pool.submit(_article_list, session, token, params)
+                       for key, params in calls.items()}
+            results = {key: fut.result() for key, fut in futures.items()}
+
+    data = results['orderNo']
     if data['status'] != 'OK':
         err(f"Artikelliste fehlgeschlagen: {data['returnValue']}")
-    order_nos = [a.strip().upper() for a in data['returnValue'].strip().split('\n') if a.strip()]
-    ok(f"Aktive Artikel: {len(order_nos)}")
-
-    # Aufruf 2: orderNo + Preis (gleiche Reihenfolge wie Aufruf 1)
-    log("Hole Preise...")
-    r = requests.get(
-        "https://api.booklooker.de/2.0/article_list",
-        params={'token': token, 'field': 'orderNo', 'showPrice': 1, 'mediaType': 0}, timeout=30
-    )
-    data = r.json()
-    price_map = {}  # orderNo → price
-    if data['status'] == 'OK' and data['returnValue'].strip():
-        for line in data['returnValue'].strip().split('\n'):
-            parts = line.strip().split('\t')
-            if parts:
-                ono = parts[0].strip().upper()
-                price = parts[1].strip() if len(parts) > 1 else ''
-                price_map[ono] = price
-    ok(f"Preise geladen: {len(price_map)} Einträge")
-
-    # Aufruf 3: ISBN (gleiche Reihenfolge wie Aufruf 1)
-    log("Hole ISBNs...")
-    r = requests.get(
-        "https://api.booklooker.de/2.0/article_list",
-        params={'token': token, 'field': 'isbn', 'mediaType': 0}, timeout=30
-    )
-    data = r.json()
-    isbn_map = {}  # orderNo → isbn (per Index, gleiche Reihenfolge)
-    if data['status'] == 'OK' and data['returnValue'].strip():
-        isbn_lines = [l.strip() for l in data['returnValue'].strip().split('\n')]
-        for i, order_no in enumerate(order_nos):
-            if i < len(isbn_lines):
-                isbn_map[order_no] = isbn_lines[i].strip()
-    ok(f"ISBNs geladen: {len([v for v in isbn_map.values() if v])} mit ISBN")
-
-    # Zusammenführen
-    article_info = {}
-    for order_no in order_nos:
-        article_info[order_no] = {
-            'isbn':  isbn_map.get(order_no, ''),
-            'price': price_map.get(order_no, ''),
-        }
+    texts = {key: results[key]['returnValue'] if results[key]['status'] == 'OK' else ''
+             for key in ('price', 'isbn')}
+    articles = parse_article_lists(data['returnValue'], texts['price'], texts['isbn'])
+
+    # Snapshot für --offline und snapshot_ttl
+    _write_json_atomic(Path(SNAPSHOT_FILE), {'time': time.time(), 'article_info': articles.to_info()})
 
-    return set(order_nos), article_info
+    return articles
 
 
 # ============================================================
 # WP-SEITE PARSEN → ISBN → detail-URL + Beschreibung
 # ============================================================
+# Das Plugin rendert eine Tabelle; jeder Artikel-Block beginnt mit <tr.
+# Pro Block: ISBN, onClick-Detail-URL und der längste <td>-Inhalt (= Beschreibung).
+WP_CHUNK     = 64 * 1024
+WP_ROW_START = re.compile(r'<tr[\s>]', re.IGNORECASE)
+WP_ISBN      = re.compile(r'ISBN:\s*(\d{10,13})')
+WP_DETAIL    = re.compile(r"onClick=\"window\.open\('(https://www\.booklooker\.de/app/detail\.php\?id=[^']+)'\)\"")
+WP_TD_TAG    = re.compile(r'<(?:(td)|/td>)', re.IGNORECASE)   # <td bzw. </td>, auf dem Originaltext
+WP_TAG       = re.compile(r'<[^>]+>')
+
+
+def iter_wp_blocks(chunks):
+    """Zerlegt einen gestreamten Text in Artikel-Blöcke – dieselben Blöcke wie
+    re.split(r'<tr[\\s>]', html), aber ohne die ganze Seite im Speicher.
+    Jeder Block wird geliefert, sobald der nächste <tr gesehen wurde."""
+    buf = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # Rest des letzten Chunks + neuer Chunk; '<tr' + Trennzeichen kann über
+        # die Chunk-Grenze reichen, daher ab den letzten 3 Zeichen weitersuchen
+        scan  = max(0, len(buf) - 3)
+        buf  += chunk
+        start = 0
+        while True:
+            m = WP_ROW_START.search(buf, scan)
+            if not m:
+                break
+            yield buf[start:m.start()]
+            start = scan = m.end()
+        buf = buf[start:]
+    yield buf
+
+
+def _longest_td(block):
+    """Längster <td>-Inhalt (erster bei Gleichstand) in einem Durchlauf über
+    die Tags – dieselben Treffer wie <td[^>]*>(.*?)</td> (DOTALL, IGNORECASE):
+    ein <td> ist ab dem nächsten '>' offen, ein </td> davor gehört noch zum
+    Tag, ein <td> innerhalb eines offenen <td> zum Inhalt."""
+    longest  = None
+    open_end = -1                 # Ende des öffnenden Tags, -1 = kein <td> offen
+    for m in WP_TD_TAG.finditer(block):
+        if m.lastindex:           # <td
+            if open_end < 0:
+                open_end = block.find('>', m.end())
+        elif 0 <= open_end < m.start():
+            if longest is None or m.start() - open_end - 1 > len(longest):
+                longest = block[open_end + 1:m.start()]
+            open_end = -1
+    return longest
+
+
+def iter_wp_records(chunks):
+    """Liefert (isbn, detail_url | None, beschreibung | None) pro Artikel-Block."""
+    for block in iter_wp_blocks(chunks):
+        isbn_m = WP_ISBN.search(block)
+        if not isbn_m:
+            continue
+        isbn = isbn_m.group(1).strip()
+
+        url_m = WP_DETAIL.search(block)
+        url   = url_m.group(1) if url_m else None
+
+        # Beschreibungstext: längster <td>-Inhalt im Block
+        longest = _longest_td(block)
+        desc = None
+        if longest is not None:
+            text = WP_TAG.sub('', longest)             # HTML-Tags entfernen
+            cut  = text.find('Preis(')                 # Preis(€): … Versand(€): … abschneiden
+            if cut >= 0:
+                text = text[:cut]
+            text = ' '.join(text.split()).strip()      # Whitespace normalisieren
+            if len(text) > 30:                         # nur echte Beschreibungen
+                desc = text
+
+        yield isbn, url, desc
+
+
+def parse_wp_stream(chunks):
+    """Baut aus einem Text-Stream der WP-Seite (wp_links, wp_desc)."""
+    wp_links = {}
+    wp_desc  = {}
+    for isbn, url, desc in iter_wp_records(chunks):
+        if url:
+            wp_links[isbn] = url
+        if desc:
+            wp_desc[isbn] = desc
+    return wp_links, wp_desc
+
+
 def get_wp_data(wp_url=None):
     """Liest WP-Seite und baut zwei Dicts:
        wp_links  – isbn → booklooker-detail-URL
@@ -223,62 +919,18 @@ def get_wp_data(wp_url=None):
 
     log(f"Lese WP-Seite: {wp_url} ...")
     try:
-        r = requests.get(wp_url, timeout=20)
-        r.raise_for_status()
-        r.encoding = 'utf-8'   # Encoding-Fix: verhindert Ã¼ statt ü
+        with make_session(1) as session:
+            r = session.get(wp_url, timeout=20, stream=True)
+            r.raise_for_status()
+            r.encoding = 'utf-8'   # Encoding-Fix: verhindert Ã¼ statt ü
+            # Seite wird blockweise geparst, während sie noch geladen wird
+            with r:
+                wp_links, wp_desc = parse_wp_stream(r.iter_content(chunk_size=WP_CHUNK, decode_unicode=True))
+                METRICS.add('http_bytes', r.raw.tell())
     except Exception as e:
         warn(f"WP-Seite nicht erreichbar: {e} → Cover-Links fallen weg")
         return {}, {}
 
-    html = r.text
-
-    # ── Detail-URLs ──────────────────────────────────────────
-    # onClick="window.open('https://www.booklooker.de/app/detail.php?id=...')"
-    detail_urls = re.findall(
-        r"onClick=\"window\.open\('(https://www\.booklooker\.de/app/detail\.php\?id=[^']+)'\)\"",
-        html
-    )
-
-    # ── ISBNs ────────────────────────────────────────────────
-    # Reihenfolge muss mit detail_urls übereinstimmen →
-    # wir parsen Artikel-Blöcke strukturiert
-    # Jeder Artikel-Block: <tr> … ISBN: XXXX … onClick … Beschreibung …
-    # Da das Plugin eine Tabelle rendert, splitten wir nach <tr
-    blocks = re.split(r'<tr[\s>]', html, flags=re.IGNORECASE)
-
-    wp_links = {}
-    wp_desc  = {}
-
-    for block in blocks:
-        # ISBN im Block
-        isbn_m = re.search(r'ISBN:\s*(\d{10,13})', block)
-        if not isbn_m:
-            continue
-        isbn = isbn_m.group(1).strip()
-
-        # Detail-URL im Block
-        url_m = re.search(
-            r"onClick=\"window\.open\('(https://www\.booklooker\.de/app/detail\.php\?id=[^']+)'\)\"",
-            block
-        )
-        if url_m:
-            wp_links[isbn] = url_m.group(1)
-
-        # Beschreibungstext: letztes <td> im Block (4. Spalte = Beschreibung)
-        # Wir nehmen den längsten Text-Inhalt eines <td> im Block
-        tds = re.findall(r'<td[^>]*>(.*?)</td>', block, re.DOTALL | re.IGNORECASE)
-        if tds:
-            # Längsten td-Inhalt nehmen (= Beschreibung)
-            longest = max(tds, key=len)
-            # HTML-Tags entfernen
-            desc = re.sub(r'<[^>]+>', '', longest)
-            # Preis-Zeilen herausfiltern (Preis(€): … Versand(€): …)
-            desc = re.sub(r'Preis\(.*', '', desc, flags=re.DOTALL)
-            # Whitespace normalisieren
-            desc = ' '.join(desc.split()).strip()
-            if len(desc) > 30:   # nur echte Beschreibungen
-                wp_desc[isbn] = desc
-
     ok(f"WP-Links: {len(wp_links)} ISBN→URL Paare, {len(wp_desc)} Beschreibungen geladen")
     return wp_links, wp_desc
 
@@ -288,6 +940,104 @@ def get_wp_links(wp_url=None):
     links, _ = get_wp_data(wp_url)
     return links
 
+# ============================================================
+# DATEIINDEX DES BILDORDNERS
+# ============================================================
+# Ordner, in die der Scan gar nicht erst hineinläuft (überall im Baum)
+SCAN_EXCLUDE = {'galerie-output', '.cover-cache', '.thumb-cache', '.font-cache'}
+
+
+class GalleryIndex:
+    """Index aller *.jpg unter root – einmal gescannt, von cleanup und
+    generate_html gemeinsam genutzt und bei Löschen/Verschieben fortgeschrieben.
+    dirs: {relativer ordner: {'mtime': ns, 'files': {name: [size, mtime]}, 'subdirs': [...]}}"""
+
+    def __init__(self, root, dirs):
+        self.root = root
+        self.dirs = dirs
+
+    def __len__(self):
+        return sum(len(d['files']) for d in self.dirs.values())
+
+    def entries(self):
+        """(Pfad, Größe, mtime) aller JPGs."""
+        for rel, d in self.dirs.items():
+            base = self.root / rel if rel else self.root
+            for name, (size, mtime) in d['files'].items():
+                yield base / name, size, mtime
+
+    def jpgs(self):
+        return [path for path, _, _ in self.entries()]
+
+    def by_order(self, order_prefix=None):
+        """Bestellnummer → (Pfad, Größe, mtime) für alle gültigen BL-Bilder."""
+        index = {}
+        for path, size, mtime in self.entries():
+            valid, order_no = is_valid(path.name, order_prefix)
+            if valid:
+                index[order_no] = (path, size, mtime)
+        return index
+
+    def discard(self, path):
+        """Datei aus dem Index nehmen (gelöscht oder nach Verkauft/ verschoben)."""
+        rel = os.path.relpath(str(path.parent), str(self.root))
+        d = self.dirs.get('' if rel == '.' else rel)
+        if d:
+            d['files'].pop(path.name, None)
+
+    def save(self, cache_file):
+        _write_json_atomic(cache_file, {'version': 1, 'root': str(self.root), 'dirs': self.dirs})
+
+
+def scan_gallery(root, cache_file=None, stale_dirs=()):
+    """Scannt root per os.scandir; Verkauft/ (direkt unter root) und
+    SCAN_EXCLUDE-Ordner werden beim Abstieg übersprungen. Mit cache_file wird
+    der Index des letzten Laufs wiederverwendet: nur Ordner, deren mtime sich
+    geändert hat, werden neu gelesen. stale_dirs: Ordner (Pfade), die trotzdem
+    neu gelesen werden – eine an Ort und Stelle überschriebene Datei ändert
+    die mtime ihres Ordners nicht."""
+    cached = _read_json(cache_file, {}) if cache_file else {}
+    old    = cached.get('dirs', {}) if cached.get('root') == str(root) else {}
+    stale  = {os.path.normpath(str(p)) for p in stale_dirs}
+    dirs   = {}
+    fresh  = time.time_ns() - 2 * 10**9   # jüngere Ordner-mtimes nicht cachen (Zeitauflösung)
+    reread = 0
+
+    stack = ['']
+    while stack:
+        rel  = stack.pop()
+        path = os.path.join(str(root), rel)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            continue
+        entry = old.get(rel)
+        if entry is None or entry['mtime'] != mtime or os.path.normpath(path) in stale:
+            reread += 1
+            files, subdirs = {}, []
+            try:
+                with os.scandir(path) as it:
+                    for e in it:
+                        if e.is_dir(follow_symlinks=False):
+                            if e.name in SCAN_EXCLUDE or (rel == '' and e.name == 'Verkauft'):
+                                continue
+                            subdirs.append(e.name)
+                        elif e.name.endswith('.jpg') and e.is_file():
+                            st = e.stat()
+                            files[e.name] = [st.st_size, st.st_mtime]
+            except OSError as e:
+                warn(f"Ordner nicht lesbar: {path} ({e})")
+            entry = {'mtime': mtime if mtime < fresh else None, 'files': files, 'subdirs': subdirs}
+        dirs[rel] = entry
+        stack.extend(os.path.join(rel, d) if rel else d for d in entry['subdirs'])
+
+    index = GalleryIndex(root, dirs)
+    if cache_file:
+        index.save(cache_file)
+    ok(f"Dateiindex: {len(index)} JPGs in {len(dirs)} Ordnern "
+       f"({reread} neu gelesen, {len(dirs) - reread} aus dem Index)")
+    return index
+
 # ============================================================
 # BILDER BEREINIGEN
 # ============================================================
@@ -305,289 +1055,1615 @@ def is_valid(filename, order_prefix=None):
         return True, stem.upper()
     return False, None
 
-def cleanup(gallery_path, active_articles, order_prefix=None):
+def plan_cleanup(gallery_path, active_articles, order_prefix=None, index=None, paths=None):
+    """Erstellt den kompletten Plan, ohne etwas anzufassen → (plan, geprüft, ignoriert).
+    plan = [(op, quelle, ziel)]: 'delete' für Mehrfachbilder (Ziel = None),
+    'move' für verkaufte Artikel nach Verkauft/."""
     sold_dir = gallery_path / "Verkauft"
-    sold_dir.mkdir(exist_ok=True)
-
-    moved = cleaned = skipped = 0
-    # Rekursiv in allen Unterordnern suchen, Verkauft-Ordner ausschließen
-    images = sorted(
-        [f for f in gallery_path.rglob("*.jpg")
-          if sold_dir not in f.parents
-          and "galerie-output" not in f.parts],
-        key=lambda f: f.name.upper(), reverse=True
-    )
-
-    log(f"Bereinige {len(images)} JPGs in {gallery_path} (inkl. Unterordner) ...")
-    log(f"Erkannte Präfixe: {', '.join(order_prefix or ['BN','BLX'])}")
+    # Rekursiv in allen Unterordnern (aus dem Dateiindex), Verkauft-Ordner ausgeschlossen
+    if index is None:
+        index = scan_gallery(gallery_path)
+    images = index.jpgs() if paths is None else [p for p in paths if p.exists()]
+    images = sorted(images, key=lambda f: f.name.upper(), reverse=True)
 
+    plan, skipped = [], 0
     for img in images:
+        stem = Path(img.name).stem
+        dup  = re.search(r'_\d+$', stem)
+        if dup:
+            # Mehrfachbild (_2, _3 …) einer Bestellnummer → löschen;
+            # IMG_0001.jpg & Co. sind keine und bleiben unangetastet
+            if is_valid(stem[:dup.start()] + img.suffix, order_prefix)[0]:
+                plan.append(('delete', img, None))
+            else:
+                skipped += 1
+            continue
         valid, article_no = is_valid(img.name, order_prefix)
-
         if not valid:
             # Kein BL-Bild → unangetastet lassen
             skipped += 1
-            continue
+        elif article_no not in active_articles:
+            plan.append(('move', img, sold_dir / img.name))
+    return plan, len(images), skipped
 
-        if re.search(r'_\d+$', Path(img.name).stem):
-            warn(f"Lösche Mehrfachbild: {img.name}")
-            img.unlink()
-            cleaned += 1
-            continue
 
-        if article_no not in active_articles:
-            target = sold_dir / img.name
-            if target.exists():
-                target.unlink()
-            warn(f"Verschiebe verkauft: {img.name}")
-            shutil.move(str(img), str(target))
-            moved += 1
+class CleanupJournal:
+    """Journal für apply_cleanup (JSON Lines): erste Zeile der komplette Plan
+    samt Papierkorb-Ordner, danach je erledigter Aktion {"i": nummer}. Bleibt
+    nach einem Abbruch liegen; der nächste Lauf setzt fort, --rollback-cleanup
+    dreht zurück. Gelöschte Mehrfachbilder und überschriebene Dateien in
+    Verkauft/ liegen bis zum Abschluss unter festem Namen im Papierkorb."""
 
-    ok(f"Bereinigt: {cleaned} Mehrfachbilder gelöscht, {moved} verkaufte verschoben, {skipped} Nicht-BL-Dateien ignoriert")
-    return moved, cleaned
+    SYNC_EVERY = 256   # fsync nach so vielen Aktionen
 
-# ============================================================
-# HTML GENERIEREN
-# ============================================================
-def generate_html(gallery_path, output_path, article_info=None, wp_links=None, order_prefix=None, wp_desc=None, seller_id='', cover_base_url=''):
-    if order_prefix is None:
-        order_prefix = ['BN', 'BLX']
+    def __init__(self, path):
+        self.path = Path(path)
+        self.fh   = None
 
-    article_info = article_info or {}
-    wp_links     = wp_links     or {}
-    wp_desc      = wp_desc      or {}
+    def exists(self):
+        return self.path.exists()
 
-    # Fallback-URL wenn kein Direktlink verfügbar
-    if seller_id:
-        FALLBACK_URL = f"https://www.booklooker.de/B%C3%BCcher/Angebote/showAlluID={seller_id}?setMediaType=0&sortOrder=offerDate&sortDirection=desc"
-    else:
-        FALLBACK_URL = "https://www.booklooker.de/"
+    def start(self, plan, trash):
+        self.path.write_text(json.dumps({
+            'trash': str(trash),
+            'plan':  [[op, str(src), str(dest) if dest else None] for op, src, dest in plan],
+        }) + '\n', encoding='utf-8')
+        self.fh = open(self.path, 'a', encoding='utf-8')
 
-    # a) Output-Ordner anlegen
-    output_path.mkdir(parents=True, exist_ok=True)
-    images_out = output_path / "images"
-    if images_out.exists():
-        shutil.rmtree(str(images_out))
-    images_out.mkdir()
+    def load(self):
+        """→ (plan, papierkorb, erledigte nummern) eines liegengebliebenen Journals."""
+        done = set()
+        with open(self.path, encoding='utf-8') as f:
+            head = json.loads(f.readline())
+            for line in f:
+                try:
+                    done.add(json.loads(line)['i'])
+                except (ValueError, KeyError):
+                    break   # halb geschriebene letzte Zeile
+        plan = [(op, Path(src), Path(dest) if dest else None) for op, src, dest in head['plan']]
+        self.fh = open(self.path, 'a', encoding='utf-8')
+        return plan, Path(head['trash']), done
 
-    # Favicon kopieren falls vorhanden
-    favicon_src = Path(__file__).parent / "favicon.png"
-    if favicon_src.exists():
-        shutil.copy2(str(favicon_src), str(output_path / "favicon.png"))
-        ok("favicon.png kopiert")
+    def record(self, i):
+        self.fh.write(f'{{"i": {i}}}\n')
+        if i % self.SYNC_EVERY == 0:
+            self.sync()
 
-    # Cover-Quelle: cover_base_url (cover.wdeu.de) hat VORRANG vor dem lokalen
-    # BL-Bilder-Download. So darf die Galerie schöner sein als die BL-Anzeige:
-    # liegt auf cover.wdeu.de ein {Nr}.jpg (z.B. neu hochgeladenes Porträt),
-    # wird dieses genommen; sonst das lokale BL-Download-Bild (i.d.R. das alte
-    # Schrägfoto). Das umgeht den BL-Cover-Cache komplett — für die Galerie.
-    sold_dir = gallery_path / "Verkauft"
-    local_images = {}   # {nr}.jpg (lowercase) -> Pfad des lokalen BL-Bilds
-    for f in gallery_path.rglob("*.jpg"):
-        if (is_valid(f.name, order_prefix)[0]
-                and "galerie-output" not in f.parts
-                and sold_dir not in f.parents):
-            local_images[f.name.lower()] = f
+    def sync(self):
+        self.fh.flush()
+        os.fsync(self.fh.fileno())
 
-    # b) cover.wdeu.de zuerst (maßgeblich) — ETag-Cache verhindert Re-Downloads
-    #    unveränderter Cover (conditional GET → 304 statt erneutem Transfer).
-    cover_hits = set()
-    if cover_base_url:
-        cache_dir = output_path.parent / ".cover-cache"
-        cache_dir.mkdir(exist_ok=True)
-        log(f"Prüfe cover.wdeu.de für {len(article_info)} Artikel (Vorrang) ...")
-        from_cover = 0
-        for orderNo in article_info.keys():
-            fname     = orderNo.lower() + '.jpg'
-            url       = cover_base_url.rstrip('/') + '/' + fname
-            cache_img = cache_dir / fname
-            etag_file = cache_dir / (orderNo.lower() + '.etag')
-            headers   = {}
-            if cache_img.exists() and etag_file.exists():
-                headers['If-None-Match'] = etag_file.read_text().strip()
-            try:
-                r = requests.get(url, headers=headers, timeout=10)
-                if r.status_code == 304 and cache_img.exists():
-                    shutil.copy2(str(cache_img), str(images_out / fname))
-                    cover_hits.add(fname); from_cover += 1
-                elif r.status_code == 200:
-                    cache_img.write_bytes(r.content)
-                    if r.headers.get('ETag'):
-                        etag_file.write_text(r.headers['ETag'])
-                    shutil.copy2(str(cache_img), str(images_out / fname))
-                    cover_hits.add(fname); from_cover += 1
-                # 404 → kein cover.wdeu.de-Cover → lokales BL-Bild greift unten
-            except Exception:
-                pass
-        ok(f"{from_cover} Cover von cover.wdeu.de (Vorrang)")
+    def finish(self, trash):
+        """Alles erledigt: Journal und Papierkorb weg."""
+        if self.fh:
+            self.fh.close()
+        self.path.unlink()
+        shutil.rmtree(str(trash), ignore_errors=True)
 
-    # c) Lokale BL-Bilder für alles, was cover.wdeu.de NICHT geliefert hat
-    log("Ergänze mit lokalen BL-Bildern ...")
-    from_local = 0
-    for fname, src in local_images.items():
-        if fname in cover_hits:
-            continue   # cover.wdeu.de hat Vorrang, lokales Bild überspringen
-        shutil.copy2(str(src), str(images_out / fname))
-        from_local += 1
-    ok(f"Galerie-Bilder: {len(cover_hits)} von cover.wdeu.de + {from_local} lokal "
-       f"= {len(cover_hits) + from_local} gesamt")
 
-    # d) images_out neu scannen (enthält jetzt lokale + nachgeladene Cover)
-    images = sorted(
-        [f for f in images_out.glob("*.jpg")
-         if is_valid(f.name, order_prefix)[0]],
-        key=lambda f: f.name.upper(), reverse=True
-    )
+def _trash_name(trash, i, path):
+    return trash / f"{i:06d}-{path.name}"
 
-    # Baue Bild-Tags
-    items_html = ""
-    for img in images:
-        stem  = img.stem.upper()   # z.B. BN00561
-        fname = img.name.lower()   # z.B. bn00561.jpg
 
-        info  = article_info.get(stem, {})
-        isbn  = info.get('isbn', '')
-        price = info.get('price', '')
+def _rename(src, dest, devices):
+    """os.replace innerhalb eines Dateisystems (atomar, nur Metadaten),
+    sonst shutil.move. devices cacht st_dev pro Ordner."""
+    for d in (src.parent, dest.parent):
+        if d not in devices:
+            devices[d] = os.stat(str(d)).st_dev
+    if devices[src.parent] == devices[dest.parent]:
+        os.replace(str(src), str(dest))
+        return True
+    shutil.move(str(src), str(dest))
+    return False
 
-        # Detail-Link: WP-Mapping per ISBN, sonst Fallback
-        href  = wp_links.get(isbn, FALLBACK_URL)
 
-        # Beschreibung für Tooltip (HTML-escapen)
-        desc_raw  = wp_desc.get(isbn, '')
-        desc_attr = desc_raw.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;') if desc_raw else ''
-        tooltip_attr = f' data-tooltip="{desc_attr}"' if desc_attr else ''
+def apply_cleanup(journal, plan=None, trash=None, index=None):
+    """Führt plan aus (oder setzt das liegengebliebene Journal fort, plan=None).
+    Jeder Schritt ist wiederholbar: was schon erledigt ist, wird übersprungen.
+    Gibt {'delete': n, 'move': n, 'same_device': n} zurück."""
+    if plan is None:
+        plan, trash, done = journal.load()
+    else:
+        done = set()
+        if not plan:
+            return {'delete': 0, 'move': 0, 'same_device': 0}
+        journal.start(plan, trash)
+    trash.mkdir(parents=True, exist_ok=True)
 
-        # Preis-Overlay nur wenn Preis bekannt
-        price_html = ""
-        if price:
-            try:
-                price_fmt = f"{float(price):.2f} €".replace('.', ',')
-                price_html = f'<div class="price">{price_fmt}</div>'
-            except ValueError:
-                pass
+    stats   = {'delete': 0, 'move': 0, 'same_device': 0}
+    devices = {}
+    for i, (op, src, dest) in enumerate(plan):
+        if i in done:
+            continue
+        if src.exists():
+            if op == 'delete':
+                # erst in den Papierkorb – endgültig weg erst mit finish()
+                same = _rename(src, _trash_name(trash, i, src), devices)
+            else:
+                dest.parent.mkdir(exist_ok=True)
+                if dest.exists():
+                    _rename(dest, _trash_name(trash, i, dest), devices)
+                same = _rename(src, dest, devices)
+            stats[op] += 1
+            stats['same_device'] += same
+        if index is not None:
+            index.discard(src)
+        journal.record(i)
+    journal.sync()
+    journal.finish(trash)
+    return stats
 
-        items_html += f"""
-    <div class="item"{tooltip_attr}>
-      <a href="{href}" target="_blank" rel="noopener" title="Bei Booklooker kaufen">
-        <div class="thumb-wrap">
-          <img src="images/{fname}" alt="{stem}" title="{stem}" loading="lazy">
-          {price_html}
-        </div>
-      </a>
-      <div class="label">{stem}</div>
-      <a class="cover-update-btn" href="https://inserate.wdeu.de/#cover={stem}" title="Neues Foto aufnehmen">📷</a>
-    </div>"""
 
-    now = datetime.now().strftime("%d.%m.%Y %H:%M")
-    count = len(images)
+def rollback_cleanup(journal_file=CLEANUP_JOURNAL):
+    """Dreht eine unterbrochene Bereinigung zurück (--rollback-cleanup):
+    verschobene Bilder zurück an ihren Platz, Papierkorb zurück nach Verkauft/
+    bzw. an den Ursprungsort. Gibt die Anzahl zurückgeholter Dateien zurück."""
+    journal = CleanupJournal(journal_file)
+    if not journal.exists():
+        ok("Kein unterbrochenes Bereinigungs-Journal – nichts zurückzudrehen")
+        return 0
+    plan, trash, _ = journal.load()
+    restored = 0
+    devices  = {}
+    for i, (op, src, dest) in reversed(list(enumerate(plan))):
+        trashed = _trash_name(trash, i, src)
+        if op == 'delete':
+            if trashed.exists() and not src.exists():
+                _rename(trashed, src, devices)
+                restored += 1
+            continue
+        if dest.exists() and not src.exists():
+            _rename(dest, src, devices)
+            restored += 1
+        if trashed.exists() and not dest.exists():   # überschriebene Datei in Verkauft/
+            _rename(trashed, dest, devices)
+    journal.finish(trash)
+    ok(f"Bereinigung zurückgedreht: {restored} Dateien wiederhergestellt")
+    return restored
 
-    html = f"""<!DOCTYPE html>
-<html lang="de">
-<head>
-  <meta charset="UTF-8">
-  <link rel="icon" href="favicon.png" type="image/png">
-  <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>Booq – wdeu bei Booklooker.de</title>
 
-  <!-- Google Fonts -->
-  <link href="https://fonts.googleapis.com/css2?family=Raleway:wght@300;400;700&display=swap"
-        rel="stylesheet">
+def cleanup(gallery_path, active_articles, order_prefix=None, index=None, paths=None,
+            dry_run=False, journal_file=CLEANUP_JOURNAL):
+    """Plan erstellen, dann am Stück ausführen (mit Journal, siehe apply_cleanup).
+    active_articles: ArticleTable (oder Set von orderNos) – BL-Bilder
+    anderer Nummern gelten als verkauft. paths: nur diese Dateien prüfen
+    (--watch: die seit dem letzten Lauf neuen/geänderten), sonst alle JPGs
+    aus dem Index. dry_run: nur den Plan ausgeben."""
+    journal = CleanupJournal(journal_file)
+    if journal.exists() and not dry_run:
+        warn(f"Unterbrochene Bereinigung gefunden ({journal_file}) → setze sie fort")
+        resumed = apply_cleanup(journal, index=index)
+        ok(f"Fortgesetzt: {resumed['delete']} gelöscht, {resumed['move']} verschoben")
 
-  <style>
-    /* ── Reset & Base ── */
-    *, *::before, *::after {{ box-sizing: border-box; margin: 0; padding: 0; }}
+    t0 = time.perf_counter()
+    plan, checked, skipped = plan_cleanup(gallery_path, active_articles, order_prefix, index, paths)
+    deletes = sum(1 for op, _, _ in plan if op == 'delete')
+    moves   = len(plan) - deletes
 
-    body {{
-      background: #f4f2ee;
-      font-family: 'Raleway', sans-serif;
-      color: #333;
-    }}
+    log(f"Bereinige {checked} JPGs in {gallery_path} (inkl. Unterordner) ...")
+    log(f"Erkannte Präfixe: {', '.join(order_prefix or ['BN','BLX'])}")
 
-    /* ── Header ── */
-    header {{
-      background: #fff;
-      border-bottom: 2px solid #e0ddd5;
-      padding: 18px 24px 14px;
-      position: sticky;
+    if dry_run:
+        ok(f"Plan (--dry-run): {deletes} Mehrfachbilder würden gelöscht, {moves} verkaufte "
+           f"nach Verkauft/ verschoben, {skipped} Nicht-BL-Dateien ignoriert")
+        for op, src, _ in plan[:10]:
+            log(f"  {'lösche' if op == 'delete' else 'verschiebe'} {src.relative_to(gallery_path)}")
+        if len(plan) > 10:
+            log(f"  … und {len(plan) - 10} weitere")
+        return moves, deletes
+
+    trash = gallery_path / "Verkauft" / f".papierkorb-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    stats = apply_cleanup(journal, plan, trash, index)
+    via   = "os.replace" if stats['same_device'] == stats['delete'] + stats['move'] else "teils kopiert"
+    ok(f"Bereinigt: {stats['delete']} Mehrfachbilder gelöscht, {stats['move']} verkaufte verschoben, "
+       f"{skipped} Nicht-BL-Dateien ignoriert ({time.perf_counter() - t0:.2f}s, {via})")
+    return stats['move'], stats['delete']
+
+# ============================================================
+# COVER VON cover_base_url HOLEN
+# ============================================================
+COVER_MANIFEST = "covers-manifest.json"   # optional auf dem Cover-Host (--make-manifest)
+COVER_CHUNK    = 64 * 1024                # Blockgröße beim Streamen eines Covers
+
+
+class CoverCache:
+    """.cover-cache/: eine Datei pro Cover plus EIN Index (index.json) mit
+    ETag, Last-Modified, Größe, mtime, SHA-1 und letzter Nutzung je Eintrag.
+    Threadsicher (fetch_covers schreibt aus mehreren Threads); save() schreibt
+    den Index. Ein Eintrag, dessen Datei fehlt oder deren Inhalt nicht mehr
+    zur SHA-1 passt, gilt als kaputt und wird ohne If-None-Match neu geladen."""
+
+    INDEX = 'index.json'
+
+    def __init__(self, cache_dir):
+        self.dir = cache_dir
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.index_file = cache_dir / self.INDEX
+        self.entries = _read_json(self.index_file, {}).get('entries', {})
+        self._lock = threading.Lock()
+        self._migrate()
+
+    def _migrate(self):
+        """Index mit dem Ordner abgleichen; Altbestand (*.jpg + *.etag pro
+        Cover) wird übernommen, die .etag-Dateien danach gelöscht."""
+        with os.scandir(self.dir) as it:
+            on_disk = {e.name: e for e in it if e.is_file()}
+        for fname in [f for f in self.entries if f not in on_disk]:
+            del self.entries[fname]
+        migrated = 0
+        for name, e in on_disk.items():
+            if name.endswith('.jpg') and name not in self.entries:
+                etag_file = self.dir / (name[:-4] + '.etag')
+                st = e.stat()
+                self.entries[name] = {
+                    'etag':          etag_file.read_text().strip() if etag_file.exists() else None,
+                    'last_modified': None,
+                    'size':          st.st_size,
+                    'last_used':     st.st_mtime,
+                }
+                migrated += 1
+            elif name.endswith('.etag') or name.endswith('.tmp'):
+                (self.dir / name).unlink()
+        if migrated:
+            log(f"Cover-Cache: {migrated} Einträge in {self.INDEX} übernommen")
+
+    def path(self, fname):
+        return self.dir / fname
+
+    def intact(self, fname):
+        """Liegt das Cover unverändert im Cache? Gleiche Größe + mtime wie beim
+        Speichern genügt; weicht eins davon ab, entscheidet die SHA-1 des
+        Inhalts. Kaputte Einträge werden verworfen (→ neu laden)."""
+        with self._lock:
+            entry = self.entries.get(fname)
+            expected = entry and (entry['size'], entry.get('mtime'), entry.get('sha1'))
+        if entry is None:
+            return False
+        size, mtime, sha1 = expected
+        try:
+            st = self.path(fname).stat()
+            if st.st_size == size and st.st_mtime == mtime:
+                return True
+            if st.st_size == size:
+                digest = file_hash(self.path(fname))
+                # Altbestand ohne SHA-1: Größe stimmt → Hash einmal übernehmen
+                if sha1 in (None, digest):
+                    with self._lock:
+                        entry.update(sha1=digest, mtime=st.st_mtime)
+                    return True
+        except FileNotFoundError:
+            pass
+        self.drop(fname)
+        return False
+
+    def conditional_headers(self, fname):
+        """If-None-Match / If-Modified-Since für ein gecachtes Cover – nur wenn
+        die Datei intakt ist, sonst würde ein 304 die kaputte Kopie bestätigen."""
+        if not self.intact(fname):
+            return {}
+        with self._lock:
+            entry = self.entries.get(fname)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def touch(self, fname):
+        """Eintrag als benutzt markieren; False, wenn er nicht (mehr) existiert."""
+        with self._lock:
+            entry = self.entries.get(fname)
+            if entry is None:
+                return False
+            entry['last_used'] = time.time()
+            return True
+
+    def matches(self, fname, remote):
+        """Stimmt das gecachte Cover mit dem Manifest-Eintrag remote überein?
+        Vergleicht SHA-1, wenn das Manifest eine hat, sonst Größe + mtime."""
+        if not self.intact(fname):
+            return False
+        with self._lock:
+            entry = self.entries.get(fname)
+            if entry is None:
+                return False
+            sha1, size, remote_mtime = entry.get('sha1'), entry['size'], entry.get('remote_mtime')
+        if remote.get('sha1'):
+            if not sha1:                # Altbestand: einmal lokal nachrechnen
+                sha1 = file_hash(self.path(fname))
+                with self._lock:
+                    if self.entries.get(fname) is entry:
+                        entry['sha1'] = sha1
+            same = sha1 == remote['sha1']
+        else:
+            same = size == remote.get('size') and remote_mtime == remote.get('mtime')
+        return same and self.touch(fname)
+
+    def put(self, fname, chunks, etag=None, last_modified=None, remote_mtime=None, complete=None):
+        """Schreibt die Blöcke aus chunks in eine Temp-Datei und hasht dabei
+        mit; erst danach kommt sie per os.replace an ihren Platz (neue Datei
+        statt Überschreiben: images/ kann per Hardlink auf das Cover zeigen
+        und soll erst beim Sync mitziehen). complete: Prüffunktion nach dem
+        letzten Block, z.B. Content-Length – bei False bleibt der Cache
+        unverändert und es gibt ValueError. Gibt die Anzahl Bytes zurück."""
+        tmp  = self.dir / ('.' + fname + '.tmp')
+        h    = hashlib.sha1()
+        size = 0
+        try:
+            with open(tmp, 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+                    h.update(chunk)
+                    size += len(chunk)
+            if complete is not None and not complete():
+                raise ValueError(f"{fname}: Download unvollständig ({size} Bytes)")
+            os.replace(str(tmp), str(self.path(fname)))
+            mtime = self.path(fname).stat().st_mtime
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        METRICS.add('bytes_written', size)
+        with self._lock:
+            self.entries[fname] = {'etag': etag, 'last_modified': last_modified,
+                                   'size': size, 'mtime': mtime, 'last_used': time.time(),
+                                   'sha1': h.hexdigest(), 'remote_mtime': remote_mtime}
+        return size
+
+    def drop(self, fname):
+        with self._lock:
+            self.entries.pop(fname, None)
+        try:
+            self.path(fname).unlink()
+        except FileNotFoundError:
+            pass
+
+    def hits(self, fnames):
+        """Welche der fnames intakt im Cache liegen (markiert sie als benutzt);
+        kaputte werden verworfen und beim nächsten Abruf neu geladen."""
+        return {fname for fname in fnames if self.intact(fname) and self.touch(fname)}
+
+    def total_bytes(self):
+        return sum(e['size'] for e in self.entries.values())
+
+    def prune(self, keep):
+        """Alle Einträge außer keep (Dateinamen aktiver Artikel) entfernen."""
+        stale = [fname for fname in self.entries if fname not in keep]
+        for fname in stale:
+            self.drop(fname)
+        return len(stale)
+
+    def evict(self, max_entries=0, max_bytes=0):
+        """LRU: am längsten unbenutzte Einträge verdrängen, bis beide
+        Grenzen eingehalten sind (0 = keine Grenze)."""
+        lru   = sorted(self.entries, key=lambda f: self.entries[f]['last_used'])
+        total = self.total_bytes()
+        evicted = 0
+        for fname in lru:
+            if ((not max_entries or len(self.entries) <= max_entries)
+                    and (not max_bytes or total <= max_bytes)):
+                break
+            total -= self.entries[fname]['size']
+            self.drop(fname)
+            evicted += 1
+        return evicted
+
+    def save(self):
+        _write_json_atomic(self.index_file, {'version': 1, 'entries': self.entries})
+
+
+def _fetch_cover(session, cover_base_url, orderNo, cache, remote=None):
+    """Conditional GET für ein Cover. Gibt den Dateinamen zurück, wenn das
+    Cover (neu oder unverändert) im Cache liegt, sonst None. remote: der
+    Manifest-Eintrag, falls das Cover über das Manifest gefunden wurde."""
+    fname = orderNo.lower() + '.jpg'
+    url   = cover_base_url.rstrip('/') + '/' + fname
+    try:
+        # stream=True: Handyfotos gehen blockweise in die Temp-Datei, der
+        # Speicherbedarf hängt nicht von der Covergröße ab
+        with session.get(url, headers=cache.conditional_headers(fname), timeout=10, stream=True) as r:
+            if r.status_code != 200:
+                # kurze Antwort ganz lesen, damit die Verbindung im Pool bleibt
+                METRICS.add('http_bytes', len(r.content), phase=session.metrics_phase)
+                if r.status_code == 304 and cache.touch(fname):
+                    return fname
+                if r.status_code == 404:
+                    # kein cover.wdeu.de-Cover (mehr) → lokales BL-Bild greift;
+                    # veraltete Cache-Kopie weg, damit der Cache nur echte Treffer enthält
+                    cache.drop(fname)
+                return None
+            length = r.headers.get('Content-Length')
+            try:
+                cache.put(fname, r.iter_content(COVER_CHUNK), r.headers.get('ETag'),
+                          r.headers.get('Last-Modified'), (remote or {}).get('mtime'),
+                          complete=lambda: length is None or r.raw.tell() == int(length))
+            finally:
+                METRICS.add('http_bytes', r.raw.tell(), phase=session.metrics_phase)
+            return fname
+    except Exception:
+        pass
+    return None
+
+
+def _load_cover_manifest(session, cover_base_url):
+    """COVER_MANIFEST vom Cover-Host → {dateiname: {'size', 'mtime', 'sha1'}}
+    oder None, wenn es keins gibt (dann wird jedes Cover einzeln geprüft)."""
+    try:
+        r = session.get(cover_base_url.rstrip('/') + '/' + COVER_MANIFEST, timeout=10)
+        if r.status_code != 200:
+            return None
+        files = r.json().get('files')
+    except (requests.RequestException, ValueError, AttributeError):
+        return None
+    if not isinstance(files, dict):
+        return None
+    return {name.lower(): entry for name, entry in files.items() if isinstance(entry, dict)}
+
+
+def fetch_covers(cover_base_url, order_nos, cache, workers=16, max_per_host=None):
+    """Holt die Cover aller order_nos parallel über eine gemeinsame
+    Keep-Alive-Session in den CoverCache. Liegt auf dem Host ein
+    COVER_MANIFEST, entscheidet ein Abgleich damit, welche Cover überhaupt
+    geladen werden müssen – ein Request statt einer pro Artikel. Gibt das
+    Set der gelieferten Dateinamen zurück."""
+    order_nos = list(order_nos)
+    if not order_nos:
+        return set()
+    workers = max(1, min(workers, len(order_nos)))
+    with make_session(max_per_host or workers) as session:
+        manifest = _load_cover_manifest(session, cover_base_url)
+        hits, todo = set(), order_nos
+        if manifest is not None:
+            todo = []
+            for orderNo in order_nos:
+                fname  = orderNo.lower() + '.jpg'
+                remote = manifest.get(fname)
+                if remote is None:
+                    cache.drop(fname)          # nicht auf dem Host → lokales BL-Bild
+                elif cache.matches(fname, remote):
+                    hits.add(fname)
+                else:
+                    todo.append(orderNo)
+            ok(f"Cover-Manifest: {len(manifest)} Dateien auf dem Host, "
+               f"{len(hits)} im Cache aktuell, {len(todo)} zu laden")
+        if todo:
+            with ThreadPoolExecutor(max_workers=min(workers, len(todo))) as pool:
+                results = pool.map(
+                    lambda orderNo: _fetch_cover(session, cover_base_url, orderNo, cache,
+                                                 manifest and manifest.get(orderNo.lower() + '.jpg')),
+                    todo
+                )
+                hits.update(fname for fname in results if fname)
+        return hits
+
+
+def write_cover_manifest(cover_dir):
+    """--make-manifest: COVER_MANIFEST für alle *.jpg in cover_dir schreiben
+    (zum Hochladen neben die Cover). Unveränderte Dateien (Größe + mtime)
+    werden aus dem vorhandenen Manifest übernommen statt neu gehasht."""
+    manifest_file = cover_dir / COVER_MANIFEST
+    old   = _read_json(manifest_file, {}).get('files', {})
+    files = {}
+    hashed = 0
+    with os.scandir(cover_dir) as it:
+        for e in it:
+            if not (e.name.lower().endswith('.jpg') and e.is_file()):
+                continue
+            st    = e.stat()
+            entry = old.get(e.name)
+            if not entry or entry.get('size') != st.st_size or entry.get('mtime') != int(st.st_mtime):
+                entry = {'size': st.st_size, 'mtime': int(st.st_mtime), 'sha1': file_hash(e.path)}
+                hashed += 1
+            files[e.name] = entry
+    _write_json_atomic(manifest_file, {'version': 1, 'generated': int(time.time()), 'files': files})
+    ok(f"{COVER_MANIFEST}: {len(files)} Cover ({hashed} neu gehasht) → {manifest_file}")
+    return len(files)
+
+# ============================================================
+# GALERIE-BILDER INKREMENTELL SYNCHRONISIEREN
+# ============================================================
+def sync_images(sources, images_out, manifest_file, pattern="*.jpg", link_mode='auto', fingerprint=False,
+                check=None):
+    """Bringt images_out auf den Stand von sources ({dateiname: quellpfad}).
+    Das Manifest merkt sich pro Datei Quelle, Größe, mtime und SHA-1:
+    unveränderte Cover werden nicht angefasst, geänderte ersetzt, neue
+    per materialize() angelegt (link_mode) und Cover verkaufter Artikel
+    (pattern, ohne Unterordner) gelöscht. fingerprint: Dateien heißen
+    bn00561.<hash>.jpg (siehe hashed_name), ein geändertes Cover bekommt
+    also eine neue URL. check(files) → {dateiname: grund} läuft nach dem
+    Hashen: abgelehnte Dateien werden weder angelegt noch behalten.
+    Gibt (stats, files) zurück: stats = {'added', 'updated', 'removed', 'kept',
+    'via': {strategie: anzahl}, 'rejected': {dateiname: grund}}, files = Manifest-Einträge
+    {dateiname: {'src', 'size', 'mtime', 'sha1', 'name'}} (name: Datei in images_out)."""
+    images_out.mkdir(parents=True, exist_ok=True)
+    old   = _read_json(manifest_file, {}).get('files', {})
+    files = {}
+    stats = {'added': 0, 'updated': 0, 'removed': 0, 'kept': 0, 'via': {}, 'rejected': {}}
+
+    for fname, src in sources.items():
+        st    = src.stat()
+        entry = old.get(fname)
+        # Schnellpfad: gleiche Quelle, gleiche Größe + mtime → Hash aus dem Manifest
+        same_src = (entry is not None and entry['src'] == str(src)
+                    and entry['mtime'] == st.st_mtime and entry['size'] == st.st_size)
+        digest = entry['sha1'] if same_src else file_hash(src)
+        name   = hashed_name(fname, digest) if fingerprint else fname
+        files[fname] = {'src': str(src), 'size': st.st_size, 'mtime': st.st_mtime,
+                        'sha1': digest, 'name': name}
+
+    if check is not None:
+        stats['rejected'] = check(files)
+        for fname in stats['rejected']:
+            del files[fname]
+
+    for fname, new in files.items():
+        name  = new['name']
+        dest  = images_out / name
+        entry = old.get(fname)
+        if (entry is not None and entry.get('name', fname) == name and entry['sha1'] == new['sha1']
+                and dest.exists() and dest.stat().st_size == new['size']):
+            stats['kept'] += 1     # unverändert (ggf. nur Metadaten geändert)
+            continue
+        previous = images_out / entry.get('name', fname) if entry else dest
+        stats['updated' if previous.exists() else 'added'] += 1
+        via = materialize(Path(new['src']), dest, link_mode)
+        stats['via'][via] = stats['via'].get(via, 0) + 1
+
+    # Cover verkaufter Artikel, alte Fingerprint-Namen und Altlasten entfernen
+    names = {entry['name'] for entry in files.values()}
+    for f in images_out.glob(pattern):
+        if f.is_file() and f.name not in names:
+            f.unlink()
+            stats['removed'] += 1
+
+    _write_json_atomic(manifest_file, {'version': 1, 'files': files})
+    return stats, files
+
+
+def _via_text(stats):
+    """' (hardlink 4980, copy_file_range 20)' für Log-Zeilen, leer ohne Schreibvorgänge."""
+    via = sorted(stats['via'].items(), key=lambda kv: -kv[1])
+    return f" ({', '.join(f'{name} {n}' for name, n in via)})" if via else ""
+
+# ============================================================
+# BILDER PRÜFEN (JPEG-Segmente: Maße, Orientierung, Vollständigkeit)
+# ============================================================
+SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Marker in den Scan-Daten: FF gefolgt von allem außer 00 (Stuffing), 01,
+# D0–D7 (RST) und FF (Füllbyte)
+JPEG_SCAN_MARKER = re.compile(rb'\xff[\x02-\xcf\xd8-\xfe]')
+# Ändert sich, was probe_jpeg ablehnt, ist .probe-cache.json veraltet
+PROBE_VERSION = 2
+
+
+def _exif_orientation(app1):
+    """EXIF-Orientierung (1–8) aus einem APP1-Segment, 1 wenn keine da ist."""
+    if not app1.startswith(b'Exif\0\0') or len(app1) < 14:
+        return 1
+    tiff = app1[6:]
+    endian = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if endian is None:
+        return 1
+    try:
+        ifd = struct.unpack(endian + 'I', tiff[4:8])[0]
+        count = struct.unpack(endian + 'H', tiff[ifd:ifd + 2])[0]
+        for i in range(count):
+            entry = ifd + 2 + i * 12
+            tag, _, _, value = struct.unpack(endian + 'HHIH', tiff[entry:entry + 10])
+            if tag == 0x0112:
+                return value if 1 <= value <= 8 else 1
+    except struct.error:
+        pass
+    return 1
+
+
+def probe_jpeg(path):
+    """Geht die Segmente per Längenfeld durch (große APP-Segmente wie XMP,
+    ICC oder MPF werden übersprungen), nimmt die Maße aus dem SOF und sucht
+    ab dem ersten Scan den nächsten Marker, bis ein EOI kommt – Bytes danach
+    (Samsung-Trailer, Motion-Photo-Video, Nullen) zählen nicht. → (breite,
+    höhe) so, wie der Browser das Bild anzeigt (EXIF-Orientierung 5–8
+    tauscht die Seiten). ValueError bei Nicht-JPEGs, kaputter
+    Segmentstruktur und Dateien, die vor dem EOI enden."""
+    with open(path, 'rb') as f:
+        if f.read(2) != b'\xff\xd8':
+            raise ValueError("kein JPEG")
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+
+        orientation = 1
+        dims = None
+        pos = 2
+        f.seek(pos)
+        while True:
+            head = f.read(2)
+            if len(head) < 2:
+                raise ValueError("abgeschnitten (kein Scan)")
+            if head[0] != 0xFF:
+                raise ValueError(f"kaputter Marker bei Byte {pos}")
+            marker = head[1]
+            if marker == 0xFF:            # Füllbyte
+                pos += 1
+                f.seek(pos)
+                continue
+            if marker in (0x01, *range(0xD0, 0xD8)):   # Marker ohne Länge
+                pos += 2
+                continue
+            if marker == 0xD9 or (marker == 0xDA and dims is None):
+                raise ValueError("kein SOF-Header gefunden" if dims is None else "keine Bilddaten (kein Scan)")
+            raw = f.read(2)
+            if len(raw) < 2:
+                raise ValueError("abgeschnitten (kein Scan)")
+            length = struct.unpack('>H', raw)[0]
+            if length < 2 or pos + 2 + length > size:
+                raise ValueError(f"ungültige Segmentlänge bei Byte {pos}")
+            if marker == 0xDA:
+                break
+            if marker in SOF_MARKERS and dims is None:
+                body = f.read(5)
+                if len(body) < 5:
+                    raise ValueError("abgeschnitten im SOF")
+                height, width = struct.unpack('>HH', body[1:5])
+                if not width or not height:
+                    raise ValueError("Maße 0")
+                dims = (width, height)
+            elif marker == 0xE1 and orientation == 1:
+                orientation = _exif_orientation(f.read(length - 2))
+            pos += 2 + length
+            f.seek(pos)
+
+        # Scan-Daten: FF 00 (Stuffing), RST und Füllbytes gehören dazu; jeder
+        # andere Marker ist EOI oder ein Segment zwischen zwei Scans
+        # (progressive JPEGs: DHT, SOS, …), das per Länge übersprungen wird
+        f.seek(pos + 2 + length)
+        data = f.read()
+    i = 0
+    while True:
+        m = JPEG_SCAN_MARKER.search(data, i)
+        if m is None:
+            raise ValueError("abgeschnitten (kein EOI)")
+        if data[m.end() - 1] == 0xD9:
+            break
+        if m.end() + 2 > len(data):
+            raise ValueError("abgeschnitten (kein EOI)")
+        length = struct.unpack('>H', data[m.end():m.end() + 2])[0]
+        if length < 2 or m.end() + length > len(data):
+            raise ValueError(f"ungültige Segmentlänge bei Byte {size - len(data) + m.start()}")
+        i = m.end() + length
+    width, height = dims
+    return (height, width) if orientation >= 5 else (width, height)
+
+
+def probe_images(files, cache_file, workers=None):
+    """files: {dateiname: {'src', 'sha1', ...}} wie in sync_images – geprüft
+    wird die Quelle, also bevor etwas nach images/ kommt. Liest parallel nur
+    Dateien, deren SHA-1 noch nicht im Cache steht; der Cache ({sha1: [b, h]}
+    bzw. {sha1: "fehler"}, verworfen bei anderer PROBE_VERSION) wird auf die
+    aktuellen Hashes gekürzt.
+    Gibt (maße, fehler) zurück: {dateiname: (b, h)} und {dateiname: grund}."""
+    stored = _read_json(cache_file, {})
+    cache  = stored.get('results', {}) if stored.get('version') == PROBE_VERSION else {}
+    todo   = {entry['sha1']: Path(entry['src']) for entry in files.values()
+             if entry['sha1'] not in cache}
+
+    def probe(path):
+        try:
+            return list(probe_jpeg(path))
+        except (OSError, ValueError) as e:
+            return str(e)
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for digest, result in zip(todo, pool.map(probe, todo.values())):
+                cache[digest] = result
+
+    dims, bad = {}, {}
+    for fname, entry in files.items():
+        result = cache[entry['sha1']]
+        if isinstance(result, list):
+            dims[fname] = tuple(result)
+        else:
+            bad[fname] = result
+    live = {entry['sha1'] for entry in files.values()}
+    _write_json_atomic(cache_file, {'version': PROBE_VERSION,
+                                    'results': {digest: r for digest, r in cache.items() if digest in live}})
+    ok(f"Bilder geprüft: {len(dims)} ok, {len(bad)} fehlerhaft ({len(todo)} neu gelesen)")
+    return dims, bad
+
+# ============================================================
+# THUMBNAILS (WebP/AVIF-Varianten für srcset)
+# ============================================================
+THUMB_MIME = {'avif': 'image/avif', 'webp': 'image/webp', 'jpeg': 'image/jpeg'}
+THUMB_EXT  = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+THUMB_SAVE = {
+    'avif': {'format': 'AVIF', 'quality': 55, 'speed': 6},
+    'webp': {'format': 'WEBP', 'quality': 78, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 80, 'optimize': True, 'progressive': True},
+}
+
+
+def _thumb_formats(formats):
+    """Nur Formate behalten, die das installierte Pillow schreiben kann."""
+    usable = []
+    for fmt in formats:
+        if fmt not in THUMB_SAVE:
+            warn(f"Unbekanntes Thumbnail-Format ignoriert: {fmt}")
+        elif fmt in ('avif', 'webp') and not pil_features.check(fmt):
+            log(f"Pillow ohne {fmt.upper()}-Unterstützung → Format übersprungen")
+        else:
+            usable.append(fmt)
+    return usable
+
+
+def _make_thumbs(src, digest, widths, formats, cache_dir):
+    """Erzeugt alle Varianten eines Covers im Cache (läuft im Worker-Prozess).
+    EXIF-Orientierung wird angewendet, Metadaten werden nicht übernommen."""
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        icc = im.info.get('icc_profile')
+        if im.mode not in ('RGB', 'L'):
+            im = im.convert('RGB')
+        for w in widths:
+            # Breiten kommen schon passend aus _fit_widths; min() nur als
+            # Schutz, falls Pillow die Maße anders liest – nie hochskalieren
+            tw = min(w, im.width)
+            th = max(1, round(im.height * tw / im.width))
+            variant = im.resize((tw, th), Image.LANCZOS) if tw != im.width else im
+            for fmt in formats:
+                target = cache_dir / f"{digest}-{w}.{THUMB_EXT[fmt]}"
+                if target.exists():
+                    continue
+                tmp = target.with_name(target.name + '.tmp')
+                kw = dict(THUMB_SAVE[fmt])
+                if icc:
+                    kw['icc_profile'] = icc
+                variant.save(tmp, **kw)
+                os.replace(str(tmp), str(target))
+    return digest
+
+
+def _fit_widths(widths, size):
+    """Breiten für ein Cover der Größe size (b, h): nie hochskalieren – was
+    breiter als das Original wäre, wird eine Variante in seiner echten Breite
+    (und heißt auch so). Ohne bekannte Maße bleiben alle Breiten."""
+    if not size:
+        return list(widths)
+    return sorted({min(w, size[0]) for w in widths})
+
+
+def build_thumbnails(files, thumbs_out, cache_dir, manifest_file, widths, formats, workers=None,
+                     link_mode='auto', fingerprint=False, sizes=None):
+    """files: {dateiname: {'sha1', 'name', ...}} der Galerie-Bilder aus sync_images.
+    Kodiert nur Cover, deren Varianten noch nicht im Cache (nach SHA-1)
+    liegen – parallel über alle CPU-Kerne – und gleicht thumbs_out ab.
+    fingerprint: Varianten tragen den Hash des Covers im Namen.
+    sizes: {dateiname: (b, h)} aus probe_images – Breiten über dem Original
+    werden nicht erzeugt, der srcset nennt nur echte Breiten.
+    Gibt {dateiname: {format: [(url-pfad, breite), ...]}} zurück."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    images_out = thumbs_out.parent
+    sizes = sizes or {}
+    covers = {fname: entry['sha1'] for fname, entry in files.items()}
+    fitted = {fname: _fit_widths(widths, sizes.get(fname)) for fname in covers}
+
+    def cached(digest, w, fmt):
+        return cache_dir / f"{digest}-{w}.{THUMB_EXT[fmt]}"
+
+    todo = {digest: (images_out / files[fname].get('name', fname), fitted[fname])
+            for fname, digest in covers.items()
+            if not all(cached(digest, w, fmt).exists() for w in fitted[fname] for fmt in formats)}
+    failed = set()
+    if todo:
+        log(f"Erzeuge Thumbnails für {len(todo)} Cover ({', '.join(formats)}) ...")
+        with ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1)) as pool:
+            futures = {pool.submit(_make_thumbs, src, digest, cover_widths, formats, cache_dir): digest
+                       for digest, (src, cover_widths) in todo.items()}
+            for fut, digest in futures.items():
+                try:
+                    fut.result()
+                except Exception as e:
+                    warn(f"Thumbnail fehlgeschlagen: {todo[digest][0].name} ({e})")
+                    failed.add(digest)
+
+    # Varianten in den Output spiegeln (inkrementell wie images/)
+    sources  = {}
+    variants = {}
+    for fname, digest in covers.items():
+        if digest in failed:
+            continue
+        stem = Path(fname).stem
+        per_fmt = {}
+        for fmt in formats:
+            for w in fitted[fname]:
+                name = f"{stem}-{w}.{THUMB_EXT[fmt]}"
+                if fingerprint:
+                    name = hashed_name(name, digest)
+                sources[name] = cached(digest, w, fmt)
+                per_fmt.setdefault(fmt, []).append((f"images/{thumbs_out.name}/{name}", w))
+        variants[fname] = per_fmt
+    stats, _ = sync_images(sources, thumbs_out, manifest_file, pattern="*", link_mode=link_mode)
+
+    # Cache-Einträge nicht mehr vorhandener Cover aufräumen
+    live = set(covers.values())
+    for f in cache_dir.iterdir():
+        if f.name.split('-', 1)[0] not in live:
+            f.unlink()
+
+    ok(f"Thumbnails: {len(todo) - len(failed)} neu kodiert, {len(variants)} Cover "
+       f"× bis zu {len(widths)} Breiten, {stats['added'] + stats['updated']} Dateien geschrieben{_via_text(stats)}")
+    return variants
+
+# ============================================================
+# PLATZHALTER (Farbe bzw. Mini-Vorschau, bis das Cover geladen ist)
+# ============================================================
+PLACEHOLDER_MODES = ('off', 'color', 'blur')
+PLACEHOLDER_WIDTH = 12      # px der Mini-Vorschau – der Browser skaliert sie weich hoch
+
+
+def _make_placeholder(src, mode):
+    """CSS-Hintergrund für ein Cover (läuft im Worker-Prozess): die häufigste
+    Farbe ('#rrggbb') bzw. zusätzlich eine winzige WebP/JPEG-Vorschau als
+    data-URI. draft() lässt den JPEG-Decoder gleich verkleinert dekodieren."""
+    with Image.open(src) as im:
+        im.draft('RGB', (PLACEHOLDER_WIDTH * 4, PLACEHOLDER_WIDTH * 6))
+        im = ImageOps.exif_transpose(im).convert('RGB')
+        w = PLACEHOLDER_WIDTH
+        small = im.resize((w, max(1, round(im.height * w / im.width))), Image.BOX)
+    quant = small.quantize(colors=4)
+    _, top = max(quant.getcolors())
+    r, g, b = quant.getpalette()[top * 3:top * 3 + 3]
+    color = f"#{r:02x}{g:02x}{b:02x}"
+    if mode == 'color':
+        return color
+    buf = io.BytesIO()
+    if pil_features.check('webp'):
+        small.save(buf, format='WEBP', quality=40)
+        mime = 'image/webp'
+    else:
+        small.save(buf, format='JPEG', quality=40)
+        mime = 'image/jpeg'
+    data = base64.b64encode(buf.getvalue()).decode('ascii')
+    return f"{color} url(data:{mime};base64,{data}) center/cover"
+
+
+def build_placeholders(files, images_out, cache_file, mode, workers=None):
+    """files: {dateiname: {'sha1', 'name', ...}} aus sync_images. Berechnet
+    Platzhalter nur für Hashes, die noch nicht im Cache stehen (Moduswechsel
+    verwirft den Cache), und kürzt ihn auf die aktuellen Cover.
+    Gibt {dateiname: css-hintergrund} zurück."""
+    cached = _read_json(cache_file, {})
+    items  = cached.get('items', {}) if cached.get('mode') == mode else {}
+    covers = {fname: entry['sha1'] for fname, entry in files.items()}
+    todo   = {digest: images_out / files[fname].get('name', fname)
+              for fname, digest in covers.items() if digest not in items}
+    if todo:
+        with ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1)) as pool:
+            futures = {pool.submit(_make_placeholder, src, mode): digest for digest, src in todo.items()}
+            for fut, digest in futures.items():
+                try:
+                    items[digest] = fut.result()
+                except Exception as e:
+                    warn(f"Platzhalter fehlgeschlagen: {todo[digest].name} ({e})")
+
+    live = set(covers.values())
+    _write_json_atomic(cache_file, {'mode': mode, 'items': {d: v for d, v in items.items() if d in live}})
+    result = {fname: items[digest] for fname, digest in covers.items() if digest in items}
+    ok(f"Platzhalter ({mode}): {len(result)} Cover, {len(todo)} neu berechnet")
+    return result
+
+# Geladene Cover einblenden (auch nachgerenderte Kacheln im sharded-Modus):
+# load-Events bubbeln nicht, daher Capture am document; schon fertige Bilder
+# (aus dem Browser-Cache) sofort markieren.
+FADE_IN_JS = r"""
+  // ── Platzhalter: Cover einblenden, sobald sie geladen sind ──
+  document.addEventListener('load', e => {
+    if (e.target.tagName === 'IMG') e.target.classList.add('in');
+  }, true);
+  grid.querySelectorAll('img').forEach(img => { if (img.complete) img.classList.add('in'); });
+"""
+
+# Kachelbreite: Slider 80–280 px, auf dem Handy ca. halbe Bildschirmbreite
+THUMB_SIZES = "(max-width: 480px) 50vw, 280px"
+
+
+def _srcset(entries):
+    return ', '.join(f"{url} {w}w" for url, w in entries)
+
+
+def _size_attrs(size):
+    """' width="600" height="900"' – Seitenverhältnis für den Browser vor dem Laden."""
+    return f' width="{size[0]}" height="{size[1]}"' if size else ''
+
+
+def render_picture(fname, stem, variants, size=None):
+    """<picture> mit einer <source> je modernem Format; JPEG-Varianten (falls
+    konfiguriert) landen im srcset des <img>, sonst bleibt das Original Fallback."""
+    sources = ''.join(
+        f'<source type="{THUMB_MIME[fmt]}" srcset="{_srcset(entries)}" sizes="{THUMB_SIZES}">'
+        for fmt, entries in variants.items() if fmt != 'jpeg'
+    )
+    jpeg = variants.get('jpeg')
+    img_srcset = f' srcset="{_srcset(jpeg)}" sizes="{THUMB_SIZES}"' if jpeg else ''
+    return (f'<picture>{sources}<img src="images/{fname}"{img_srcset}{_size_attrs(size)} '
+            f'alt="{stem}" title="{stem}" loading="lazy"></picture>')
+
+# ============================================================
+# JSON-SHARDS (render_mode = sharded)
+# ============================================================
+def write_shards(records, data_dir, shard_size, fallback_url, version, fingerprint=False):
+    """Schreibt die Artikelliste seitenweise nach data/items-NNNN.json plus
+    data/index.json (Anzahl, Seiten, Fallback-Link). Veraltete Seiten werden
+    gelöscht. fingerprint: items-NNNN.<hash>.json, unveränderte Seiten bleiben
+    unangetastet (version leer → der Client hängt kein ?v= an).
+    Gibt die Anzahl der Seiten zurück."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    names = []
+    for start in range(0, len(records), shard_size):
+        shard = records[start:start + shard_size]
+        body  = _json_body(shard)
+        name  = f"items-{start // shard_size:04d}.json"
+        if fingerprint:
+            name = hashed_name(name, hashlib.sha1(body).hexdigest())
+        if not (fingerprint and (data_dir / name).exists()):
+            _write_json_atomic(data_dir / name, shard, body)
+        names.append(name)
+    for f in data_dir.glob("items-*.json"):
+        if f.name not in names:
+            f.unlink()
+    _write_json_atomic(data_dir / "index.json", {
+        'count':     len(records),
+        'shardSize': shard_size,
+        'shards':    names,
+        'fallback':  fallback_url,
+        'sizes':     THUMB_SIZES,
+        'version':   version,
+    })
+    return len(names)
+
+
+# Client für render_mode = sharded: lädt data/index.json, holt Shards bei Bedarf
+# und rendert nur die sichtbaren Zeilen (+ Puffer) ins Grid. Die Höhe der nicht
+# gerenderten Zeilen wird über padding-top/-bottom des Grids freigehalten.
+# Bei aktiver Suche (SEARCH_JS) laufen die Zeilen nur über die Treffer.
+VIRTUAL_GRID_JS = r"""
+  // ── Virtualisiertes Grid (render_mode = sharded) ────────
+  (function () {
+    const ESC = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' };
+    const esc = s => String(s).replace(/[&<>"]/g, c => ESC[c]);
+    const BUFFER_ROWS = 4;
+    const shards = [];          // Index → Array der Artikel (geladen)
+    const pending = new Set();  // Shards, die gerade geladen werden
+    let meta = null, view = null;   // view: Positionen der Suchtreffer (SEARCH_JS), null = alle
+    let cols = 1, rowH = 0, first = -1, last = -1, queued = false;
+
+    function itemHtml(it) {
+      const tip = it.d ? ` data-tooltip="${esc(it.d)}"` : '';
+      const price = it.p ? `<div class="price">${esc(it.p)}</div>` : '';
+      let imgSet = '', sources = '';
+      for (const [type, set] of Object.entries(it.s || {})) {
+        if (type === 'image/jpeg') imgSet = ` srcset="${esc(set)}" sizes="${meta.sizes}"`;
+        else sources += `<source type="${type}" srcset="${esc(set)}" sizes="${meta.sizes}">`;
+      }
+      const dims = it.w ? ` width="${it.w}" height="${it.ht}"` : '';
+      let img = `<img src="images/${esc(it.f)}"${imgSet}${dims} alt="${esc(it.n)}" title="${esc(it.n)}" loading="lazy">`;
+      if (sources) img = `<picture>${sources}${img}</picture>`;
+      return `<div class="item"${tip}>` +
+        `<a href="${esc(it.h || meta.fallback)}" target="_blank" rel="noopener" title="Bei Booklooker kaufen">` +
+        `<div class="thumb-wrap"${it.b ? ` style="background:${esc(it.b)}"` : ''}>${img}${price}</div></a>` +
+        `<div class="label">${esc(it.n)}</div>` +
+        `<a class="cover-update-btn" href="https://inserate.wdeu.de/#cover=${esc(it.n)}" title="Neues Foto aufnehmen">📷</a></div>`;
+    }
+
+    function loadShard(i) {
+      if (shards[i] || pending.has(i)) return;
+      pending.add(i);
+      fetch('data/' + meta.shards[i] + (meta.version ? '?v=' + encodeURIComponent(meta.version) : ''))
+        .then(r => r.json())
+        .then(items => { shards[i] = items; pending.delete(i); schedule(true); })
+        .catch(() => pending.delete(i));
+    }
+
+    function measure() {
+      const cs = getComputedStyle(grid);
+      const gap = parseFloat(cs.rowGap) || 0;
+      const width = grid.clientWidth - parseFloat(cs.paddingLeft) - parseFloat(cs.paddingRight);
+      const min = parseFloat(cs.getPropertyValue('--thumb-size')) || 130;
+      cols = Math.max(1, Math.floor((width + gap) / (min + gap)));
+      const sample = grid.querySelector('.item');
+      rowH = (sample ? sample.offsetHeight : (width / cols) * 1.5 + 28) + gap;
+    }
+
+    function render(force) {
+      queued = false;
+      if (!meta) return;
+      measure();
+      const count = view ? view.length : meta.count;
+      const rows = Math.ceil(count / cols);
+      const pad = parseFloat(getComputedStyle(grid).getPropertyValue('--grid-pad')) || 0;
+      const top = Math.max(0, -grid.getBoundingClientRect().top - pad);
+      const r0 = Math.max(0, Math.floor(top / rowH) - BUFFER_ROWS);
+      const r1 = Math.min(rows, Math.ceil((top + window.innerHeight) / rowH) + BUFFER_ROWS);
+      if (!force && r0 === first && r1 === last) return;
+      first = r0; last = r1;
+      tip.style.display = 'none';   // Kachel unter dem Tooltip wird ggf. ersetzt
+
+      let html = '';
+      for (let k = r0 * cols; k < Math.min(count, r1 * cols); k++) {
+        const i = view ? view[k] : k;
+        const s = Math.floor(i / meta.shardSize);
+        const items = shards[s];
+        if (items) html += itemHtml(items[i - s * meta.shardSize]);
+        else { loadShard(s); html += '<div class="item placeholder"><div class="cover-ph"></div><div class="label">&nbsp;</div></div>'; }
+      }
+      grid.innerHTML = html;
+      grid.style.paddingTop = `calc(var(--grid-pad) + ${r0 * rowH}px)`;
+      grid.style.paddingBottom = `calc(var(--grid-pad) + ${(rows - r1) * rowH}px)`;
+    }
+
+    function schedule(force) {
+      if (force) first = last = -1;
+      if (queued) return;
+      queued = true;
+      requestAnimationFrame(() => render(false));
+    }
+
+    window.addEventListener('scroll', () => schedule(false), { passive: true });
+    window.addEventListener('resize', () => schedule(true));
+    grid.addEventListener('thumbsize', () => schedule(true));
+    grid.addEventListener('filter', e => { view = e.detail; schedule(true); });
+
+    fetch(grid.dataset.src, { cache: 'no-cache' })
+      .then(r => r.json())
+      .then(m => { meta = m; schedule(true); });
+  })();
+"""
+
+# ============================================================
+# SUCHINDEX (search = yes) – Suche und Preisfilter im Browser
+# ============================================================
+SEARCH_WORD    = re.compile(r'[^\W_]+')
+SEARCH_MARKS   = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+ISBN_HYPHEN    = re.compile(r'(?<=\d)-(?=[\dXx])')   # 978-3-... → 9783...
+SEARCH_MIN_LEN = 2                                   # kürzere Wörter kommen nicht in den Index
+
+
+def search_tokens(text):
+    """Suchwörter wie im Client (SEARCH_JS): Bindestriche in ISBNs raus,
+    Akzente/Umlaute auf den Grundbuchstaben, klein, ß → ss."""
+    text = SEARCH_MARKS.sub('', unicodedata.normalize('NFKD', ISBN_HYPHEN.sub('', text)))
+    return SEARCH_WORD.findall(text.lower().replace('ß', 'ss'))
+
+
+def build_search_index(stems, articles):
+    """Suchindex über die Kacheln in Grid-Reihenfolge (Position = Index in stems):
+    terms/postings – sortierte Wörter aus Beschreibung und ISBN, je Wort die
+    Positionen als Abstände (klein im JSON); orders/orderPos – Bestellnummern
+    sortiert; prices/pricePos – Preise in Cent aufsteigend (ohne Preis: fehlt).
+    Präfixsuche und Preisspanne sind damit im Client je eine Binärsuche."""
+    postings = {}
+    prices   = []
+    for pos, stem in enumerate(stems):
+        article = articles.get(stem)
+        if article is None:
+            continue
+        words = {w for w in search_tokens(article.desc) if len(w) >= SEARCH_MIN_LEN}
+        isbn  = re.sub(r'[^0-9X]', '', article.isbn.upper()).lower()
+        if isbn:
+            words.add(isbn)
+        for w in words:
+            postings.setdefault(w, []).append(pos)
+        if article.price is not None:
+            prices.append((round(article.price * 100), pos))
+    terms  = sorted(postings)
+    orders = sorted(range(len(stems)), key=stems.__getitem__)
+    prices.sort()
+    return {
+        'count':    len(stems),
+        'terms':    terms,
+        'postings': [[b - a for a, b in zip([0] + postings[t], postings[t])] for t in terms],
+        'orders':   [stems[pos] for pos in orders],
+        'orderPos': orders,
+        'prices':   [cents for cents, _ in prices],
+        'pricePos': [pos for _, pos in prices],
+    }
+
+
+def write_search_index(stems, articles, data_dir, fingerprint=False):
+    """Schreibt data/search.json (fingerprint: search.<hash>.json) und räumt
+    ältere Fassungen weg. Gibt (URL relativ zu index.html, Wörter, Bytes) zurück."""
+    index = build_search_index(stems, articles)
+    body  = _json_body(index)
+    url   = write_asset(data_dir, "search.json", body, fingerprint)
+    name  = url.split('?')[0].rsplit('/', 1)[-1]
+    for f in data_dir.glob("search*.json"):
+        if f.name != name:
+            f.unlink()
+    return url, len(index['terms']), len(body)
+
+
+# Client: lädt den Index beim ersten Fokus bzw. bei der ersten Eingabe; jedes
+# Suchwort muss als Wort-Präfix (Beschreibung, ISBN) oder Bestellnummer-Präfix
+# passen, dazu optional die Preisspanne. inline blendet Kacheln per Klasse aus,
+# sharded gibt die Trefferliste per 'filter'-Event an VIRTUAL_GRID_JS.
+SEARCH_JS = r"""
+  // ── Suche & Preisfilter (search = yes) ──────────────────
+  (function () {
+    const box = document.getElementById('search');
+    const q = document.getElementById('q');
+    const pmin = document.getElementById('pmin');
+    const pmax = document.getElementById('pmax');
+    const hits = document.getElementById('hits');
+    const items = grid.dataset.src ? null : grid.getElementsByClassName('item');
+    let idx = null, loading = null, timer, seq = 0;
+    box.hidden = false;
+
+    function load() {
+      if (!loading) {
+        loading = fetch(box.dataset.index)
+          .then(r => r.json())
+          .then(d => { idx = d; })
+          .catch(e => { loading = null; throw e; });
+      }
+      return loading;
+    }
+
+    // wie search_tokens() im Generator
+    function tokens(s) {
+      s = s.replace(/(\d)-(?=[\dXx])/g, '$1').normalize('NFKD')
+        .replace(/[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]/g, '');
+      return s.toLowerCase().replace(/ß/g, 'ss').match(/[\p{L}\p{N}]+/gu) || [];
+    }
+
+    function lowerBound(arr, x) {
+      let lo = 0, hi = arr.length;
+      while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (arr[mid] < x) lo = mid + 1; else hi = mid;
+      }
+      return lo;
+    }
+
+    function wordMask(w) {
+      const m = new Uint8Array(idx.count);
+      for (let i = lowerBound(idx.terms, w); i < idx.terms.length && idx.terms[i].startsWith(w); i++) {
+        let pos = 0;
+        for (const d of idx.postings[i]) m[pos += d] = 1;
+      }
+      const o = w.toUpperCase();
+      for (let i = lowerBound(idx.orders, o); i < idx.orders.length && idx.orders[i].startsWith(o); i++) {
+        m[idx.orderPos[i]] = 1;
+      }
+      return m;
+    }
+
+    function priceMask(lo, hi) {
+      const m = new Uint8Array(idx.count);
+      const a = lo === null ? 0 : lowerBound(idx.prices, lo);
+      const b = hi === null ? idx.prices.length : lowerBound(idx.prices, hi + 1);
+      for (let i = a; i < b; i++) m[idx.pricePos[i]] = 1;
+      return m;
+    }
+
+    function and(mask, m) {
+      if (!mask) return m;
+      for (let i = 0; i < mask.length; i++) mask[i] &= m[i];
+      return mask;
+    }
+
+    function cents(input) {
+      const v = parseFloat(input.value.replace(',', '.'));
+      return isNaN(v) ? null : Math.round(v * 100);
+    }
+
+    function show(mask) {
+      const view = [];
+      if (mask) for (let i = 0; i < mask.length; i++) if (mask[i]) view.push(i);
+      hits.textContent = mask ? `${view.length} Treffer` : '';
+      tip.style.display = 'none';
+      if (items) {
+        for (let i = 0; i < items.length; i++) items[i].classList.toggle('hide', !!mask && !mask[i]);
+      } else {
+        grid.dispatchEvent(new CustomEvent('filter', { detail: mask ? view : null }));
+      }
+    }
+
+    function run() {
+      const job = ++seq;
+      const words = tokens(q.value), lo = cents(pmin), hi = cents(pmax);
+      if (!words.length && lo === null && hi === null) { show(null); return; }
+      load().then(() => {
+        if (job !== seq) return;   // inzwischen weitergetippt
+        let mask = null;
+        for (const w of words) mask = and(mask, wordMask(w));
+        if (lo !== null || hi !== null) mask = and(mask, priceMask(lo, hi));
+        show(mask);
+      }, () => { hits.textContent = 'Suche nicht verfügbar'; });
+    }
+
+    for (const el of [q, pmin, pmax]) {
+      el.addEventListener('input', () => { clearTimeout(timer); timer = setTimeout(run, 120); });
+    }
+    q.addEventListener('focus', () => load().catch(() => {}), { once: true });
+  })();
+"""
+
+# ============================================================
+# SERVER-KONFIGURATION (Cache-Header, vorkomprimierte Dateien)
+# ============================================================
+SERVER_CONFIG_MARK = "# erzeugt von galerie-generator.py"
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+# Netlify/Cloudflare Pages: _headers; Apache: .htaccess (mod_headers).
+# Alles mit Hash im Namen darf ein Jahr gecacht werden, die Einstiegsdateien
+# (index.html, data/index.json) werden bei jedem Besuch revalidiert.
+NETLIFY_HEADERS = f"""{SERVER_CONFIG_MARK} (fingerprint = yes)
+/images/*
+  Cache-Control: {IMMUTABLE}
+/data/items-*
+  Cache-Control: {IMMUTABLE}
+/data/search.*
+  Cache-Control: {IMMUTABLE}
+/assets/*
+  Cache-Control: {IMMUTABLE}
+/
+  Cache-Control: no-cache
+/index.html
+  Cache-Control: no-cache
+/data/index.json
+  Cache-Control: no-cache
+"""
+
+HTACCESS_CACHE = f"""
+# fingerprint = yes: Dateien mit Hash im Namen ein Jahr cachen
+<IfModule mod_headers.c>
+  <FilesMatch "\\.[0-9a-f]{{{FINGERPRINT_LEN}}}\\.(jpg|webp|avif|json|css|js|woff2)(\\.gz|\\.br)?$">
+    Header set Cache-Control "{IMMUTABLE}"
+  </FilesMatch>
+  <FilesMatch "^(index\\.html|index\\.json)(\\.gz|\\.br)?$">
+    Header set Cache-Control "no-cache"
+  </FilesMatch>
+</IfModule>
+"""
+
+# Apache liefert .br/.gz-Geschwister direkt aus, wenn der Browser sie
+# versteht (mod_rewrite, mod_mime, mod_headers); no-gzip verhindert, dass
+# mod_deflate ein zweites Mal komprimiert
+HTACCESS_PRECOMPRESSED = r"""
+# precompress = yes: vorkomprimierte Dateien ausliefern
+<IfModule mod_rewrite.c>
+  RewriteEngine On
+  RewriteCond %{HTTP:Accept-Encoding} \bbr\b
+  RewriteCond %{REQUEST_FILENAME}.br -f
+  RewriteRule \.(html|json|css|js)$ %{REQUEST_URI}.br [L,E=no-gzip:1,E=no-brotli:1]
+  RewriteCond %{HTTP:Accept-Encoding} \bgzip\b
+  RewriteCond %{REQUEST_FILENAME}.gz -f
+  RewriteRule \.(html|json|css|js)$ %{REQUEST_URI}.gz [L,E=no-gzip:1,E=no-brotli:1]
+</IfModule>
+<IfModule mod_mime.c>
+  AddEncoding br .br
+  AddEncoding gzip .gz
+</IfModule>
+<FilesMatch "\.html\.(br|gz)$">
+  ForceType "text/html; charset=utf-8"
+</FilesMatch>
+<FilesMatch "\.json\.(br|gz)$">
+  ForceType application/json
+</FilesMatch>
+<FilesMatch "\.css\.(br|gz)$">
+  ForceType text/css
+</FilesMatch>
+<FilesMatch "\.js\.(br|gz)$">
+  ForceType application/javascript
+</FilesMatch>
+<IfModule mod_headers.c>
+  <FilesMatch "\.(html|json|css|js)(\.br|\.gz)?$">
+    Header append Vary Accept-Encoding
+  </FilesMatch>
+</IfModule>
+"""
+
+
+def write_server_config(output_path, fingerprint, precompressed=False):
+    """Legt _headers (nur fingerprint) und .htaccess mit den passenden
+    Abschnitten an bzw. entfernt sie wieder, wenn nichts davon aktiv ist
+    (ohne fingerprint wären "immutable"-Regeln für gleichbleibende URLs
+    falsch). Eigene Dateien ohne die Markierung werden nie angefasst."""
+    htaccess = ''
+    if fingerprint:
+        htaccess += HTACCESS_CACHE
+    if precompressed:
+        htaccess += HTACCESS_PRECOMPRESSED
+    files = (('_headers', NETLIFY_HEADERS if fingerprint else None),
+             ('.htaccess', SERVER_CONFIG_MARK + '\n' + htaccess if htaccess else None))
+    for name, body in files:
+        path = output_path / name
+        ours = not path.exists() or path.read_text(encoding='utf-8').startswith(SERVER_CONFIG_MARK)
+        if not ours:
+            if body:
+                warn(f"{path} ist nicht von uns → Server-Regeln dort bitte selbst eintragen")
+        elif body:
+            if not path.exists() or path.read_text(encoding='utf-8') != body:
+                _write_text_atomic(path, [body])
+        elif path.exists():
+            path.unlink()
+
+# ============================================================
+# VORKOMPRIMIEREN (.gz/.br neben HTML, JSON, CSS, JS)
+# ============================================================
+PRECOMPRESS_EXT = ('.html', '.json', '.css', '.js')
+PRECOMPRESS_MIN = 1024      # kleinere Dateien lohnen die Kompression nicht
+
+
+def _compress(path, fmt):
+    """Schreibt path.gz bzw. path.br mit maximaler Kompression (gzip ohne
+    Zeitstempel, damit gleicher Inhalt gleiche Bytes ergibt)."""
+    data = path.read_bytes()
+    body = gzip.compress(data, compresslevel=9, mtime=0) if fmt == 'gz' else brotli.compress(data, quality=11)
+    dest = path.with_name(f"{path.name}.{fmt}")
+    tmp  = dest.with_name('.' + dest.name + '.tmp')
+    tmp.write_bytes(body)
+    os.replace(str(tmp), str(dest))
+    METRICS.add('bytes_written', len(body))
+    return fmt, len(data), len(body)
+
+
+def precompress_output(output_path, manifest_file, formats, workers=None):
+    """Legt für jede Textdatei im Output (PRECOMPRESS_EXT, ab PRECOMPRESS_MIN
+    Bytes) .gz/.br-Geschwister an – parallel, nur für Dateien, deren SHA-1
+    sich seit dem letzten Lauf geändert hat oder deren Geschwister fehlen.
+    Verwaiste Geschwister (Quelle weg, Format abgeschaltet) werden gelöscht;
+    formats = () räumt also nur auf. Gibt die Anzahl komprimierter Dateien zurück."""
+    old     = _read_json(manifest_file, {})
+    hashes  = {}
+    todo    = []
+    skipped = 0
+    siblings = []
+    for dirpath, dirnames, filenames in os.walk(output_path):
+        dirnames[:] = [d for d in dirnames if d != 'images']   # nur Binärdateien
+        for name in filenames:
+            path = Path(dirpath) / name
+            if name.endswith(('.gz', '.br')):
+                siblings.append(path)
+                continue
+            if not name.endswith(PRECOMPRESS_EXT) or not formats:
+                continue
+            if path.stat().st_size < PRECOMPRESS_MIN:
+                continue
+            rel = path.relative_to(output_path).as_posix()
+            hashes[rel] = file_hash(path)
+            missing = [fmt for fmt in formats if not path.with_name(f"{name}.{fmt}").exists()]
+            if old.get(rel) != hashes[rel]:
+                missing = list(formats)
+            if missing:
+                todo.extend((path, fmt) for fmt in missing)
+            else:
+                skipped += 1
+
+    live = {(output_path / rel).with_name(f"{Path(rel).name}.{fmt}") for rel in hashes for fmt in formats}
+    for path in siblings:
+        if path not in live:
+            path.unlink()
+
+    sizes = {}
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for fmt, before, after in pool.map(lambda job: _compress(*job), todo):
+                b, a = sizes.get(fmt, (0, 0))
+                sizes[fmt] = (b + before, a + after)
+    if formats:
+        _write_json_atomic(manifest_file, hashes)
+        ratios = ', '.join(f"{fmt} {b / 1024:.0f} → {a / 1024:.0f} KB" for fmt, (b, a) in sorted(sizes.items()))
+        ok(f"Vorkomprimiert ({'/'.join(formats)}): {len({p for p, _ in todo})} Dateien neu, "
+           f"{skipped} unverändert{f' ({ratios})' if ratios else ''}")
+    elif manifest_file.exists():
+        manifest_file.unlink()
+    return len({p for p, _ in todo})
+
+# ============================================================
+# KACHELN
+# ============================================================
+def iter_gallery_items(images, articles, fallback_url):
+    """Pro Galerie-Bild (stem, fname, href, beschreibung, preis) – gemeinsame
+    Grundlage für die Inline-Kacheln und die JSON-Datensätze. Ein Generator,
+    damit index.html Kachel für Kachel geschrieben werden kann."""
+    for img in images:
+        stem    = img.stem.upper()   # z.B. BN00561
+        fname   = img.name.lower()   # z.B. bn00561.jpg
+        article = articles.get(stem)
+        if article is None:
+            yield stem, fname, fallback_url, '', ''
+        else:
+            # Detail-Link: per attach_wp verknüpfte WP-URL, sonst Fallback
+            yield stem, fname, article.href or fallback_url, article.desc, article.price_text
+
+
+def item_record(item, fallback_url, variants=None, size=None, background=None, src=None):
+    """Kompakter Datensatz für die JSON-Shards; Escaping übernimmt der Client."""
+    stem, fname, href, desc_raw, price_fmt = item
+    rec = {'n': stem, 'f': src or fname}
+    if href != fallback_url:
+        rec['h'] = href
+    if desc_raw:
+        rec['d'] = desc_raw
+    if price_fmt:
+        rec['p'] = price_fmt
+    if variants:
+        rec['s'] = {THUMB_MIME[fmt]: _srcset(entries) for fmt, entries in variants.items()}
+    if size:
+        rec['w'], rec['ht'] = size
+    if background:
+        rec['b'] = background
+    return rec
+
+
+def render_item(item, variants=None, size=None, background=None, src=None):
+    """HTML einer Kachel (inline-Modus). size: (breite, höhe) aus probe_images,
+    background: Platzhalter aus build_placeholders, src: Dateiname in images/,
+    falls er vom Kachelnamen abweicht (fingerprint)."""
+    stem, fname, href, desc_raw, price_fmt = item
+    src = src or fname
+
+    # Beschreibung für Tooltip (HTML-escapen)
+    desc_attr = desc_raw.replace('&', '&amp;').replace('"', '&quot;').replace('<', '&lt;').replace('>', '&gt;') if desc_raw else ''
+    tooltip_attr = f' data-tooltip="{desc_attr}"' if desc_attr else ''
+    price_html   = f'<div class="price">{price_fmt}</div>' if price_fmt else ''
+    wrap_style   = f' style="background:{background}"' if background else ''
+
+    # Bild: mit Thumbnails als <picture> + srcset, sonst das Original-JPG
+    img_html = f'<img src="images/{src}"{_size_attrs(size)} alt="{stem}" title="{stem}" loading="lazy">'
+    if variants:
+        img_html = render_picture(src, stem, variants, size)
+
+    return f"""
+    <div class="item"{tooltip_attr}>
+      <a href="{href}" target="_blank" rel="noopener" title="Bei Booklooker kaufen">
+        <div class="thumb-wrap"{wrap_style}>
+          {img_html}
+          {price_html}
+        </div>
+      </a>
+      <div class="label">{stem}</div>
+      <a class="cover-update-btn" href="https://inserate.wdeu.de/#cover={stem}" title="Neues Foto aufnehmen">📷</a>
+    </div>"""
+
+# ============================================================
+# SEITEN-ASSETS (CSS/JS, Schrift – assets = external)
+# ============================================================
+# Stylesheet der Galerie. assets = inline: komplett in index.html;
+# external: minifiziert nach assets/gallery.css, in index.html nur die
+# Abschnitte, die für den ersten Bildschirm nötig sind (siehe critical_css).
+GALLERY_CSS = """    /* ── Reset & Base ── */
+    *, *::before, *::after { box-sizing: border-box; margin: 0; padding: 0; }
+
+    body {
+      background: #f4f2ee;
+      font-family: 'Raleway', sans-serif;
+      color: #333;
+    }
+
+    /* ── Header ── */
+    header {
+      background: #fff;
+      border-bottom: 2px solid #e0ddd5;
+      padding: 18px 24px 14px;
+      position: sticky;
       top: 0;
       z-index: 100;
-    }}
+    }
 
-    header h1 {{
+    header h1 {
       font-size: 22px;
       font-weight: 700;
       letter-spacing: 0.04em;
       margin-bottom: 2px;
-    }}
+    }
 
-    header .sub {{
+    header .sub {
       font-size: 13px;
       font-weight: 300;
       color: #848681;
-    }}
+    }
 
-    header .hint {{
+    header .hint {
       font-size: 11px;
       color: #37677B;
       margin-top: 4px;
-    }}
+    }
 
-    header .stats {{
+    header .stats {
       font-size: 11px;
       color: #aaa;
       margin-top: 4px;
-    }}
+    }
 
     /* ── Header-Row: Info links, Slider rechts ── */
-    .header-row {{
+    .header-row {
       display: flex;
       align-items: flex-end;
       justify-content: space-between;
       gap: 12px;
       margin-top: 6px;
-    }}
+    }
 
     /* ── Slider ── */
-    .size-control {{
+    .size-control {
       display: flex;
       align-items: center;
       gap: 8px;
       flex-shrink: 0;
-    }}
-    .size-control label {{
+    }
+    .size-control label {
       font-size: 11px;
       color: #848681;
       white-space: nowrap;
-    }}
-    .size-control input[type=range] {{
+    }
+    .size-control input[type=range] {
       width: 110px;
       accent-color: #37677B;
       cursor: pointer;
-    }}
-    .size-control .size-val {{
+    }
+    .size-control .size-val {
       font-size: 11px;
       color: #37677B;
       font-weight: 600;
       min-width: 32px;
-    }}
+    }
+
+    /* ── Suche ── */
+    .search {
+      display: flex;
+      flex-wrap: wrap;
+      align-items: center;
+      gap: 8px;
+      margin-top: 8px;
+    }
+    .search[hidden] { display: none; }
+    .search input {
+      font: inherit;
+      font-size: 13px;
+      color: #333;
+      background: #fff;
+      border: 1.5px solid #e0ddd5;
+      border-radius: 6px;
+      padding: 5px 8px;
+    }
+    .search input:focus { outline: none; border-color: #37677B; }
+    .search input[type=search] { flex: 1 1 200px; min-width: 0; }
+    .search input[type=number] { width: 78px; }
+    .search .hits {
+      font-size: 11px;
+      color: #37677B;
+      font-weight: 600;
+    }
+    .item.hide { display: none; }
 
     /* ── Grid ── */
-    .grid {{
+    .grid {
+      --grid-pad: 20px;
       display: grid;
       grid-template-columns: repeat(auto-fill, minmax(var(--thumb-size, 130px), 1fr));
       gap: 12px;
-      padding: 20px;
-    }}
+      padding: var(--grid-pad);
+    }
 
-    @media (max-width: 480px) {{
-      .grid {{
+    @media (max-width: 480px) {
+      .grid {
+        --grid-pad: 12px;
         gap: 8px;
-        padding: 12px;
-      }}
-    }}
+      }
+    }
+
+    /* ── Platzhalter (sharded: Shard noch nicht geladen) ── */
+    .item.placeholder .cover-ph {
+      width: 100%;
+      aspect-ratio: 2 / 3;
+      background: #ebe8e1;
+    }
 
     /* ── Item ── */
-    .item {{
+    .item {
       position: relative;
       display: flex;
       flex-direction: column;
@@ -597,10 +2673,10 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       overflow: hidden;
       box-shadow: 0 1px 4px rgba(0,0,0,0.08);
       transition: transform 0.15s, box-shadow 0.15s;
-    }}
+    }
 
     /* ── Cover-Update-Button (nur im Update-Modus sichtbar) ── */
-    .item a.cover-update-btn {{
+    .item a.cover-update-btn {
       display: none;
       position: absolute;
       top: 6px;
@@ -613,37 +2689,51 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       line-height: 1;
       text-decoration: none;
       z-index: 5;
-    }}
+    }
 
-    body.update-mode .item a.cover-update-btn {{
+    body.update-mode .item a.cover-update-btn {
       display: block;
-    }}
+    }
 
-    .item:hover {{
+    .item:hover {
       transform: translateY(-3px);
       box-shadow: 0 4px 12px rgba(0,0,0,0.15);
-    }}
+    }
 
-    .item a {{
+    .item a {
       display: block;
       width: 100%;
-    }}
+    }
 
-    .item img {{
+    .item picture {
+      display: block;
+    }
+
+    .item img {
       width: 100%;
+      height: auto;          /* width/height-Attribute nur fürs Seitenverhältnis */
       aspect-ratio: 2 / 3;   /* feste Kachel für alle Cover, formatunabhängig */
       object-fit: cover;      /* füllt randlos, beschneidet minimal am Rand */
       display: block;
-    }}
+    }
 
     /* ── Thumb-Wrapper für Preis-Overlay ── */
-    .thumb-wrap {{
+    .thumb-wrap {
       position: relative;
       width: 100%;
-    }}
+    }
+
+    /* ── Platzhalter (placeholders = color/blur): Cover blendet darüber ein ── */
+    .grid.lqip .item img {
+      opacity: 0;
+      transition: opacity 0.35s ease;
+    }
+    .grid.lqip .item img.in {
+      opacity: 1;
+    }
 
     /* ── Preis-Overlay ── */
-    .price {{
+    .price {
       position: absolute;
       bottom: 0;
       left: 0;
@@ -657,10 +2747,10 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       padding: 4px 2px;
       letter-spacing: 0.03em;
       pointer-events: none;
-    }}
+    }
 
     /* ── Artikelnummer-Label ── */
-    .label {{
+    .label {
       font-family: 'Courier New', monospace;
       font-size: 11px;
       font-weight: bold;
@@ -671,10 +2761,10 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       width: 100%;
       background: #f9f8f6;
       border-top: 1px solid #eee;
-    }}
+    }
 
     /* ── Tooltip ── */
-    .tooltip-box {{
+    .tooltip-box {
       display: none;
       position: fixed;
       z-index: 9999;
@@ -689,10 +2779,10 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       box-shadow: 0 4px 18px rgba(0,0,0,0.35);
       pointer-events: none;
       word-break: break-word;
-    }}
+    }
 
     /* ── X-Button (zurück zu wdeu.de) ── */
-    .close-btn {{
+    .close-btn {
       position: fixed;
       top: 14px;
       right: 16px;
@@ -710,11 +2800,11 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       font-size: 18px;
       box-shadow: 0 1px 4px rgba(0,0,0,0.1);
       transition: border-color 0.2s, color 0.2s;
-    }}
-    .close-btn:hover {{ border-color: #37677B; color: #37677B; }}
+    }
+    .close-btn:hover { border-color: #37677B; color: #37677B; }
 
     /* ── Footer ── */
-    footer {{
+    footer {
       text-align: center;
       padding: 20px 24px;
       font-size: 12px;
@@ -725,16 +2815,16 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       flex-direction: column;
       align-items: center;
       gap: 14px;
-    }}
+    }
 
-    .footer-icons {{
+    .footer-icons {
       display: flex;
       gap: 28px;
       align-items: center;
       justify-content: center;
-    }}
+    }
 
-    .footer-btn {{
+    .footer-btn {
       background: none;
       border: none;
       cursor: pointer;
@@ -746,87 +2836,58 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
       display: inline-flex;
       align-items: center;
       transition: color 0.15s;
-    }}
-    .footer-btn:hover {{ color: #37677B; }}
-  </style>
-</head>
-<body>
-
-<a class="close-btn" href="https://wdeu.de" title="Zurück zu wdeu.de">✕</a>
-
-<header>
-  <h1>Booq</h1>
-  <div class="sub">wdeu bei Booklooker.de</div>
-  <div class="hint">Klick aufs Cover → direkt zu Booklooker</div>
-  <div class="header-row">
-    <div class="stats">{count} Bücher · Stand: {now}</div>
-    <div class="size-control">
-      <label for="sizeSlider">🔍</label>
-      <input type="range" id="sizeSlider" min="80" max="280" step="10" value="130"
-             oninput="setSize(this.value)">
-      <span class="size-val" id="sizeVal">130px</span>
-    </div>
-  </div>
-</header>
-
-<main>
-  <div class="grid">{items_html}
-  </div>
-</main>
-
-<div class="tooltip-box" id="tooltip"></div>
+    }
+    .footer-btn:hover { color: #37677B; }
+"""
 
-<footer>
-  <div class="footer-icons">
-    <a class="footer-btn" href="https://wdeu.de" title="wdeu.de">💡</a>
-    <button class="footer-btn" id="share-btn" title="Seite teilen">
-      <svg width="22" height="22" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
-        <path d="M4 12v8a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2v-8"/>
-        <polyline points="16 6 12 2 8 6"/>
-        <line x1="12" y1="2" x2="12" y2="15"/>
-      </svg>
-    </button>
-    <button class="footer-btn" id="homescreen-btn" title="Zum Homescreen hinzufügen">📌</button>
-  </div>
-  <div>Fachbücher Psychologie &amp; Sozialwissenschaften · wdeu bei Booklooker.de</div>
-</footer>
+# Abschnitte (/* ── Name ── */, Anfang des Namens bis zum ersten Leerzeichen),
+# die der erste Bildschirm braucht: Seite, Header und die Kacheln im Grid.
+# Alles andere (Suche, Tooltip, Footer, …) kommt erst mit gallery.css.
+CRITICAL_CSS = ('Reset', 'Header', 'Header-Row:', 'Grid', 'Platzhalter (sharded:', 'Item',
+                'Cover-Update-Button', 'Thumb-Wrapper', 'Preis-Overlay', 'Artikelnummer-Label')
 
-<script>
-  const STORAGE_KEY = 'booq-thumb-size';
+# Seiten-Script (Slider, Tooltip, Teilen, Update-Modus); FADE_IN_JS und
+# VIRTUAL_GRID_JS werden je nach Konfiguration angehängt
+GALLERY_JS = r"""  const STORAGE_KEY = 'booq-thumb-size';
   const slider = document.getElementById('sizeSlider');
   const sizeVal = document.getElementById('sizeVal');
   const grid = document.querySelector('.grid');
 
-  function setSize(v) {{
+  function setSize(v) {
     v = parseInt(v);
     grid.style.setProperty('--thumb-size', v + 'px');
     sizeVal.textContent = v + 'px';
     slider.value = v;
-    try {{ localStorage.setItem(STORAGE_KEY, v); }} catch(e) {{}}
-  }}
+    grid.dispatchEvent(new Event('thumbsize'));
+    try { localStorage.setItem(STORAGE_KEY, v); } catch(e) {}
+  }
 
   // Gespeicherte Größe laden
-  try {{
+  try {
     const saved = localStorage.getItem(STORAGE_KEY);
     if (saved) setSize(saved);
-  }} catch(e) {{}}  // ── Tooltip ──────────────────────────────────────────────
+  } catch(e) {}  // ── Tooltip (delegiert am Grid, gilt auch für nachgerenderte Kacheln) ──
   const tip = document.getElementById('tooltip');
   let hideTimer;
 
-  document.querySelectorAll('.item[data-tooltip]').forEach(item => {{
-    item.addEventListener('mouseenter', e => {{
-      clearTimeout(hideTimer);
-      tip.textContent = item.dataset.tooltip;
-      tip.style.display = 'block';
-      positionTip(e);
-    }});
-    item.addEventListener('mousemove', positionTip);
-    item.addEventListener('mouseleave', () => {{
-      hideTimer = setTimeout(() => {{ tip.style.display = 'none'; }}, 80);
-    }});
-  }});
-
-  function positionTip(e) {{
+  grid.addEventListener('mouseover', e => {
+    const item = e.target.closest('.item[data-tooltip]');
+    if (!item || item.contains(e.relatedTarget)) return;
+    clearTimeout(hideTimer);
+    tip.textContent = item.dataset.tooltip;
+    tip.style.display = 'block';
+    positionTip(e);
+  });
+  grid.addEventListener('mousemove', e => {
+    if (e.target.closest('.item[data-tooltip]')) positionTip(e);
+  });
+  grid.addEventListener('mouseout', e => {
+    const item = e.target.closest('.item[data-tooltip]');
+    if (!item || item.contains(e.relatedTarget)) return;
+    hideTimer = setTimeout(() => { tip.style.display = 'none'; }, 80);
+  });
+
+  function positionTip(e) {
     const pad = 14;
     const tw = tip.offsetWidth;
     const th = tip.offsetHeight;
@@ -836,51 +2897,808 @@ def generate_html(gallery_path, output_path, article_info=None, wp_links=None, o
     if (y + th > window.innerHeight - 8) y = e.clientY - th - pad;
     tip.style.left = x + 'px';
     tip.style.top  = y + 'px';
-  }}
+  }
 
   // ── Share & Homescreen ──────────────────────────────────
-  document.getElementById('share-btn').addEventListener('click', async () => {{
-    if (navigator.share) {{
-      try {{
-        await navigator.share({{
+  document.getElementById('share-btn').addEventListener('click', async () => {
+    if (navigator.share) {
+      try {
+        await navigator.share({
           title: 'Bücherkiste – wdeu bei Booklooker.de',
           url: 'https://galerie.wdeu.de'
-        }});
-      }} catch {{}}
-    }} else {{
+        });
+      } catch {}
+    } else {
       await navigator.clipboard.writeText('https://galerie.wdeu.de');
       alert('Link kopiert!');
-    }}
-  }});
+    }
+  });
 
-  document.getElementById('homescreen-btn').addEventListener('click', () => {{
+  document.getElementById('homescreen-btn').addEventListener('click', () => {
     const isIOS = /iphone|ipad|ipod/i.test(navigator.userAgent);
     const isAndroid = /android/i.test(navigator.userAgent);
-    if (isIOS) {{
+    if (isIOS) {
       alert('Tippe unten auf das Teilen-Symbol ⬆️, dann „Zum Home-Bildschirm".');
-    }} else if (isAndroid) {{
+    } else if (isAndroid) {
       alert('Tippe oben rechts auf das Menü ⋮, dann „Zum Startbildschirm hinzufügen".');
-    }} else {{
+    } else {
       alert('Öffne galerie.wdeu.de auf deinem Smartphone und wähle im Browser-Menü „Zum Homescreen hinzufügen".');
-    }}
-  }});
+    }
+  });
 
   // ── Update-Modus (?update=1) ────────────────────────────
   const updateMode = new URLSearchParams(location.search).has('update');
   if (updateMode) document.body.classList.add('update-mode');
+"""
+
+
+def minify_css(css):
+    """Kommentare und überflüssige Leerzeichen raus (keine Strings mit
+    Sonderzeichen im Stylesheet, daher genügt das)."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return css.replace(';}', '}').strip()
+
+
+def minify_js(js):
+    """Konservativ: Einrückung, Leerzeilen und reine Kommentarzeilen weg,
+    Zeilenumbrüche bleiben (keine Probleme mit automatischen Semikolons)."""
+    lines = (line.strip() for line in js.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+
+def critical_css(css):
+    """Nur die Abschnitte aus CRITICAL_CSS."""
+    parts = re.split(r'(?=/\* ── )', css)
+    return ''.join(p for p in parts
+                   if any(p.startswith(f'/* ── {name} ') for name in CRITICAL_CSS))
+
+
+def write_asset(assets_dir, name, body, fingerprint=False):
+    """Schreibt body (bytes) nach assets_dir/name – bei fingerprint unter
+    hashed_name – und gibt die URL relativ zu index.html zurück; ohne
+    fingerprint mit ?v=<hash>, damit Browser Änderungen trotzdem sehen.
+    Unveränderte Dateien werden nicht neu geschrieben."""
+    digest = hashlib.sha1(body).hexdigest()
+    fname  = hashed_name(name, digest) if fingerprint else name
+    path   = assets_dir / fname
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not (path.exists() and path.stat().st_size == len(body) and file_hash(path) == digest):
+        tmp = path.with_name('.' + path.name + '.tmp')
+        tmp.write_bytes(body)
+        os.replace(str(tmp), str(path))
+        METRICS.add('bytes_written', len(body))
+    url = f"{assets_dir.name}/{fname}"
+    return url if fingerprint else f"{url}?v={digest[:FINGERPRINT_LEN]}"
+
+# ============================================================
+# SCHRIFT (Raleway selbst hosten – assets = external)
+# ============================================================
+GOOGLE_FONTS_HTML = """  <!-- Google Fonts -->
+  <link href="https://fonts.googleapis.com/css2?family=Raleway:wght@300;400;700&display=swap"
+        rel="stylesheet">
+
+"""
+FONT_CSS_URL = "https://fonts.googleapis.com/css2?family=Raleway:wght@300;400;700&display=swap"
+FONT_SUBSETS = ('latin', 'latin-ext')
+# Google Fonts liefert woff2 nur an Browser, die es können
+FONT_UA = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+           "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+# Zeichen der gekürzten Schrift (fontTools): Latin-1, Striche, Anführungszeichen, …, €
+FONT_UNICODES = [*range(0x20, 0x7F), *range(0xA0, 0x100),
+                 0x2013, 0x2014, 0x2018, 0x2019, 0x201A, 0x201C, 0x201D, 0x201E,
+                 0x2022, 0x2026, 0x20AC]
+FONT_FACE_RE   = re.compile(r'/\*\s*([\w-]+)\s*\*/\s*(@font-face\s*\{[^}]*\})')
+FONT_URL_RE    = re.compile(r'url\((https://[^)]+\.woff2)\)')
+FONT_WEIGHT_RE = re.compile(r'font-weight:\s*([\d ]+);')
+FONT_STYLE_RE  = re.compile(r'font-style:\s*(\w+);')
+
+
+def fetch_font(cache_dir):
+    """Holt Raleway einmalig von Google Fonts nach cache_dir (CSS plus die
+    woff2-Dateien der FONT_SUBSETS) – danach genügt der Cache, auch offline.
+    Gibt [(subset, @font-face-block, woff2-pfad)] zurück, [] ohne Schrift."""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    css_file = cache_dir / "raleway.css"
+    if not css_file.exists():
+        log("Lade Raleway von Google Fonts (einmalig) ...")
+        try:
+            with make_session(2) as session:
+                r = session.get(FONT_CSS_URL, headers={'User-Agent': FONT_UA}, timeout=10)
+                r.raise_for_status()
+                css  = r.text
+                urls = {u for subset, block in FONT_FACE_RE.findall(css) if subset in FONT_SUBSETS
+                        for u in FONT_URL_RE.findall(block)}
+                for url in urls:
+                    font = session.get(url, timeout=20)
+                    font.raise_for_status()
+                    tmp = cache_dir / ('.' + url.rsplit('/', 1)[-1] + '.tmp')
+                    tmp.write_bytes(font.content)
+                    os.replace(str(tmp), str(cache_dir / url.rsplit('/', 1)[-1]))
+        except requests.RequestException as e:
+            warn(f"Raleway nicht ladbar ({e}) → Systemschrift")
+            return []
+        # CSS zuletzt: markiert den Cache als vollständig
+        _write_text_atomic(css_file, [css])
+
+    faces = []
+    for subset, block in FONT_FACE_RE.findall(css_file.read_text(encoding='utf-8')):
+        url = FONT_URL_RE.search(block)
+        if subset in FONT_SUBSETS and url:
+            path = cache_dir / url.group(1).rsplit('/', 1)[-1]
+            if path.exists():
+                faces.append((subset, block, path))
+    return faces
+
+
+def _unicode_range(codes):
+    """[0x20, 0x21, …] → 'U+20-7E,U+A0-FF,…' für @font-face."""
+    ranges = []
+    for c in sorted(set(codes)):
+        if ranges and ranges[-1][1] == c - 1:
+            ranges[-1][1] = c
+        else:
+            ranges.append([c, c])
+    return ','.join(f"U+{a:X}" if a == b else f"U+{a:X}-{b:X}" for a, b in ranges)
+
+
+def _subset_font(src, dest):
+    """Kürzt src auf FONT_UNICODES (alle Gewichte/Achsen bleiben) und
+    schreibt woff2 nach dest. False ohne fontTools/brotli."""
+    if ft_subset is None:
+        return False
+    try:
+        opts = ft_subset.Options()
+        opts.flavor = 'woff2'
+        opts.layout_features = ['*']
+        font = ft_subset.load_font(str(src), opts)
+        subsetter = ft_subset.Subsetter(opts)
+        subsetter.populate(unicodes=FONT_UNICODES)
+        subsetter.subset(font)
+        tmp = dest.with_name('.' + dest.name + '.tmp')
+        ft_subset.save_font(font, str(tmp), opts)
+        os.replace(str(tmp), str(dest))
+        return True
+    except Exception as e:   # z.B. brotli fehlt für woff2
+        log(f"Schrift nicht gekürzt ({e}) → Google-Subset unverändert")
+        return False
+
+
+def build_font_assets(assets_dir, cache_dir, fingerprint=False):
+    """Raleway nach assets/fonts/. Mit fontTools wird das latin-Subset auf
+    FONT_UNICODES gekürzt (unicode-range passend). Google liefert je Gewicht
+    eine eigene Datei oder eine variable Schrift für alle – der Dateiname nennt
+    Subset, Gewichte und Stil der Datei, damit sich Gewichte nicht gegenseitig
+    überschreiben. Gibt (@font-face-css, url der Datei zum Vorladen oder None,
+    geschriebene urls) zurück."""
+    faces = []
+    for subset, block, path in fetch_font(cache_dir):
+        if subset == 'latin':
+            trimmed = cache_dir / (path.stem + '-subset.woff2')
+            if trimmed.exists() or _subset_font(path, trimmed):
+                path  = trimmed
+                block = re.sub(r'unicode-range:[^;]*;', f'unicode-range: {_unicode_range(FONT_UNICODES)};', block)
+        weight = FONT_WEIGHT_RE.search(block)
+        style  = FONT_STYLE_RE.search(block)
+        faces.append((subset, block, path, weight.group(1).strip().replace(' ', '-') if weight else '400',
+                      style.group(1) if style else 'normal'))
+
+    names = {}
+    for subset, _, path, weight, style in faces:
+        weights, styles = names.setdefault(path, (subset, set(), set()))[1:]
+        weights.add(weight)
+        styles.add(style)
+    urls, blocks, preload = {}, [], None
+    for subset, block, path, weight, style in faces:
+        if path not in urls:
+            _, weights, styles = names[path]
+            name = f"fonts/raleway-{subset}-{'-'.join(sorted(weights))}-{'-'.join(sorted(styles))}.woff2"
+            urls[path] = write_asset(assets_dir, name, path.read_bytes(), fingerprint)
+        # vorladen: der Fließtext (latin, 400, normal)
+        if subset == 'latin' and (preload is None or (weight, style) == ('400', 'normal')):
+            preload = urls[path]
+        blocks.append(FONT_URL_RE.sub(f'url({urls[path]})', block))
+    if faces:
+        sizes = sum(p.stat().st_size for p in urls) / 1024
+        ok(f"Raleway selbst gehostet: {len(urls)} Datei(en), {sizes:.0f} KB")
+    return '\n'.join(blocks), preload, list(urls.values())
+
+# ============================================================
+# HTML GENERIEREN
+# ============================================================
+def generate_html(gallery_path, output_path, articles=None, wp_links=None, order_prefix=None, wp_desc=None, seller_id='', cover_base_url='',
+                  cover_workers=16, cover_connections=None, incremental=True, thumbnails=None,
+                  render_mode='inline', shard_size=500, index=None, refresh_covers=True, link_mode='auto',
+                  cover_cache_limit=None, placeholders='off', fingerprint=False, assets='inline',
+                  precompress=False, search=True):
+    if order_prefix is None:
+        order_prefix = ['BN', 'BLX']
+
+    # articles: ArticleTable (WP-Daten per attach_wp schon verknüpft); ein
+    # dict orderNo → {'isbn', 'price'} plus wp_links/wp_desc geht weiterhin
+    if not isinstance(articles, ArticleTable):
+        articles = ArticleTable.from_info(articles or {})
+    if wp_links or wp_desc:
+        articles.attach_wp(wp_links or {}, wp_desc or {})
+    cover_cache_limit = cover_cache_limit or {}
+
+    # Fallback-URL wenn kein Direktlink verfügbar
+    if seller_id:
+        FALLBACK_URL = f"https://www.booklooker.de/B%C3%BCcher/Angebote/showAlluID={seller_id}?setMediaType=0&sortOrder=offerDate&sortDirection=desc"
+    else:
+        FALLBACK_URL = "https://www.booklooker.de/"
+
+    # a) Output-Ordner anlegen — images/ wird inkrementell abgeglichen
+    #    (Manifest neben .cover-cache), bei incremental = no komplett neu gebaut
+    output_path.mkdir(parents=True, exist_ok=True)
+    images_out    = output_path / "images"
+    manifest_file = output_path.parent / ".images-manifest.json"
+    if not incremental:
+        if images_out.exists():
+            shutil.rmtree(str(images_out))
+        if manifest_file.exists():
+            manifest_file.unlink()
+    images_out.mkdir(exist_ok=True)
+
+    # Favicon kopieren falls vorhanden
+    favicon_src = Path(__file__).parent / "favicon.png"
+    if favicon_src.exists():
+        shutil.copy2(str(favicon_src), str(output_path / "favicon.png"))
+        ok("favicon.png kopiert")
+
+    # Cover-Quelle: cover_base_url (cover.wdeu.de) hat VORRANG vor dem lokalen
+    # BL-Bilder-Download. So darf die Galerie schöner sein als die BL-Anzeige:
+    # liegt auf cover.wdeu.de ein {Nr}.jpg (z.B. neu hochgeladenes Porträt),
+    # wird dieses genommen; sonst das lokale BL-Download-Bild (i.d.R. das alte
+    # Schrägfoto). Das umgeht den BL-Cover-Cache komplett — für die Galerie.
+    if index is None:
+        index = scan_gallery(gallery_path)
+    local_images = {}   # {nr}.jpg (lowercase) -> Pfad des lokalen BL-Bilds
+    for path, _, _ in index.by_order(order_prefix).values():
+        local_images[path.name.lower()] = path
+
+    # b) cover.wdeu.de zuerst (maßgeblich) — ETag-Cache verhindert Re-Downloads
+    #    unveränderter Cover (conditional GET → 304 statt erneutem Transfer).
+    cover_hits = set()
+    cache      = CoverCache(output_path.parent / ".cover-cache") if cover_base_url else None
+    if cover_base_url and refresh_covers:
+        log(f"Prüfe cover.wdeu.de für {len(articles)} Artikel (Vorrang, {cover_workers} parallel) ...")
+        cover_hits = fetch_covers(cover_base_url, articles.keys(), cache,
+                                  cover_workers, cover_connections)
+        from_cover = len(cover_hits)
+        ok(f"{from_cover} Cover von cover.wdeu.de (Vorrang)")
+    elif cover_base_url:
+        # --watch zwischen zwei API-Refreshs: Cover-Cache enthält genau die
+        # Treffer der letzten Prüfung (404 räumt ihn auf) → kein Netzwerk
+        cover_hits = cache.hits(orderNo.lower() + '.jpg' for orderNo in articles)
+        ok(f"{len(cover_hits)} Cover aus dem Cover-Cache (ohne Abruf)")
+
+    # c) Lokale BL-Bilder für alles, was cover.wdeu.de NICHT geliefert hat
+    log("Ergänze mit lokalen BL-Bildern ...")
+    sources = {fname: cache.path(fname) for fname in cover_hits}
+    from_local = 0
+    for fname, src in local_images.items():
+        if fname in cover_hits:
+            continue   # cover.wdeu.de hat Vorrang, lokales Bild überspringen
+        sources[fname] = src
+        from_local += 1
+    ok(f"Galerie-Bilder: {len(cover_hits)} von cover.wdeu.de + {from_local} lokal "
+       f"= {len(cover_hits) + from_local} gesamt")
+
+    # Vor dem Kopieren nur die JPEG-Header der Quellen lesen: Maße für
+    # width/height, kaputte Dateien kommen gar nicht erst nach images/.
+    # Ein kaputtes Cover aus dem Cover-Cache wird beim nächsten Lauf neu geholt.
+    dims = {}
+
+    def check(files):
+        found, bad = probe_images(files, output_path.parent / ".probe-cache.json")
+        dims.update(found)
+        return bad
+
+    stats, synced = sync_images(sources, images_out, manifest_file, link_mode=link_mode,
+                                fingerprint=fingerprint, check=check)
+    bad = stats['rejected']
+    for fname, reason in sorted(bad.items()):
+        warn(f"Übersprungen: {sources[fname]} ({reason})")
+        if fname in cover_hits:
+            cache.drop(fname)
+    ok(f"Bilder-Sync: {stats['added']} neu, {stats['updated']} aktualisiert, "
+       f"{stats['removed']} entfernt, {stats['kept']} unverändert{_via_text(stats)}")
+
+    # Cover-Cache klein halten: Verkauftes raus, dann LRU bis zur Obergrenze
+    # (erst nach dem Sync – images/ hat seine eigene Kopie bzw. seinen Link)
+    if cache is not None:
+        pruned  = cache.prune({orderNo.lower() + '.jpg' for orderNo in articles})
+        evicted = cache.evict(cover_cache_limit.get('entries', 0),
+                              cover_cache_limit.get('mb', 0) * 1024 * 1024)
+        cache.save()
+        ok(f"Cover-Cache: {len(cache.entries)} Einträge, {cache.total_bytes() / 1e6:.1f} MB "
+           f"({pruned} verkaufte entfernt, {evicted} per LRU verdrängt)")
+
+    # c2) Thumbnails: kleine WebP/AVIF-Varianten für srcset (Cache nach SHA-1)
+    thumbs = {}
+    if thumbnails and Image is None:
+        log("Pillow nicht installiert → keine Thumbnails (pip install pillow)")
+    elif thumbnails:
+        formats = _thumb_formats(thumbnails['formats'])
+        if formats:
+            thumbs = build_thumbnails(
+                synced, images_out / "thumbs", output_path.parent / ".thumb-cache",
+                output_path.parent / ".thumbs-manifest.json",
+                thumbnails['widths'], formats, thumbnails.get('workers'), link_mode, fingerprint, dims)
+    if not thumbs and (images_out / "thumbs").exists():
+        shutil.rmtree(str(images_out / "thumbs"))
+
+    # c3) Platzhalter: Farbe bzw. Mini-Vorschau inline, Cover blendet darüber ein
+    backgrounds = {}
+    if placeholders != 'off' and Image is None:
+        log("Pillow nicht installiert → keine Platzhalter (pip install pillow)")
+    elif placeholders != 'off':
+        backgrounds = build_placeholders(
+            synced, images_out, output_path.parent / ".placeholder-cache.json", placeholders,
+            (thumbnails or {}).get('workers'))
+
+    # d) images_out enthält nach dem Sync genau die Cover aus sources
+    #    (bei fingerprint unter dem Namen aus names)
+    images = sorted(
+        [images_out / fname for fname in sources
+         if fname not in bad and is_valid(fname, order_prefix)[0]],
+        key=lambda f: f.name.upper(), reverse=True
+    )
+    names = {fname: entry['name'] for fname, entry in synced.items()} if fingerprint else {}
+
+    # Kacheln (inline, beim Schreiben gestreamt) bzw. JSON-Datensätze (sharded)
+    sharded = render_mode == 'sharded'
+    records = []
+    if sharded:
+        records = [item_record(item, FALLBACK_URL, thumbs.get(item[1]), dims.get(item[1]),
+                               backgrounds.get(item[1]), names.get(item[1]))
+                   for item in iter_gallery_items(images, articles, FALLBACK_URL)]
+
+    now = datetime.now().strftime("%d.%m.%Y %H:%M")
+    count = len(images)
+
+    data_dir    = output_path / "data"
+    grid_attrs  = ""
+    grid_script = ""
+    grid_class  = " lqip" if backgrounds else ""
+    fade_script = FADE_IN_JS if backgrounds else ""
+    if sharded:
+        n_shards = write_shards(records, data_dir, shard_size, FALLBACK_URL,
+                                '' if fingerprint else datetime.now().strftime("%Y%m%d%H%M%S"),
+                                fingerprint)
+        ok(f"{count} Artikel in {n_shards} JSON-Shards → {data_dir}")
+        grid_attrs  = ' data-src="data/index.json"'
+        grid_script = VIRTUAL_GRID_JS
+    elif data_dir.exists() and not search:
+        shutil.rmtree(str(data_dir))
+    elif data_dir.exists():
+        # inline mit Suche: von data/ bleibt nur der Suchindex
+        for f in [*data_dir.glob("items-*.json"), data_dir / "index.json"]:
+            if f.exists():
+                f.unlink()
+
+    # Suchindex für Bestellnummer, ISBN, Beschreibung und Preisspanne
+    search_html   = ""
+    search_script = ""
+    if search:
+        data_dir.mkdir(parents=True, exist_ok=True)
+        search_url, n_terms, n_bytes = write_search_index([img.stem.upper() for img in images],
+                                                          articles, data_dir, fingerprint)
+        ok(f"Suchindex: {n_terms} Wörter, {n_bytes / 1024:.0f} KB → {output_path / search_url.split('?')[0]}")
+        search_html = f"""
+  <div class="search" id="search" data-index="{search_url}" hidden>
+    <input type="search" id="q" placeholder="Nr., ISBN oder Stichwort" aria-label="Suche" autocomplete="off">
+    <input type="number" id="pmin" min="0" step="any" inputmode="decimal" placeholder="€ ab" aria-label="Preis ab">
+    <input type="number" id="pmax" min="0" step="any" inputmode="decimal" placeholder="€ bis" aria-label="Preis bis">
+    <span class="hits" id="hits" aria-live="polite"></span>
+  </div>"""
+        search_script = SEARCH_JS
+    else:
+        for f in data_dir.glob("search*.json"):
+            f.unlink()
+
+    # Seiten-Assets: inline (wie immer) oder als eigene, minifizierte Dateien
+    # in assets/ plus kritisches CSS und selbst gehostete Schrift
+    assets_dir = output_path / "assets"
+    page_js    = GALLERY_JS + fade_script + grid_script + search_script
+    if assets == 'external':
+        face_css, font_url, written = build_font_assets(assets_dir, output_path.parent / ".font-cache", fingerprint)
+        css_url = write_asset(assets_dir, "gallery.css", minify_css(GALLERY_CSS).encode('utf-8'), fingerprint)
+        js_url  = write_asset(assets_dir, "gallery.js", minify_js(page_js).encode('utf-8'), fingerprint)
+        written = {u.split('?')[0] for u in written + [css_url, js_url]}
+        for f in assets_dir.rglob('*'):
+            # .gz/.br-Geschwister räumt precompress_output selbst auf
+            rel = re.sub(r'\.(gz|br)$', '', f.relative_to(output_path).as_posix())
+            if f.is_file() and rel not in written:
+                f.unlink()
+        font_html = (f'  <link rel="preload" href="{font_url}" as="font" type="font/woff2" crossorigin>\n'
+                     if font_url else '')
+        styles  = (f"  <style>{minify_css(face_css + critical_css(GALLERY_CSS))}</style>\n"
+                   f'  <link rel="preload" href="{css_url}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">\n'
+                   f'  <noscript><link rel="stylesheet" href="{css_url}"></noscript>\n')
+        scripts = f'<script src="{js_url}"></script>'
+    else:
+        font_html = GOOGLE_FONTS_HTML
+        styles    = f"  <style>\n{GALLERY_CSS}  </style>\n"
+        scripts   = f"<script>\n{page_js}\n</script>"
+        if assets_dir.exists():
+            shutil.rmtree(str(assets_dir))
+
+    head = f"""<!DOCTYPE html>
+<html lang="de">
+<head>
+  <meta charset="UTF-8">
+  <link rel="icon" href="favicon.png" type="image/png">
+  <meta name="viewport" content="width=device-width, initial-scale=1.0">
+  <title>Booq – wdeu bei Booklooker.de</title>
 
-</script>
+{font_html}{styles}  <noscript><style>.grid.lqip .item img {{ opacity: 1; }}</style></noscript>
+</head>
+<body>
+
+<a class="close-btn" href="https://wdeu.de" title="Zurück zu wdeu.de">✕</a>
+
+<header>
+  <h1>Booq</h1>
+  <div class="sub">wdeu bei Booklooker.de</div>
+  <div class="hint">Klick aufs Cover → direkt zu Booklooker</div>
+  <div class="header-row">
+    <div class="stats">{count} Bücher · Stand: {now}</div>
+    <div class="size-control">
+      <label for="sizeSlider">🔍</label>
+      <input type="range" id="sizeSlider" min="80" max="280" step="10" value="130"
+             oninput="setSize(this.value)">
+      <span class="size-val" id="sizeVal">130px</span>
+    </div>
+  </div>{search_html}
+</header>
+
+<main>
+  <div class="grid{grid_class}"{grid_attrs}>"""
+
+    tail = f"""
+  </div>
+</main>
+
+<div class="tooltip-box" id="tooltip"></div>
+
+<footer>
+  <div class="footer-icons">
+    <a class="footer-btn" href="https://wdeu.de" title="wdeu.de">💡</a>
+    <button class="footer-btn" id="share-btn" title="Seite teilen">
+      <svg width="22" height="22" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round">
+        <path d="M4 12v8a2 2 0 0 0 2 2h12a2 2 0 0 0 2-2v-8"/>
+        <polyline points="16 6 12 2 8 6"/>
+        <line x1="12" y1="2" x2="12" y2="15"/>
+      </svg>
+    </button>
+    <button class="footer-btn" id="homescreen-btn" title="Zum Homescreen hinzufügen">📌</button>
+  </div>
+  <div>Fachbücher Psychologie &amp; Sozialwissenschaften · wdeu bei Booklooker.de</div>
+</footer>
+
+{scripts}
 
 </body>
 </html>"""
 
-    # e) HTML schreiben
+    # e) HTML schreiben: Kopf, Kacheln, Rest – Stück für Stück in eine
+    #    Temp-Datei, die erst am Ende index.html ersetzt
+    def page():
+        yield head
+        if not sharded:
+            for item in iter_gallery_items(images, articles, FALLBACK_URL):
+                yield render_item(item, thumbs.get(item[1]), dims.get(item[1]), backgrounds.get(item[1]),
+                                  names.get(item[1]))
+        yield tail
+
     html_file = output_path / "index.html"
-    html_file.write_text(html, encoding='utf-8')
+    _write_text_atomic(html_file, page())
     ok(f"index.html → {html_file}")
 
+    # f) Optional: .gz/.br neben jede Textdatei (sonst alte Geschwister weg,
+    #    damit der Server keine veralteten Varianten ausliefert)
+    formats = ()
+    if precompress:
+        formats = ('gz', 'br') if brotli is not None else ('gz',)
+        if brotli is None:
+            log("brotli nicht installiert → nur .gz (pip install brotli)")
+    precompress_output(output_path, output_path.parent / ".precompress-manifest.json", formats)
+    write_server_config(output_path, fingerprint, bool(formats))
+
     return count
 
+# ============================================================
+# DEPLOY (FTP/FTPS/SFTP) – nur geänderte Dateien hochladen
+# ============================================================
+DEPLOY_MANIFEST = ".deploy-manifest.json"   # liegt auf dem Server: {pfad: sha1}
+DEPLOY_LAST     = ('data/index.json', 'index.html')
+
+
+def _deploy_last(rel):
+    """Einstiegsdatei (auch als .gz/.br)? Die kommen erst nach allen Assets."""
+    return re.sub(r'\.(gz|br)$', '', rel) in DEPLOY_LAST
+
+
+class LocalTarget:
+    """Ordner als Deploy-Ziel (protocol = local) – Stand-in für Tests."""
+
+    def __init__(self, cfg):
+        self.root = Path(cfg['remote'])
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def read(self, rel):
+        try:
+            return (self.root / rel).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def upload(self, local_file, rel):
+        dest = self.root / rel
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        _copy_atomic(local_file, dest)
+
+    def write(self, rel, data):
+        tmp = self.root / (rel + '.tmp')
+        tmp.write_bytes(data)
+        os.replace(str(tmp), str(self.root / rel))
+
+    def delete(self, rel):
+        try:
+            (self.root / rel).unlink()
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        pass
+
+
+class FTPTarget:
+    """FTP bzw. FTPS (protocol = ftps). Upload in Temp-Datei + Rename."""
+
+    def __init__(self, cfg):
+        cls = ftplib.FTP_TLS if cfg['protocol'] == 'ftps' else ftplib.FTP
+        self.ftp = cls()
+        self.ftp.connect(cfg['host'], cfg['port'] or 21, timeout=30)
+        self.ftp.login(cfg['user'], cfg['password'])
+        if cfg['protocol'] == 'ftps':
+            self.ftp.prot_p()
+        # relativer remote liegt unter dem Login-Ordner, wie cd im FTP-Client
+        self.root = posixpath.normpath(posixpath.join(self.ftp.pwd(), cfg['remote']))
+        self.dirs = set()
+
+    def _path(self, rel):
+        return posixpath.join(self.root, rel)
+
+    def _mkdirs(self, rel_dir):
+        # inkl. des Zielordners selbst, falls es den noch nicht gibt
+        parts = [p for p in self._path(rel_dir).split('/') if p]
+        for i in range(1, len(parts) + 1):
+            d = '/' + '/'.join(parts[:i])
+            if d in self.dirs:
+                continue
+            try:
+                self.ftp.mkd(d)
+            except ftplib.error_perm:
+                pass   # existiert schon
+            self.dirs.add(d)
+
+    def read(self, rel):
+        chunks = []
+        try:
+            self.ftp.retrbinary(f"RETR {self._path(rel)}", chunks.append)
+        except ftplib.error_perm:
+            return None
+        return b''.join(chunks)
+
+    def _store(self, rel, fh):
+        self._mkdirs(posixpath.dirname(rel))
+        tmp = self._path(posixpath.join(posixpath.dirname(rel), '.' + posixpath.basename(rel) + '.tmp'))
+        self.ftp.storbinary(f"STOR {tmp}", fh)
+        try:
+            self.ftp.rename(tmp, self._path(rel))
+        except ftplib.error_perm:
+            # manche Server überschreiben beim Rename nicht
+            self.delete(rel)
+            self.ftp.rename(tmp, self._path(rel))
+
+    def upload(self, local_file, rel):
+        with open(local_file, 'rb') as fh:
+            self._store(rel, fh)
+
+    def write(self, rel, data):
+        self._store(rel, io.BytesIO(data))
+
+    def delete(self, rel):
+        try:
+            self.ftp.delete(self._path(rel))
+        except ftplib.error_perm:
+            pass
+
+    def close(self):
+        try:
+            self.ftp.quit()
+        except Exception:
+            self.ftp.close()
+
+
+class SFTPTarget:
+    """SFTP über paramiko (optional). Upload in Temp-Datei + posix_rename."""
+
+    def __init__(self, cfg):
+        try:
+            import paramiko
+        except ImportError:
+            err("protocol = sftp braucht paramiko: pip install paramiko")
+        self.transport = paramiko.Transport((cfg['host'], cfg['port'] or 22))
+        self.transport.connect(username=cfg['user'], password=cfg['password'])
+        self.sftp = paramiko.SFTPClient.from_transport(self.transport)
+        # relativer remote liegt unter dem Home-Ordner des Logins
+        self.root = posixpath.normpath(posixpath.join(self.sftp.normalize('.'), cfg['remote']))
+        self.dirs = set()
+
+    def _path(self, rel):
+        return posixpath.join(self.root, rel)
+
+    def _mkdirs(self, rel_dir):
+        # inkl. des Zielordners selbst, falls es den noch nicht gibt
+        parts = [p for p in self._path(rel_dir).split('/') if p]
+        for i in range(1, len(parts) + 1):
+            d = '/' + '/'.join(parts[:i])
+            if d in self.dirs:
+                continue
+            try:
+                self.sftp.mkdir(d)
+            except IOError:
+                pass   # existiert schon
+            self.dirs.add(d)
+
+    def read(self, rel):
+        try:
+            with self.sftp.open(self._path(rel), 'rb') as fh:
+                return fh.read()
+        except IOError:
+            return None
+
+    def _tmp(self, rel):
+        return self._path(posixpath.join(posixpath.dirname(rel), '.' + posixpath.basename(rel) + '.tmp'))
+
+    def upload(self, local_file, rel):
+        self._mkdirs(posixpath.dirname(rel))
+        self.sftp.put(str(local_file), self._tmp(rel))
+        self.sftp.posix_rename(self._tmp(rel), self._path(rel))
+
+    def write(self, rel, data):
+        self._mkdirs(posixpath.dirname(rel))
+        with self.sftp.open(self._tmp(rel), 'wb') as fh:
+            fh.write(data)
+        self.sftp.posix_rename(self._tmp(rel), self._path(rel))
+
+    def delete(self, rel):
+        try:
+            self.sftp.remove(self._path(rel))
+        except IOError:
+            pass
+
+    def close(self):
+        self.sftp.close()
+        self.transport.close()
+
+
+DEPLOY_TARGETS = {'local': LocalTarget, 'ftp': FTPTarget, 'ftps': FTPTarget, 'sftp': SFTPTarget}
+
+
+def _local_tree(output_path, hash_cache_file):
+    """{relativer pfad (posix): sha1} aller Dateien im Output. SHA-1 wird nur
+    für Dateien mit geänderter Größe/mtime neu berechnet (Cache neben dem Output)."""
+    cache = _read_json(hash_cache_file, {})
+    tree, new_cache = {}, {}
+    for dirpath, dirnames, filenames in os.walk(output_path):
+        for name in filenames:
+            if name.endswith('.tmp'):
+                continue
+            path = Path(dirpath) / name
+            rel  = path.relative_to(output_path).as_posix()
+            st   = path.stat()
+            hit  = cache.get(rel)
+            if hit and hit[0] == st.st_size and hit[1] == st.st_mtime:
+                digest = hit[2]
+            else:
+                digest = file_hash(path)
+            tree[rel] = digest
+            new_cache[rel] = [st.st_size, st.st_mtime, digest]
+    _write_json_atomic(hash_cache_file, new_cache)
+    return tree
+
+
+def _deploy_url(ftp_cfg):
+    """Ziel fürs Log: protocol://host/remote, relative Pfade gekennzeichnet."""
+    remote = ftp_cfg['remote']
+    if ftp_cfg['protocol'] == 'local':
+        return f"local:{remote}"
+    url = f"{ftp_cfg['protocol']}://{ftp_cfg['host']}"
+    return url + remote if remote.startswith('/') else f"{url}/{remote} (im Login-Ordner)"
+
+
+def deploy(output_path, ftp_cfg):
+    """Lädt nur geänderte Dateien hoch (Vergleich mit dem Manifest auf dem
+    Server), parallel über mehrere Verbindungen. Reihenfolge: erst Bilder und
+    Daten, dann index.html, erst danach Löschen verkaufter Cover – Besucher
+    sehen so nie eine Seite mit fehlenden Bildern."""
+    target_cls = DEPLOY_TARGETS.get(ftp_cfg['protocol'])
+    if target_cls is None:
+        err(f"Unbekanntes [ftp] protocol: {ftp_cfg['protocol']} (ftp, ftps, sftp, local)")
+
+    log(f"Deploy → {_deploy_url(ftp_cfg)} ...")
+    local = _local_tree(output_path, output_path.parent / ".deploy-hashes.json")
+
+    main_conn   = target_cls(ftp_cfg)
+    connections = [main_conn]
+    conn_lock   = threading.Lock()
+    local_conn  = threading.local()
+
+    def conn():
+        # Jeder Worker-Thread bekommt eine eigene Verbindung
+        if not hasattr(local_conn, 'c'):
+            local_conn.c = target_cls(ftp_cfg)
+            with conn_lock:
+                connections.append(local_conn.c)
+        return local_conn.c
+
+    try:
+        raw = main_conn.read(DEPLOY_MANIFEST)
+        try:
+            remote = json.loads(raw) if raw else {}
+        except ValueError:
+            remote = {}
+        upload  = sorted(rel for rel, digest in local.items() if remote.get(rel) != digest)
+        delete  = sorted(rel for rel in remote if rel not in local)
+        # Einstiegsdateien zuletzt: sie verweisen auf (ggf. neu benannte) Assets
+        pages   = [rel for rel in upload if _deploy_last(rel)]
+        assets  = [rel for rel in upload if not _deploy_last(rel)]
+        log(f"{len(upload)} Dateien hochzuladen, {len(delete)} zu löschen, "
+            f"{len(local) - len(upload)} unverändert")
+
+        def run(action, rels):
+            done = []
+            if not rels:
+                return done
+            workers = min(ftp_cfg['connections'], len(rels))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {pool.submit(action, rel): rel for rel in rels}
+                for fut, rel in futures.items():
+                    try:
+                        fut.result()
+                        done.append(rel)
+                    except Exception as e:
+                        warn(f"Deploy fehlgeschlagen: {rel} ({e})")
+            return done
+
+        uploaded = run(lambda rel: conn().upload(output_path / rel, rel), assets)
+        if len(uploaded) == len(assets):
+            for rel in pages:                        # index.html zuletzt
+                main_conn.upload(output_path / rel, rel)
+                uploaded.append(rel)
+        elif pages:
+            warn("Nicht alle Dateien hochgeladen → index.html bleibt auf altem Stand")
+        deleted = run(lambda rel: conn().delete(rel), delete) if set(pages) <= set(uploaded) else []
+
+        # Manifest nur mit dem, was wirklich angekommen ist
+        for rel in uploaded:
+            remote[rel] = local[rel]
+        for rel in deleted:
+            remote.pop(rel, None)
+        main_conn.write(DEPLOY_MANIFEST, json.dumps(remote, separators=(',', ':')).encode('utf-8'))
+    finally:
+        for c in connections:
+            c.close()
+
+    ok(f"Deploy: {len(uploaded)} hochgeladen, {len(deleted)} gelöscht "
+       f"({ftp_cfg['connections']} Verbindungen)")
+    return len(uploaded), len(deleted)
+
 # ============================================================
 # MAIN
 # ============================================================
@@ -916,39 +3734,383 @@ def find_bl_image_dir(gallery_path, order_prefix=None):
     return bl_dirs[0]
 
 
+# ============================================================
+# WATCH-MODUS (--watch)
+# ============================================================
+def _watch_dirs(root):
+    """Alle Ordner unter root, die beobachtet werden – dieselben wie bei
+    scan_gallery (ohne Verkauft/ direkt unter root und SCAN_EXCLUDE)."""
+    root  = str(root)
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        yield path
+        try:
+            with os.scandir(path) as it:
+                for e in it:
+                    if (e.is_dir(follow_symlinks=False) and e.name not in SCAN_EXCLUDE
+                            and not (path == root and e.name == 'Verkauft')):
+                        stack.append(e.path)
+        except OSError:
+            pass
+
+
+class InotifyWatcher:
+    """Linux: inotify direkt über ctypes (kein Zusatzpaket). Neu angelegte
+    Unterordner – z.B. ein frisch entpackter *-images-*-Download – werden
+    sofort mitbeobachtet."""
+
+    IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x008, 0x040, 0x080
+    IN_CREATE, IN_DELETE                       = 0x100, 0x200
+    IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR        = 0x4000, 0x8000, 0x40000000
+    MASK  = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct('iIII')   # wd, mask, cookie, len (+ name)
+
+    def __init__(self, root):
+        self.root = str(root)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd   = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 fehlgeschlagen")
+        self.wds = {}
+        for path in _watch_dirs(self.root):
+            self._add(path)
+
+    def _add(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd >= 0:
+            self.wds[wd] = path
+
+    def wait(self, timeout):
+        """Wartet höchstens timeout Sekunden auf Ereignisse → Set geänderter Pfade."""
+        changed = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, pos)
+            name = os.fsdecode(data[pos + self.EVENT.size:pos + self.EVENT.size + length].rstrip(b'\0'))
+            pos += self.EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:        # Ereignisse verloren → alles prüfen
+                changed.add(self.root)
+                continue
+            if mask & self.IN_IGNORED:           # Ordner gelöscht/verschoben
+                self.wds.pop(wd, None)
+                continue
+            base = self.wds.get(wd)
+            if base is None:
+                continue
+            path = os.path.join(base, name)
+            if mask & self.IN_ISDIR:
+                if (mask & (self.IN_CREATE | self.IN_MOVED_TO) and name not in SCAN_EXCLUDE
+                        and not (base == self.root and name == 'Verkauft')):
+                    for sub in _watch_dirs(path):
+                        self._add(sub)
+                changed.add(path)
+            elif name.lower().endswith('.jpg'):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """Fallback ohne inotify (macOS, Windows): vergleicht alle interval
+    Sekunden Ordnerliste und Größe/mtime der JPGs."""
+
+    def __init__(self, root, interval=2.0):
+        self.root     = root
+        self.interval = interval
+        self.state    = self._snapshot()
+
+    def _snapshot(self):
+        state = {}
+        for path in _watch_dirs(self.root):
+            state[path] = None
+            try:
+                with os.scandir(path) as it:
+                    for e in it:
+                        if e.name.lower().endswith('.jpg') and e.is_file():
+                            st = e.stat()
+                            state[e.path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass
+        return state
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(max(0, min(self.interval, deadline - time.monotonic())))
+            state   = self._snapshot()
+            changed = {path for path, _ in state.items() ^ self.state.items()}
+            self.state = state
+            if changed or time.monotonic() >= deadline:
+                return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root):
+    """inotify unter Linux, sonst (oder wenn inotify scheitert) Polling."""
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError) as e:
+            warn(f"inotify nicht verfügbar ({e}) → Polling")
+    return PollingWatcher(root)
+
+
+def wait_for_changes(watcher, timeout, debounce, max_wait=60):
+    """Blockiert bis zu timeout Sekunden. Kommen Ereignisse, wird gesammelt,
+    bis debounce Sekunden lang nichts mehr passiert (höchstens max_wait) –
+    ein entpackter BL-Download löst so nur einen Lauf aus."""
+    changed = watcher.wait(timeout)
+    if changed:
+        until = time.monotonic() + max_wait
+        while time.monotonic() < until:
+            more = watcher.wait(debounce)
+            if not more:
+                break
+            changed |= more
+    return changed
+
+
+def index_changes(old, new):
+    """Vergleicht zwei Dateiindizes → (neue/geänderte Pfade, verschwundene Pfade)."""
+    before = {path: (size, mtime) for path, size, mtime in old.entries()}
+    after  = {path: (size, mtime) for path, size, mtime in new.entries()}
+    changed = [path for path, st in after.items() if before.get(path) != st]
+    removed = [path for path in before if path not in after]
+    return changed, removed
+
+
+def watch_gallery(cfg, state, args, phase):
+    """Läuft, bis Strg+C kommt. Dateiereignisse unter gallery_path lösen nur
+    bl_dir → scan → cleanup (nur geänderte Dateien) → generate_html aus; API
+    und WP-Seite werden alle watch_refresh Sekunden neu abgefragt (nicht bei
+    --offline), Cover nur dann neu geprüft. state: Ergebnis des ersten Laufs
+    (articles, wp_links, wp_desc, image_dir, index)."""
+    root    = cfg['gallery_path']
+    watcher = make_watcher(root)
+    refresh_every = float('inf') if args.offline else cfg['watch_refresh']
+    next_refresh  = time.monotonic() + refresh_every
+    kind = 'inotify' if isinstance(watcher, InotifyWatcher) else 'Polling'
+    ok(f"Watch-Modus ({kind}): beobachte {root}"
+       + ("" if args.offline else f", API-Refresh alle {cfg['watch_refresh']}s")
+       + " – Strg+C beendet")
+
+    try:
+        while True:
+            timeout = min(3600, max(0, next_refresh - time.monotonic()))
+            changed = wait_for_changes(watcher, timeout, cfg['watch_debounce'])
+            refresh = time.monotonic() >= next_refresh
+            if not changed and not refresh:
+                continue
+
+            print()
+            if refresh:
+                next_refresh = time.monotonic() + refresh_every
+                log("Geplanter Refresh von API und WP-Seite ...")
+                try:
+                    with phase('api'):
+                        state['articles'] = get_article_data(cfg['api_key'])
+                except (Exception, SystemExit) as e:
+                    warn(f"API-Refresh fehlgeschlagen ({e}) → behalte bisherige Artikelliste")
+                    refresh = False
+                if refresh and cfg.get('wp_mode') and cfg.get('wp_url'):
+                    with phase('wp'):
+                        wp_links, wp_desc = get_wp_data(cfg['wp_url'])
+                    if wp_links:   # nicht erreichbar → alte Links behalten
+                        state['wp_links'], state['wp_desc'] = wp_links, wp_desc
+                if refresh:
+                    state['articles'].attach_wp(state['wp_links'], state['wp_desc'])
+            else:
+                log(f"{len(changed)} Änderungen unter {root} erkannt")
+
+            with phase('bl_dir'):
+                image_dir = find_bl_image_dir(root, cfg['order_prefix'])
+            # Gemeldete Ordner und die Ordner gemeldeter Bilder am Index vorbei
+            # lesen (überschriebene Dateien ändern die Ordner-mtime nicht);
+            # Überlauf (root gemeldet) → alle bekannten Ordner
+            reported = {os.path.normpath(str(p)) for p in changed}
+            if os.path.normpath(str(root)) in reported:
+                stale = {os.path.join(str(state['image_dir']), rel) for rel in state['index'].dirs}
+            else:
+                stale = {os.path.dirname(p) if p.lower().endswith('.jpg') else p for p in reported}
+            with phase('scan'):
+                index = scan_gallery(image_dir, cfg['output_path'].parent / ".fs-index.json", stale)
+
+            # Neuer BL-Ordner oder neue Artikelliste → alles prüfen, sonst nur das Delta
+            paths = None
+            if not refresh and image_dir == state['image_dir']:
+                paths, removed = index_changes(state['index'], index)
+                # gemeldete Bilder immer mitnehmen – auch wenn Größe und mtime
+                # (Zeitauflösung) gleich geblieben sind
+                missed = reported - {os.path.normpath(str(p)) for p in paths}
+                paths += [p for p in index.jpgs() if os.path.normpath(str(p)) in missed]
+                if not paths and not removed:
+                    state['index'] = index
+                    log("Keine neuen oder geänderten Bilder → nichts zu tun")
+                    continue
+                orders = sorted({is_valid(p.name)[1] for p in paths + removed} - {None})
+                if orders:
+                    log(f"Betroffene Bestellnummern: {', '.join(orders[:10])}"
+                        + (f" … (+{len(orders) - 10})" if len(orders) > 10 else ""))
+            state['image_dir'], state['index'] = image_dir, index
+
+            with phase('cleanup'):
+                cleanup(image_dir, state['articles'], cfg['order_prefix'], index, paths)
+            with phase('generate_html'):
+                count = generate_html(image_dir, cfg['output_path'], state['articles'], None,
+                                      cfg['order_prefix'], None, cfg['seller_id'], cfg['cover_base_url'],
+                                      cfg['cover_workers'], cfg['cover_connections'], cfg['incremental'],
+                                      cfg['thumbnails'], cfg['render_mode'], cfg['shard_size'], index,
+                                      refresh_covers=refresh, link_mode=cfg['link_mode'],
+                                      cover_cache_limit=cfg['cover_cache_limit'],
+                                      placeholders=cfg['placeholders'], fingerprint=cfg['fingerprint'],
+                                      assets=cfg['assets'], precompress=cfg['precompress'],
+                                      search=cfg['search'])
+            if args.deploy:
+                with phase('deploy'):
+                    deploy(cfg['output_path'], cfg['ftp'])
+            if args.metrics:
+                METRICS.write(Path(args.metrics).resolve())
+            ok(f"Galerie aktualisiert: {count} Bücher – warte auf Änderungen ...")
+    except KeyboardInterrupt:
+        print()
+        ok("Watch-Modus beendet")
+    finally:
+        watcher.close()
+
+
+PHASES = ('config', 'api', 'wp', 'bl_dir', 'scan', 'cleanup', 'generate_html', 'deploy')
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Booklooker Galerie Generator")
+    parser.add_argument('--offline', action='store_true',
+                        help="Booklooker-API nicht abfragen, aus dem letzten Snapshot rendern")
+    parser.add_argument('--deploy', action='store_true',
+                        help="Galerie danach per [ftp] hochladen (nur geänderte Dateien)")
+    parser.add_argument('--make-manifest', metavar='ORDNER',
+                        help=f"Nur {COVER_MANIFEST} für die Cover in ORDNER schreiben "
+                             "(zum Hochladen auf den Cover-Host) und beenden")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Nur den Bereinigungsplan (löschen/verschieben) ausgeben, nichts ändern")
+    parser.add_argument('--rollback-cleanup', action='store_true',
+                        help="Eine unterbrochene Bereinigung anhand ihres Journals zurückdrehen und beenden")
+    parser.add_argument('--watch', action='store_true',
+                        help="Danach weiterlaufen und bei neuen BL-Bildern inkrementell neu generieren")
+    parser.add_argument('--metrics', nargs='?', const='galerie-metrics.json', metavar='DATEI',
+                        help="Zeit, HTTP, Dateien und Speicher pro Phase als JSON schreiben "
+                             "(Standard: galerie-metrics.json)")
+    parser.add_argument('--profile', action='append', default=[], choices=PHASES, metavar='PHASE',
+                        help=f"Phase zusätzlich unter cProfile laufen lassen ({', '.join(PHASES)}); "
+                             "mehrfach möglich, schaltet --metrics ein")
+    args = parser.parse_args(argv)
+    if args.profile and not args.metrics:
+        args.metrics = 'galerie-metrics.json'
+    return args
+
+
 def main():
+    args = parse_args()
+    metrics_file = Path(args.metrics).resolve() if args.metrics else None
+
+    if args.make_manifest:
+        cover_dir = Path(args.make_manifest).expanduser()
+        if not cover_dir.is_dir():
+            err(f"Kein Ordner: {cover_dir}")
+        write_cover_manifest(cover_dir)
+        return
+
+    if args.rollback_cleanup:
+        rollback_cleanup()
+        return
+
+    def phase(name):
+        return METRICS.phase(name, metrics_file.parent if name in args.profile else None)
+
     print("═" * 56)
     print("  📚 Booklooker Galerie Generator")
     print("═" * 56)
     print()
 
-    cfg = load_config()
-
-    # 1. API: orderNo + ISBN + Preis
-    active, article_info = get_article_data(cfg['api_key'])
+    with phase('config'):
+        cfg = load_config()
 
-    # 2. WP-Seite: ISBN → detail-URL + Beschreibung (nur wenn wordpress_mode = yes)
-    print()
-    if cfg.get('wp_mode') and cfg.get('wp_url'):
-        wp_links, wp_desc = get_wp_data(cfg['wp_url'])
-    else:
+    # 1.–4. Unabhängige Stufen parallel, Schranke vor cleanup:
+    #   api    – orderNo + ISBN + Preis (bzw. Snapshot bei --offline / snapshot_ttl)
+    #   wp     – ISBN → detail-URL + Beschreibung (nur wenn wordpress_mode = yes)
+    #   bl_dir – BL-Bildordner bestimmen (neuester bei mehreren)
+    #   scan   – Dateiindex (einmal scannen, von cleanup + generate_html geteilt)
+    def load_wp():
+        if cfg.get('wp_mode') and cfg.get('wp_url'):
+            return get_wp_data(cfg['wp_url'])
         if cfg.get('wp_url') and not cfg.get('wp_mode'):
             log("wordpress_mode = no → WP-Scraping übersprungen (nur API-Preise)")
         else:
             log("Kein [wordpress] in Config → Cover-Links zeigen auf Händlerkatalog")
-        wp_links, wp_desc = {}, {}
+        return {}, {}
 
-    # 3. BL-Bildordner bestimmen (neuester bei mehreren)
+    stages = {
+        'api':    (lambda: get_article_data(cfg['api_key'], cfg['snapshot_ttl'], args.offline), []),
+        'wp':     (load_wp, []),
+        'bl_dir': (lambda: find_bl_image_dir(cfg['gallery_path'], cfg['order_prefix']), []),
+        'scan':   (lambda image_dir: scan_gallery(image_dir, cfg['output_path'].parent / ".fs-index.json"),
+                   ['bl_dir']),
+    }
+    # cProfile kann nur einen Thread zur Zeit profilen → dann nacheinander
+    workers = 1 if set(args.profile) & set(stages) else None
+    if workers:
+        log("--profile: api, wp, bl_dir und scan laufen nacheinander")
+    results, times = run_stages(stages, phase, workers)
+    articles          = results['api']
+    wp_links, wp_desc = results['wp']
+    image_dir, index  = results['bl_dir'], results['scan']
     print()
-    image_dir = find_bl_image_dir(cfg['gallery_path'], cfg['order_prefix'])
+    report_stages(stages, times)
+    if wp_links:
+        ok(f"WP-Daten mit {articles.attach_wp(wp_links, wp_desc)} von {len(articles)} Artikeln verknüpft")
 
-    # 4. Bilder bereinigen
-    print()
-    cleanup(image_dir, active, cfg['order_prefix'])
+    # 5. Bilder bereinigen
+    with phase('cleanup'):
+        cleanup(image_dir, articles, cfg['order_prefix'], index, dry_run=args.dry_run)
+    if args.dry_run:
+        print()
+        ok("Trockenlauf – nichts verändert, keine Galerie generiert")
+        return
 
-    # 5. Galerie generieren
+    # 6. Galerie generieren
     print()
-    count = generate_html(image_dir, cfg['output_path'], article_info, wp_links, cfg['order_prefix'], wp_desc, cfg['seller_id'], cfg['cover_base_url'])
+    with phase('generate_html'):
+        count = generate_html(image_dir, cfg['output_path'], articles, None, cfg['order_prefix'], None, cfg['seller_id'], cfg['cover_base_url'],
+                              cfg['cover_workers'], cfg['cover_connections'], cfg['incremental'],
+                              cfg['thumbnails'], cfg['render_mode'], cfg['shard_size'], index,
+                              link_mode=cfg['link_mode'], cover_cache_limit=cfg['cover_cache_limit'],
+                              placeholders=cfg['placeholders'], fingerprint=cfg['fingerprint'],
+                              assets=cfg['assets'], precompress=cfg['precompress'],
+                              search=cfg['search'])
+
+    # 7. Optional: Deploy
+    if args.deploy:
+        print()
+        if not cfg['ftp']:
+            err("--deploy braucht einen [ftp]-Abschnitt in der Config")
+        with phase('deploy'):
+            deploy(cfg['output_path'], cfg['ftp'])
+
+    if metrics_file:
+        print()
+        METRICS.print_summary()
+        METRICS.write(metrics_file)
+        ok(f"Metriken → {metrics_file}")
 
     print()
     print("═" * 56)
@@ -962,5 +4124,11 @@ def main():
     print(f"     oder per Netlify Drag & Drop (siehe ANLEITUNG)")
     print("═" * 56)
 
+    # 8. Optional: weiterlaufen und auf neue BL-Downloads reagieren
+    if args.watch:
+        print()
+        watch_gallery(cfg, {'articles': articles, 'wp_links': wp_links, 'wp_desc': wp_desc,
+                            'image_dir': image_dir, 'index': index}, args, phase)
+
 if __name__ == "__main__":
     main()